@@ -0,0 +1,34 @@
+"""
+fleet statistics over several synthetic reports, one after the other and in a process pool
+
+    python -m bench.bench_aggregate [REPORTS] [NODES] [WORKERS]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from bench.synthetic import generate_bytes
+from nexpose.aggregate import aggregate
+
+
+def main(reports: int = 8, nodes: int = 500, workers: int = 4) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for seed in range(reports):
+            path = os.path.join(directory, 'report-{}.xml'.format(seed))
+            with open(path, 'wb') as f:
+                f.write(generate_bytes(nodes=nodes, seed=seed))
+            paths.append(path)
+
+        for pool in (None, workers):
+            start = time.perf_counter()
+            stats = aggregate(paths, workers=pool)
+            elapsed = time.perf_counter() - start
+            print('{:>9} {} reports, {} nodes, ~{} hosts in {:.3f} s'.format(
+                '{} procs'.format(pool) if pool else 'serial', stats.reports, stats.nodes, len(stats.hosts),
+                elapsed))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
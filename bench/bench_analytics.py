@@ -0,0 +1,39 @@
+"""
+vectorized risk analytics over about a million findings, the synthetic report repeated
+
+    python -m bench.bench_analytics [NODES] [COPIES]
+"""
+import sys
+import time
+
+from bench.synthetic import generate_bytes
+from nexpose.analytics import RiskAnalytics
+
+
+def _time(name: str, run) -> None:
+    start = time.perf_counter()
+    run()
+    print('{:24} {:8.2f} ms'.format(name, (time.perf_counter() - start) * 1e3))
+
+
+def main(nodes: int = 2000, copies: int = 55) -> None:
+    raw = generate_bytes(nodes=nodes)
+
+    start = time.perf_counter()
+    part = RiskAnalytics.load(raw, statuses=None)
+    print('load {} findings in {:.3f} s'.format(len(part.finding_node), time.perf_counter() - start))
+    analytics = RiskAnalytics.concatenate([part] * copies)
+    print('{} nodes, {} findings'.format(len(analytics.node_address), len(analytics.finding_node)))
+
+    _time('risk by site', lambda: analytics.sum_by('risk', by='site'))
+    _time('cvss by subnet', lambda: analytics.sum_by('cvss', by='subnet'))
+    _time('cvss by port', lambda: analytics.sum_by('cvss', by='port'))
+    _time('findings by severity', lambda: analytics.sum_by('findings', by='severity'))
+    _time('cvss percentiles', lambda: analytics.percentiles('cvss'))
+    _time('severity histogram', lambda: analytics.histogram('severity', bins=10, value_range=(0, 10)))
+    _time('top 10 nodes by risk', lambda: analytics.top('risk', 10))
+    _time('top 10 nodes by cvss', lambda: analytics.top('cvss', 10, by='node'))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,54 @@
+"""
+time each attribute converter against the conversion it replaces, on values repeating as in a report
+
+    python -m bench.bench_converters
+"""
+import datetime
+import random
+import timeit
+
+from nexpose.converters import date, ip, lookup
+from nexpose.models.report import Protocol, TestStatus
+from nexpose.types import str_to_IP
+from nexpose.utils import parse_date
+
+VALUES = 100000
+
+
+def dates(rand: random.Random):
+    distinct = ['{:04d}{:02d}{:02d}T{:02d}{:02d}{:02d}{:03d}'.format(
+        rand.randint(2005, 2017), rand.randint(1, 12), rand.randint(1, 28), rand.randint(0, 23), rand.randint(0, 59),
+        rand.randint(0, 59), rand.randint(0, 999)) for _ in range(500)]
+    return [rand.choice(distinct) for _ in range(VALUES)]
+
+
+def main(repeat: int = 5) -> None:
+    rand = random.Random(0)
+    raw_dates = dates(rand)
+    addresses = ['10.0.{}.{}'.format(rand.randint(0, 7), rand.randint(0, 255)) for _ in range(VALUES)]
+    statuses = [rand.choice(list(TestStatus)).value for _ in range(VALUES)]
+    protocols = [rand.choice(list(Protocol)).value for _ in range(VALUES)]
+
+    def strptime(raw: str) -> datetime.datetime:
+        return datetime.datetime.strptime(raw, '%Y%m%dT%H%M%S%f')
+
+    cases = [
+        ('date strptime', strptime, raw_dates),
+        ('date sliced', parse_date, raw_dates),
+        ('date cached', date, raw_dates),
+        ('ip', str_to_IP, addresses),
+        ('ip cached', ip, addresses),
+        ('TestStatus()', TestStatus, statuses),
+        ('TestStatus lookup', lookup(TestStatus), statuses),
+        ('Protocol()', Protocol, protocols),
+        ('Protocol lookup', lookup(Protocol), protocols),
+        ('float', float, ['{:.5f}'.format(rand.random() * 1000) for _ in range(VALUES)]),
+    ]
+
+    for name, convert, values in cases:
+        elapsed = min(timeit.repeat(lambda: [convert(v) for v in values], number=1, repeat=repeat))
+        print('{:20} {:8.1f} ns'.format(name, elapsed / len(values) * 1e9))
+
+
+if __name__ == '__main__':
+    main()
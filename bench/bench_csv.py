@@ -0,0 +1,42 @@
+"""
+cost per finding of the csv report reader against the findings of the same raw-xml-v2 report
+
+    python -m bench.bench_csv [NODES]
+"""
+import sys
+import time
+
+from bench.synthetic import generate_bytes, generate_csv_bytes
+from nexpose.models.csv_report import CSVReportReader
+from nexpose.models.finding import INCLUDE, findings, vulnerability_summaries
+from nexpose.models.stream import ReportReader
+
+
+def _xml(raw: bytes) -> int:
+    summaries = vulnerability_summaries(raw)
+    return sum(1 for node in ReportReader(raw, include=INCLUDE) for _ in findings(node, summaries, statuses=None))
+
+
+def _csv_rows(raw: bytes) -> int:
+    return sum(1 for _ in CSVReportReader(raw))
+
+
+def _csv_columns(raw: bytes) -> int:
+    return sum(len(batch) for batch in CSVReportReader(raw).batches())
+
+
+def main(nodes: int = 2000) -> None:
+    xml = generate_bytes(nodes=nodes)
+    csv = generate_csv_bytes(nodes=nodes)
+
+    for name, run, raw in (('xml findings', _xml, xml), ('csv findings', _csv_rows, csv),
+                           ('csv columns', _csv_columns, csv)):
+        start = time.perf_counter()
+        count = run(raw)
+        elapsed = time.perf_counter() - start
+        print('{:12} {} findings from {:.1f} MiB in {:.3f} s, {:.2f} us/finding'.format(
+            name, count, len(raw) / 2 ** 20, elapsed, elapsed / count * 1e6))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
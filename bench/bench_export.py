@@ -0,0 +1,31 @@
+"""
+throughput of the ndjson export of the findings of a synthetic report
+
+    python -m bench.bench_export [NODES]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from bench.synthetic import generate_bytes
+from nexpose.sinks.ndjson import NDJSONSink
+
+
+def main(nodes: int = 2000) -> None:
+    raw = generate_bytes(nodes=nodes)
+    with tempfile.TemporaryDirectory() as directory:
+        for compress in (False, True):
+            path = os.path.join(directory, 'findings.ndjson')
+            start = time.perf_counter()
+            with NDJSONSink(path, compress=compress) as sink:
+                sink.load(raw)
+            elapsed = time.perf_counter() - start
+
+            print('{:5} {} records in {:.3f} s, {:.0f} records/s, {:.1f} MiB'.format(
+                'gzip' if compress else 'plain', sink.written, elapsed, sink.written / elapsed,
+                os.path.getsize(path) / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,85 @@
+"""
+time report filters pushed down into the parse against a full parse filtered afterwards
+
+    python -m bench.bench_filter [NODES]
+"""
+import ipaddress
+import sys
+import timeit
+from typing import Any, Iterable, Tuple
+
+from bench.synthetic import generate_bytes
+from nexpose.models.filter import ReportFilter
+from nexpose.models.finding import address
+from nexpose.models.report import Node, Vulnerability
+from nexpose.models.stream import ReportReader
+
+FILTERS = (
+    ('vulnerable', ReportFilter(test_statuses={'vulnerable-exploited', 'vulnerable-version'})),
+    ('severity >= 8', ReportFilter(min_severity=8)),
+    ('/24', ReportFilter(networks=['10.0.0.0/24'])),
+    ('ports 22, 443', ReportFilter(ports=[22, 443])),
+    ('all of them', ReportFilter(networks=['10.0.0.0/24'], min_severity=8,
+                                 test_statuses={'vulnerable-exploited', 'vulnerable-version'})),
+)
+
+
+def tests(node: Node) -> Iterable[Any]:
+    yield from node.tests
+    for endpoint in node.endpoints:
+        for service in endpoint.services:
+            yield from service.tests
+
+
+def pushed_down(raw: bytes, where: ReportFilter) -> Tuple[int, int]:
+    """
+    nodes and tests kept
+    """
+    nodes = [record for record in ReportReader(raw, where=where) if isinstance(record, Node)]
+    return len(nodes), sum(1 for node in nodes for _ in tests(node))
+
+
+def filtered_after(raw: bytes, where: ReportFilter) -> Tuple[int, int]:
+    """
+    same as `pushed_down`, filtering the models of a full parse
+    """
+    records = list(ReportReader(raw))
+    severities = {record.vulnerability_id.lower(): record.severity
+                  for record in records if isinstance(record, Vulnerability)}
+
+    def keep_test(test: Any) -> bool:
+        if where.test_statuses is not None and test.status not in where.test_statuses:
+            return False
+        return where.min_severity is None or severities.get(test.id.lower(), -1) >= where.min_severity
+
+    kept = []  # type: list[int]
+    for node in records:
+        if not isinstance(node, Node):
+            continue
+        if where.networks is not None and not any(ipaddress.ip_address(address(node)) in network
+                                                  for network in where.networks):
+            continue
+        count = sum(1 for test in node.tests if keep_test(test))
+        for endpoint in node.endpoints:
+            if where.ports is None or endpoint.port in where.ports:
+                count += sum(1 for service in endpoint.services for test in service.tests if keep_test(test))
+        kept.append(count)
+    return len(kept), sum(kept)
+
+
+def main(nodes: int = 1000, repeat: int = 5) -> None:
+    raw = generate_bytes(nodes=nodes)
+    full = min(timeit.repeat(lambda: list(ReportReader(raw)), number=1, repeat=repeat))
+    print('{} nodes, {:.1f} MiB, full parse {:.3f} s'.format(nodes, len(raw) / 2 ** 20, full))
+    print('{:16} {:>10} {:>10} {:>8} {:>8}'.format('filter', 'pushed', 'after', 'nodes', 'tests'))
+
+    for name, where in FILTERS:
+        kept = pushed_down(raw, where)
+        assert kept == filtered_after(raw, where), (kept, filtered_after(raw, where))
+        pushed = min(timeit.repeat(lambda: pushed_down(raw, where), number=1, repeat=repeat))
+        after = min(timeit.repeat(lambda: filtered_after(raw, where), number=1, repeat=repeat))
+        print('{:16} {:>10.3f} {:>10.3f} {:>8} {:>8}'.format(name, pushed, after, *kept))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
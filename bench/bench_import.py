@@ -0,0 +1,69 @@
+"""
+import time of the package for a one-shot call, as measured by `python -X importtime` in a fresh interpreter
+
+    python -m bench.bench_import
+"""
+import re
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple
+
+# code run by each scenario, and the total import time in microseconds it has to stay under
+SCENARIOS = {
+    'import nexpose': ("import nexpose; nexpose.Nexpose('localhost')", 20000),
+    'scan module': ("import nexpose; nexpose.Nexpose('localhost').scan", 300000),
+}
+
+
+LINE = re.compile(r'import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$')
+
+
+class ImportTimes(NamedTuple):
+    # cumulative microseconds by top level module imported by the code
+    cumulative: Dict[str, int]
+    modules: List[str]
+
+    @property
+    def total(self) -> int:
+        return sum(self.cumulative.values())
+
+
+def import_times(code: str) -> ImportTimes:
+    """
+    imports done by `code` beyond the ones of the interpreter startup
+    """
+    # modules imported at startup, by `site` and its hooks, are imported again in the child but not reported
+    done = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import sys; print(*sys.modules)'],
+                          check=True, capture_output=True, text=True)
+    startup = set(done.stdout.split())
+
+    ran = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import sys; sys.stderr.write("--\\n"); ' + code],
+                         check=True, capture_output=True, text=True)
+    lines = ran.stderr.split('--\n', 1)[-1].splitlines()
+
+    cumulative = {}  # type: Dict[str, int]
+    modules = []  # type: List[str]
+    for line in lines:
+        match = LINE.match(line)
+        if match is None:
+            continue
+        cumulative_us, depth, name = match.groups()
+        if name in startup:
+            continue
+        modules.append(name)
+        if not depth:
+            cumulative[name] = int(cumulative_us)
+    return ImportTimes(cumulative, modules)
+
+
+def main() -> None:
+    for name, (code, budget) in SCENARIOS.items():
+        times = import_times(code)
+        print('{:16} {:8.1f} ms (budget {:.1f} ms), {} modules'.format(
+            name, times.total / 1000, budget / 1000, len(times.modules)))
+        for module, us in sorted(times.cumulative.items(), key=lambda item: -item[1])[:5]:
+            print('    {:40} {:8.1f} ms'.format(module, us / 1000))
+
+
+if __name__ == '__main__':
+    main()
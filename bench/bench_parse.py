@@ -0,0 +1,41 @@
+"""
+time the parsing of a synthetic report
+
+    python -m bench.bench_parse [NODES]
+"""
+import sys
+import timeit
+
+from lxml import etree
+
+from bench.synthetic import generate_bytes
+from nexpose.models.filter import ReportFilter
+from nexpose.models.report import NexposeReport
+
+PROJECTION = {'nodes.tests', 'nodes.endpoints.port'}
+FILTER = ReportFilter(networks=['10.0.0.0/24'], min_severity=8,
+                      test_statuses={'vulnerable-exploited', 'vulnerable-version'})
+
+
+def main(nodes: int = 2000, repeat: int = 5) -> None:
+    raw = generate_bytes(nodes=nodes)
+
+    xml_parse = min(timeit.repeat(lambda: etree.fromstring(raw), number=1, repeat=repeat))
+    full = min(timeit.repeat(lambda: NexposeReport.from_xml(etree.fromstring(raw)), number=1, repeat=repeat))
+
+    print('{} nodes, {:.1f} MiB'.format(nodes, len(raw) / 2 ** 20))
+    print('lxml only:      {:8.3f} s'.format(xml_parse))
+    print('NexposeReport:  {:8.3f} s ({:.1f} us/node)'.format(full, (full - xml_parse) / nodes * 1e6))
+
+    streamed = min(timeit.repeat(lambda: NexposeReport.parse(raw), number=1, repeat=repeat))
+    projected = min(timeit.repeat(lambda: NexposeReport.parse(raw, include=PROJECTION), number=1, repeat=repeat))
+
+    print('streamed:       {:8.3f} s'.format(streamed))
+    print('projected:      {:8.3f} s ({})'.format(projected, ', '.join(sorted(PROJECTION))))
+
+    filtered = min(timeit.repeat(lambda: NexposeReport.parse(raw, where=FILTER), number=1, repeat=repeat))
+    print('filtered:       {:8.3f} s (/24, severity >= 8, vulnerable)'.format(filtered))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
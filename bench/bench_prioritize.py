@@ -0,0 +1,34 @@
+"""
+top findings of the nodes of a synthetic report kept in a bounded heap, against keeping and sorting every finding
+
+    python -m bench.bench_prioritize [NODES] [TOP]
+"""
+import sys
+import time
+
+from bench.synthetic import generate_bytes
+from nexpose.models.stream import ReportReader
+from nexpose.prioritize import INCLUDE, Prioritizer, report_factors
+
+
+def main(nodes: int = 5000, top: int = 100) -> None:
+    raw = generate_bytes(nodes=nodes)
+
+    start = time.perf_counter()
+    vulnerabilities = report_factors(raw)
+    parsed = list(ReportReader(raw, include=INCLUDE))
+    print('parse    {} nodes in {:.3f} s'.format(len(parsed), time.perf_counter() - start))
+
+    for name, bound in (('heap', top), ('sort all', sys.maxsize)):
+        start = time.perf_counter()
+        prioritizer = Prioritizer(top=bound)
+        for node in parsed:
+            prioritizer.add_node(node, vulnerabilities)
+        prioritizer.ranked[:top]
+        elapsed = time.perf_counter() - start
+        print('{:8} top {} of {} findings in {:.3f} s, {:.2f} us/finding'.format(
+            name, top, prioritizer.findings, elapsed, elapsed / prioritizer.findings * 1e6))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
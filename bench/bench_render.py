@@ -0,0 +1,36 @@
+"""
+time the rendering of the description and solution of every finding of a synthetic report
+
+    python -m bench.bench_render [NODES]
+"""
+import sys
+import timeit
+
+from lxml import etree
+
+from bench.synthetic import generate_bytes
+from nexpose.models.report import NexposeReport
+from nexpose.render import renderer
+
+
+def main(nodes: int = 2000, repeat: int = 3) -> None:
+    report = NexposeReport.from_xml(etree.fromstring(generate_bytes(nodes=nodes)))
+    vulnerabilities = {v.vulnerability_id: v for v in report.vulnerability_definition}
+    findings = [vulnerabilities[test.id] for node in report.nodes for test in node.tests
+                if test.id in vulnerabilities]
+
+    def joined():
+        return [(str(v.description), str(v.solution)) for v in findings]
+
+    print('{} findings of {} vulnerabilities'.format(len(findings), len(vulnerabilities)))
+    print('{:10} {:8.3f} s'.format('str', min(timeit.repeat(joined, number=1, repeat=repeat))))
+    for style in ('plain', 'markdown', 'html'):
+        def rendered():
+            cached = renderer(style)
+            return [cached.vulnerability(v) for v in findings]
+
+        print('{:10} {:8.3f} s'.format(style, min(timeit.repeat(rendered, number=1, repeat=repeat))))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
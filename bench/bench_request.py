@@ -0,0 +1,45 @@
+"""
+time and peak memory of serializing a SiteSaveRequest, as a pretty printed tree and streamed in chunks
+
+    python -m bench.bench_request [HOSTS]
+
+the peak memory is the one seen by tracemalloc, which misses the tree libxml builds for the first
+"""
+import sys
+import time
+import tracemalloc
+
+from lxml import etree
+
+from nexpose.models import XmlRequest
+from nexpose.models.scan import ScanConfig, Template
+from nexpose.models.site import Hosts, Site
+
+
+def _tree(site: Site) -> int:
+    request = etree.Element('SiteSaveRequest')
+    request.append(site.to_xml())
+    return len(etree.tostring(request, xml_declaration=True, pretty_print=True, encoding='UTF-8'))
+
+
+def _streamed(site: Site) -> int:
+    return sum(len(chunk) for chunk in XmlRequest('SiteSaveRequest', body=[site]).chunks())
+
+
+def main(hosts: int = 200000) -> None:
+    site = Site(hosts=Hosts(ip_range=[], hosts=['host-{}.example.com'.format(i) for i in range(hosts)]),
+                scan_config=ScanConfig(Template('full-audit')))
+
+    for name, run in (('tree', _tree), ('streamed', _streamed)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        size = run(site)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print('{:8} {} hosts, {:.1f} MiB in {:.3f} s, peak {:.1f} MiB'.format(
+            name, hosts, size / 2 ** 20, elapsed, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,35 @@
+"""
+time and memory held of a parse under a memory budget, and of iterating its nodes back
+
+    python -m bench.bench_spill [NODES]
+"""
+import sys
+import time
+import tracemalloc
+
+from bench.synthetic import generate_bytes
+from nexpose.models.report import NexposeReport
+
+
+def main(nodes: int = 5000) -> None:
+    raw = generate_bytes(nodes=nodes)
+
+    for budget in (None, 64 << 20, 16 << 20, 0):
+        tracemalloc.start()
+        start = time.perf_counter()
+        report = NexposeReport.parse(raw, budget=budget)
+        parsed = time.perf_counter() - start
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        tests = sum(len(node.tests) for node in report.nodes)
+        iterated = time.perf_counter() - start
+
+        print('budget {:>9} parse {:.3f} s, held {:6.1f} MiB, peak {:6.1f} MiB, {} spilled, {} tests iterated in '
+              '{:.3f} s'.format('none' if budget is None else '{} MiB'.format(budget >> 20), parsed, held / 2 ** 20,
+                                peak / 2 ** 20, getattr(report, 'spilled', 0), tests, iterated))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,56 @@
+"""
+time loading a synthetic report into sqlite, one autocommitted insert per row against the sink
+
+    python -m bench.bench_sqlite [NODES]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from bench.synthetic import generate_bytes
+from nexpose.models.finding import value
+from nexpose.models.report import NexposeReport
+from nexpose.sinks.sqlite import INSERT, SCHEMA, SQLiteSink
+
+
+def row_by_row(path: str, raw: bytes) -> None:
+    connection = sqlite3.connect(path, isolation_level=None)
+    connection.executescript(SCHEMA)
+    for node in NexposeReport.parse(raw).nodes:
+        device_id = int(node.device_id)
+        connection.execute(INSERT['nodes'], (device_id, str(node.address), value(node.status), node.site_name,
+                                             value(node.site_importance), node.scan_template_name,
+                                             node.risk_score, node.hardware_address))
+        for endpoint in node.endpoints:
+            connection.execute(INSERT['endpoints'], (device_id, value(endpoint.protocol), endpoint.port,
+                                                     value(endpoint.status)))
+            for service in endpoint.services:
+                connection.execute(INSERT['services'], (device_id, value(endpoint.protocol), endpoint.port,
+                                                        service.name))
+                for test in service.tests:
+                    connection.execute(INSERT['tests'], (device_id, None, None, service.name, test.id, test.key,
+                                                         value(test.status), test.scan_id,
+                                                         value(test.vulnerable_since), None))
+    connection.close()
+
+
+def main(nodes: int = 500) -> None:
+    raw = generate_bytes(nodes=nodes)
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        row_by_row(os.path.join(directory, 'rows.db'), raw)
+        print('row by row: {:8.3f} s'.format(time.perf_counter() - start))
+
+        path = os.path.join(directory, 'sink.db')
+        for run in ('first', 'again'):
+            start = time.perf_counter()
+            with SQLiteSink(path) as sink:
+                sink.load(raw)
+            print('sink {}: {:8.3f} s ({} vulnerabilities skipped)'.format(run, time.perf_counter() - start,
+                                                                          sink.skipped))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
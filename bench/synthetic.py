@@ -0,0 +1,161 @@
+"""
+generate a raw-xml-v2 report shaped like the ones of the console
+
+    python -m bench.synthetic NODES [VULNERABILITIES] > report.xml
+"""
+import random
+import sys
+
+from typing import IO, Iterator
+
+STATUSES = ['vulnerable-exploited', 'vulnerable-version', 'not-vulnerable', 'skipped-version']
+SOURCES = ['CVE', 'BID', 'URL', 'XF', 'OSVDB', 'REDHAT']
+
+
+def _date(rand: random.Random) -> str:
+    return '20{:02}{:02}{:02}T{:02}{:02}{:02}{:03}'.format(
+        rand.randint(10, 16), rand.randint(1, 12), rand.randint(1, 28),
+        rand.randint(0, 23), rand.randint(0, 59), rand.randint(0, 59), rand.randint(0, 999))
+
+
+def _test(rand: random.Random, vulnerabilities: int, indent: str) -> str:
+    return (
+        '{indent}<test id="vuln-{vuln}" key="" status="{status}" scan-id="1" vulnerable-since="{since}"'
+        ' pci-compliance-status="fail">\n'
+        '{indent}  <Paragraph>\n'
+        '{indent}    <Paragraph>Vulnerable software installed: OpenSSH {major}.{minor}</Paragraph>\n'
+        '{indent}  </Paragraph>\n'
+        '{indent}</test>\n'
+    ).format(indent=indent, vuln=rand.randrange(vulnerabilities), status=rand.choice(STATUSES),
+             since=_date(rand), major=rand.randint(4, 7), minor=rand.randint(0, 9))
+
+
+def _node(rand: random.Random, index: int, vulnerabilities: int) -> Iterator[str]:
+    yield ('    <node address="10.{}.{}.{}" status="alive" device-id="{}" site-name="site-{}" site-importance="Normal"'
+           ' scan-template="Full audit" risk-score="{:.3f}" hardware-address="00:50:56:{:02X}:{:02X}:{:02X}">\n').format(
+        index >> 16 & 255, index >> 8 & 255, index & 255, index + 1, index % 7, rand.uniform(0, 5000),
+        rand.randrange(256), rand.randrange(256), rand.randrange(256))
+    yield '      <names>\n        <name>host-{}.example.com</name>\n      </names>\n'.format(index)
+    yield ('      <fingerprints>\n'
+           '        <os certainty="0.85" device-class="General" vendor="Ubuntu" family="Linux" product="Linux"'
+           ' version="14.04" arch="x86_64"/>\n'
+           '        <os certainty="0.67" vendor="Linux" family="Linux" product="Linux" version="3.13"/>\n'
+           '      </fingerprints>\n')
+    yield '      <software>\n'
+    for i in range(rand.randint(0, 4)):
+        yield '        <fingerprint certainty="1.00" vendor="Vendor{0}" family="Family{0}" product="Product{0}"' \
+              ' version="1.{1}.{2}"/>\n'.format(i, rand.randint(0, 9), rand.randint(0, 20))
+    yield '      </software>\n'
+    yield '      <tests>\n'
+    for _ in range(rand.randint(0, 3)):
+        yield _test(rand, vulnerabilities, '        ')
+    yield '      </tests>\n'
+    yield '      <endpoints>\n'
+    for port in rand.sample([21, 22, 25, 80, 443, 3306, 5432, 8080], rand.randint(1, 4)):
+        yield ('        <endpoint protocol="tcp" port="{}" status="open">\n'
+               '          <services>\n'
+               '            <service name="svc-{}">\n'
+               '              <fingerprints>\n'
+               '                <fingerprint certainty="0.90" vendor="OpenBSD" family="OpenSSH" product="OpenSSH"'
+               ' version="6.6.1"/>\n'
+               '              </fingerprints>\n'
+               '              <configuration>\n'
+               '                <config name="ssh.banner">SSH-2.0-OpenSSH_6.6.1p1</config>\n'
+               '                <config name="ssh.protocol.version">2.0</config>\n'
+               '              </configuration>\n'
+               '              <tests>\n').format(port, port)
+        for _ in range(rand.randint(0, 6)):
+            yield _test(rand, vulnerabilities, '                ')
+        yield ('              </tests>\n'
+               '            </service>\n'
+               '          </services>\n'
+               '        </endpoint>\n')
+    yield '      </endpoints>\n'
+    yield '    </node>\n'
+
+
+def _vulnerability(rand: random.Random, index: int) -> Iterator[str]:
+    severity = rand.randint(1, 10)
+    yield ('    <vulnerability id="vuln-{}" title="Vulnerability {} in OpenSSL" severity="{}" pciSeverity="{}"'
+           ' cvssScore="{:.1f}" cvssVector="(AV:N/AC:L/Au:N/C:P/I:P/A:P)" published="{}" added="{}"'
+           ' modified="{}" riskScore="{:.5f}">\n').format(
+        index, index, severity, min(5, severity // 2 + 1), rand.uniform(0, 10), _date(rand), _date(rand),
+        _date(rand), rand.uniform(0, 1000))
+    yield '      <malware>\n'
+    if rand.random() < 0.1:
+        yield '        <name>Malware kit {}</name>\n'.format(index)
+    yield '      </malware>\n'
+    yield '      <exploits>\n'
+    for i in range(rand.choice([0, 0, 0, 1, 2])):
+        yield ('        <exploit id="{0}" title="Exploit {0}" type="metasploit" link="http://www.metasploit.com/{0}"'
+               ' skillLevel="Expert"/>\n').format(index * 10 + i)
+    yield '      </exploits>\n'
+    yield ('      <description>\n'
+           '        <ContainerBlockElement>\n'
+           '          <Paragraph preformat="true">The TLS implementation in OpenSSL {0} does not properly handle\n'
+           '          Heartbeat Extension packets, see <URLLink LinkURL="http://example.com/{0}"'
+           ' LinkTitle="advisory {0}" href="http://example.com/{0}"/> for details.</Paragraph>\n'
+           '          <UnorderedList>\n'
+           '            <ListItem>OpenSSL 1.0.1 through 1.0.1f</ListItem>\n'
+           '            <ListItem>OpenSSL 1.0.2-beta</ListItem>\n'
+           '          </UnorderedList>\n'
+           '        </ContainerBlockElement>\n'
+           '      </description>\n').format(index)
+    yield '      <references>\n'
+    for i in range(rand.randint(1, 6)):
+        yield '        <reference source="{}">REF-{}-{}</reference>\n'.format(rand.choice(SOURCES), index, i)
+    yield '      </references>\n'
+    yield '      <tags>\n        <tag>OpenSSL</tag>\n        <tag>Network</tag>\n      </tags>\n'
+    yield ('      <solution>\n'
+           '        <ContainerBlockElement>\n'
+           '          <Paragraph>Upgrade to OpenSSL 1.0.1g or later.</Paragraph>\n'
+           '        </ContainerBlockElement>\n'
+           '      </solution>\n')
+    yield '    </vulnerability>\n'
+
+
+def generate(out: IO[str], nodes: int, vulnerabilities: int = 500, seed: int = 0) -> None:
+    rand = random.Random(seed)
+
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n<NexposeReport version="2.0">\n')
+    out.write('  <scans>\n    <scan id="1" name="synthetic" startTime="20160301T101010123" '
+              'endTime="20160301T131310456" status="finished"/>\n  </scans>\n')
+    out.write('  <nodes>\n')
+    for index in range(nodes):
+        out.writelines(_node(rand, index, vulnerabilities))
+    out.write('  </nodes>\n')
+    out.write('  <VulnerabilityDefinitions>\n')
+    for index in range(vulnerabilities):
+        out.writelines(_vulnerability(rand, index))
+    out.write('  </VulnerabilityDefinitions>\n</NexposeReport>\n')
+
+
+def generate_bytes(nodes: int, vulnerabilities: int = 500, seed: int = 0) -> bytes:
+    import io
+
+    out = io.StringIO()
+    generate(out, nodes=nodes, vulnerabilities=vulnerabilities, seed=seed)
+    return out.getvalue().encode('UTF-8')
+
+
+def generate_csv_bytes(nodes: int, vulnerabilities: int = 500, seed: int = 0) -> bytes:
+    """
+    every finding of the same report as `generate_bytes`, as a csv report
+    """
+    import io
+
+    from nexpose.models.csv_report import write
+    from nexpose.models.finding import INCLUDE, findings, vulnerability_summaries
+    from nexpose.models.report import NexposeReport
+
+    raw = generate_bytes(nodes=nodes, vulnerabilities=vulnerabilities, seed=seed)
+    summaries = vulnerability_summaries(raw)
+    report = NexposeReport.parse(raw, include=INCLUDE)
+
+    out = io.StringIO(newline='')
+    write((finding for node in report.nodes for finding in findings(node, summaries, statuses=None)), out)
+    return out.getvalue().encode('UTF-8')
+
+
+if __name__ == '__main__':
+    generate(sys.stdout, *(int(arg) for arg in sys.argv[1:]))
@@ -1,20 +1,105 @@
-from typing import Optional, Tuple, Mapping
+import os
+import threading
 
-from nexpose.modules.extra import Extra
-from nexpose.modules.report import Report
-from nexpose.modules.scan import Scan
-from nexpose.modules.session import Session
-from nexpose.modules.site import Site
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Mapping, TypeVar, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from nexpose.modules.extra import Extra  # noqa: F401
+    from nexpose.modules.report import Report, ReportRegistry  # noqa: F401
+    from nexpose.modules.scan import Scan  # noqa: F401
+    from nexpose.modules.session import Session, SessionPool  # noqa: F401
+    from nexpose.modules.site import Site  # noqa: F401
+    from nexpose.transport import RetryPolicy, Timeout  # noqa: F401
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# names of the package imported on first use, by module, so that `import nexpose` loads neither requests nor lxml
+LAZY = {
+    'Extra': 'nexpose.modules.extra',
+    'Report': 'nexpose.modules.report',
+    'ReportRegistry': 'nexpose.modules.report',
+    'Scan': 'nexpose.modules.scan',
+    'Session': 'nexpose.modules.session',
+    'SessionPool': 'nexpose.modules.session',
+    'Site': 'nexpose.modules.site',
+    'RetryPolicy': 'nexpose.transport',
+    'Timeout': 'nexpose.transport',
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in LAZY:
+        # `__import__` rather than `importlib.import_module`, so that `-X importtime` sees it
+        return getattr(__import__(LAZY[name], fromlist=[name]), name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+class _Module:
+    """
+    module of the api, imported and created on first use
+    """
+
+    def __init__(self, create: Callable[['Nexpose'], Any]) -> None:
+        self.create = create
+        self.name = None  # type: Optional[str]
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Optional['Nexpose'], owner: type) -> Any:
+        if instance is None:
+            return self
+        with instance._lock:
+            ret = instance.__dict__.get(self.name)
+            if ret is None:
+                ret = instance.__dict__[self.name] = self.create(instance)
+        return ret
+
+
+def _module(name: str) -> _Module:
+    return _Module(lambda nexpose: __getattr__(name)(**nexpose._kwargs))
 
 
 class Nexpose:
+    """
+    the modules can be called from many threads at once, each thread has its own http session; each module is only
+    imported when first used
+    """
+
+    session: 'Session' = _module('Session')
+    site: 'Site' = _module('Site')
+    scan: 'Scan' = _module('Scan')
+    report: 'Report' = _module('Report')
+    report_registry: 'ReportRegistry' = _Module(lambda nexpose: __getattr__('ReportRegistry')(nexpose.report))
+    extra: 'Extra' = _module('Extra')
+
     def __init__(self, host: str, port: int = 3780,
-                 sessions_id: Optional[Mapping[Tuple[int, int], str]] = None) -> None:
-        kwargs = dict(host=host, port=port, sessions_id=sessions_id)
+                 sessions_id: Optional[Mapping[Tuple[int, int], str]] = None,
+                 session_pool: Optional['SessionPool'] = None,
+                 retry_policy: Optional['RetryPolicy'] = None,
+                 timeout: 'Timeout' = (10, 300),
+                 deadline: Optional[float] = None,
+                 hedge_after: Optional[float] = None) -> None:
+        self._kwargs = dict(host=host, port=port, sessions_id=sessions_id, session_pool=session_pool,
+                            retry_policy=retry_policy, timeout=timeout, deadline=deadline, hedge_after=hedge_after)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def map(fn: Callable[[T], R], items: Iterable[T], workers: int = 8) -> List[R]:
+        """
+        `fn` applied to each of `items` from a pool of `workers` threads, the results in the order of `items`; the
+        error of the first item that failed is raised once every call ended
+
+            summaries = nexpose.map(nexpose.report.report_generate, configs, workers=4)
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(fn, items))
+
 
-        self.session = Session(**kwargs)
-        self.site = Site(**kwargs)
-        self.scan = Scan(**kwargs)
-        self.report = Report(**kwargs)
+if os.environ.get('NEXPOSE_PROFILE'):
+    from nexpose.profile import profile_environment
 
-        self.extra = Extra(**kwargs)
+    profile_environment()
@@ -0,0 +1,153 @@
+"""
+fleet wide statistics over many reports, each read on its own into a partial result which are then merged
+
+    stats = aggregate(['site-1.xml', 'site-2.xml'], workers=4)
+    stats.per_severity.most_common(3)
+    stats.riskiest
+    len(stats.hosts)
+"""
+import hashlib
+import heapq
+import math
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, List, Optional, Tuple
+
+from nexpose.models.finding import VULNERABLE, address, findings, vulnerability_summaries
+from nexpose.models.stream import ReportReader
+
+# (risk score, address, site name) of a node
+RiskyNode = Tuple[float, str, str]
+
+INCLUDE = frozenset([
+    'nodes.address', 'nodes.device_id', 'nodes.site_name', 'nodes.site_importance', 'nodes.risk_score',
+    'nodes.tests.test_id', 'nodes.tests.status',
+    'nodes.endpoints.services.tests.test_id', 'nodes.endpoints.services.tests.status',
+])
+
+
+class HyperLogLog:
+    """
+    approximate count of distinct strings in 2 ** `precision` bytes, within about 1.04 / sqrt(2 ** `precision`)
+    """
+
+    def __init__(self, precision: int = 14) -> None:
+        if not 4 <= precision <= 18:
+            raise ValueError('precision {} not in [4, 18]'.format(precision))
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: str) -> None:
+        # a hash stable across processes, unlike `hash`
+        h = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        if other.precision != self.precision:
+            raise ValueError('cannot merge precisions {} and {}'.format(self.precision, other.precision))
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def __len__(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class FleetStatistics:
+    """
+    mergeable counts of vulnerable findings per vulnerability id and per severity, nodes per site importance, the
+    `top` riskiest nodes and the distinct hosts
+    """
+
+    def __init__(self, top: int = 10, precision: int = 14) -> None:
+        self.top = top
+        self.reports = 0
+        self.nodes = 0
+        self.per_vulnerability = Counter()  # type: Counter
+        self.per_severity = Counter()  # type: Counter
+        self.per_site_importance = Counter()  # type: Counter
+        self.hosts = HyperLogLog(precision)
+        self.__riskiest = []  # type: List[RiskyNode]
+
+    @property
+    def riskiest(self) -> List[RiskyNode]:
+        """
+        riskiest nodes, riskiest first
+        """
+        return sorted(self.__riskiest, reverse=True)
+
+    def __add_risky(self, node: RiskyNode) -> None:
+        if len(self.__riskiest) < self.top:
+            heapq.heappush(self.__riskiest, node)
+        elif node > self.__riskiest[0]:
+            heapq.heapreplace(self.__riskiest, node)
+
+    def add_node(self, node: Any, severities: Optional[dict] = None) -> None:
+        """
+        `severities` of the vulnerabilities by lowercase id, as `vulnerability_summaries`
+        """
+        self.nodes += 1
+        host = address(node)
+        self.hosts.add(host or str(node.device_id))
+        if node.site_importance is not None:
+            self.per_site_importance[node.site_importance.value] += 1
+        if node.risk_score is not None:
+            self.__add_risky((node.risk_score, host or '', node.site_name or ''))
+
+        for finding in findings(node, severities, VULNERABLE):
+            self.per_vulnerability[finding.vulnerability_id] += 1
+            self.per_severity[finding.severity] += 1
+
+    def add_report(self, source: Any) -> None:
+        """
+        read the report at `source`, never holding more than one of its nodes
+        """
+        severities = vulnerability_summaries(source)
+        reader = ReportReader(source, include=INCLUDE)
+        for node in reader:
+            self.add_node(node, severities)
+        self.reports += 1
+
+    def merge(self, other: 'FleetStatistics') -> None:
+        self.reports += other.reports
+        self.nodes += other.nodes
+        self.per_vulnerability.update(other.per_vulnerability)
+        self.per_severity.update(other.per_severity)
+        self.per_site_importance.update(other.per_site_importance)
+        self.hosts.merge(other.hosts)
+        for node in other.__riskiest:
+            self.__add_risky(node)
+
+
+def _aggregate_one(source: Any, top: int, precision: int) -> FleetStatistics:
+    ret = FleetStatistics(top, precision)
+    ret.add_report(source)
+    return ret
+
+
+def aggregate(sources: Iterable[Any], workers: Optional[int] = None, top: int = 10,
+              precision: int = 14) -> FleetStatistics:
+    """
+    statistics of the reports at `sources`, one after the other or in a pool of `workers` processes, in which
+    case the sources have to be paths or bytes
+    """
+    ret = FleetStatistics(top, precision)
+    if not workers:
+        for source in sources:
+            ret.add_report(source)
+        return ret
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_aggregate_one, source, top, precision) for source in sources]
+        for future in futures:
+            ret.merge(future.result())
+    return ret
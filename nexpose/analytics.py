@@ -0,0 +1,399 @@
+"""
+risk and cvss analytics over reports, vectorized with numpy (`pip install nexpose[analytics]`)
+
+    analytics = RiskAnalytics.load('report.xml')
+    analytics.sum_by('risk', by='site')
+    analytics.percentiles('cvss', (50, 90, 99))
+    analytics.top('cvss', 10, by='port')
+
+nodes, vulnerabilities and findings are held as arrays, their sites, subnets and vulnerabilities as integer codes,
+so that grouping is a `bincount` and top-k an `argpartition` rather than a python loop; addresses are packed in
+integers, so only ipv4 ones are handled
+"""
+import ipaddress
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    raise ImportError('nexpose.analytics needs numpy, install nexpose[analytics]') from e
+
+from nexpose.models.finding import Finding, VULNERABLE
+from nexpose.models.report import NexposeReport, Node, Vulnerability
+from nexpose.types import IP
+
+# fields of `NexposeReport.parse` needed by `RiskAnalytics`
+INCLUDE = frozenset([
+    'nodes.address', 'nodes.site_name', 'nodes.risk_score', 'nodes.tests.test_id', 'nodes.tests.status',
+    'nodes.endpoints.port', 'nodes.endpoints.services.tests.test_id', 'nodes.endpoints.services.tests.status',
+    'vulnerability_definition.vulnerability_id', 'vulnerability_definition.severity',
+    'vulnerability_definition.pci_severity', 'vulnerability_definition.cvss_score',
+])
+
+# values and whether they are one per node or one per finding
+VALUES = {
+    'risk': 'node',
+    'cvss': 'finding',
+    'severity': 'finding',
+    'pci_severity': 'finding',
+    'findings': 'finding',
+}
+GROUPS = {
+    'node': 'node',
+    'site': 'node',
+    'subnet': 'node',
+    'port': 'finding',
+    'vulnerability': 'finding',
+    'severity': 'finding',
+}
+
+NO_ADDRESS = -1
+NO_PORT = -1
+NO_SEVERITY = -1
+
+
+def _packed(address: Union[None, str, IP]) -> int:
+    if address is None:
+        return NO_ADDRESS
+    try:
+        return int(ipaddress.IPv4Address(address if isinstance(address, str) else bytes(address)))
+    except ValueError:
+        raise ValueError('only ipv4 addresses are handled, not {!r}'.format(address)) from None
+
+
+def _unpacked(packed: int) -> Optional[str]:
+    if packed == NO_ADDRESS:
+        return None
+    return '.'.join(str(packed >> shift & 255) for shift in (24, 16, 8, 0))
+
+
+class _Addresses(Sequence):
+    """
+    address of each node, only written out when read
+    """
+
+    def __init__(self, packed: 'np.ndarray') -> None:
+        self.packed = packed
+
+    def __len__(self) -> int:
+        return len(self.packed)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [_unpacked(int(packed)) for packed in self.packed[index]]
+        return _unpacked(int(self.packed[index]))
+
+
+class _Codes:
+    """
+    small integer code of each distinct key, in order of appearance
+    """
+
+    def __init__(self) -> None:
+        self.codes = {}  # type: Dict[Any, int]
+        self.keys = []  # type: List[Any]
+
+    def __call__(self, key: Any) -> int:
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.keys)
+            self.keys.append(key)
+        return code
+
+
+class _Builder:
+    def __init__(self, statuses: Optional[frozenset]) -> None:
+        self.statuses = statuses
+        self.status_values = None if statuses is None else frozenset(s.value for s in statuses)
+        self.sites = _Codes()
+        self.vulnerabilities = _Codes()
+        self.nodes = _Codes()
+
+        self.node_address = array('q')
+        self.node_site = array('q')
+        self.node_risk = array('d')
+
+        self.vulnerability_values = {}  # type: Dict[int, Tuple[int, int, float]]
+
+        self.finding_node = array('q')
+        self.finding_vulnerability = array('q')
+        self.finding_port = array('q')
+
+    def __node(self, key: Any, address: int, site: Optional[str], risk: Optional[float]) -> int:
+        code = self.nodes(key)
+        if code == len(self.node_address):
+            self.node_address.append(address)
+            self.node_site.append(self.sites(site))
+            self.node_risk.append(math.nan if risk is None else risk)
+        return code
+
+    def __finding(self, node: int, vulnerability_id: str, port: Optional[int]) -> None:
+        self.finding_node.append(node)
+        self.finding_vulnerability.append(self.vulnerabilities(vulnerability_id.lower()))
+        self.finding_port.append(NO_PORT if port is None else port)
+
+    def add_node(self, node: Node) -> None:
+        code = self.__node(len(self.nodes.keys), _packed(node.address), node.site_name, node.risk_score)
+        statuses = self.statuses
+        for test in node.tests:
+            if statuses is None or test.status in statuses:
+                self.__finding(code, test.id, None)
+        for endpoint in node.endpoints:
+            for service in endpoint.services:
+                for test in service.tests:
+                    if statuses is None or test.status in statuses:
+                        self.__finding(code, test.id, endpoint.port)
+
+    def add_vulnerability(self, vulnerability: Vulnerability) -> None:
+        code = self.vulnerabilities(vulnerability.vulnerability_id.lower())
+        self.vulnerability_values[code] = (
+            NO_SEVERITY if vulnerability.severity is None else vulnerability.severity,
+            NO_SEVERITY if vulnerability.pci_severity is None else vulnerability.pci_severity,
+            math.nan if vulnerability.cvss_score is None else vulnerability.cvss_score,
+        )
+
+    def add_finding(self, finding: Finding) -> None:
+        """
+        flat findings carry their node and vulnerability, the first finding of each defines them
+        """
+        if self.status_values is not None and finding.status not in self.status_values:
+            return
+        address = NO_ADDRESS if finding.address is None else _packed(finding.address)
+        node = self.__node((finding.address, finding.device_id), address, finding.site_name, finding.node_risk_score)
+
+        vulnerability = self.vulnerabilities(finding.vulnerability_id.lower())
+        if vulnerability not in self.vulnerability_values:
+            self.vulnerability_values[vulnerability] = (
+                NO_SEVERITY if finding.severity is None else finding.severity,
+                NO_SEVERITY,
+                math.nan if finding.cvss_score is None else finding.cvss_score,
+            )
+        self.__finding(node, finding.vulnerability_id, finding.port)
+
+    def build(self) -> 'RiskAnalytics':
+        missing = (NO_SEVERITY, NO_SEVERITY, math.nan)
+        values = [self.vulnerability_values.get(code, missing) for code in range(len(self.vulnerabilities.keys))]
+        severity, pci_severity, cvss = zip(*values) if values else ((), (), ())
+
+        return RiskAnalytics(
+            sites=self.sites.keys,
+            vulnerabilities=self.vulnerabilities.keys,
+            node_address=np.array(self.node_address, dtype=np.int64),
+            node_site=np.array(self.node_site, dtype=np.int32),
+            node_risk=np.array(self.node_risk, dtype=np.float64),
+            vulnerability_severity=np.array(severity, dtype=np.int16),
+            vulnerability_pci_severity=np.array(pci_severity, dtype=np.int16),
+            vulnerability_cvss=np.array(cvss, dtype=np.float64),
+            finding_node=np.array(self.finding_node, dtype=np.int32),
+            finding_vulnerability=np.array(self.finding_vulnerability, dtype=np.int32),
+            finding_port=np.array(self.finding_port, dtype=np.int32),
+        )
+
+
+class RiskAnalytics:
+    """
+    the values are the `risk` score of the nodes, and the `cvss` score, `severity` and `pci_severity` of the
+    vulnerability of each finding, or a count of `findings`; they are grouped by `node`, `site` or `subnet`, and the
+    ones of the findings also by `port`, `vulnerability` or `severity`
+
+    missing scores are NaN and left out, missing severities and ports are -1
+    """
+
+    def __init__(self, sites: Sequence[Optional[str]], vulnerabilities: Sequence[str], node_address: 'np.ndarray',
+                 node_site: 'np.ndarray', node_risk: 'np.ndarray', vulnerability_severity: 'np.ndarray',
+                 vulnerability_pci_severity: 'np.ndarray', vulnerability_cvss: 'np.ndarray',
+                 finding_node: 'np.ndarray', finding_vulnerability: 'np.ndarray',
+                 finding_port: 'np.ndarray') -> None:
+        self.sites = list(sites)
+        self.vulnerabilities = list(vulnerabilities)
+        self.node_address = node_address
+        self.node_site = node_site
+        self.node_risk = node_risk
+        self.vulnerability_severity = vulnerability_severity
+        self.vulnerability_pci_severity = vulnerability_pci_severity
+        self.vulnerability_cvss = vulnerability_cvss
+        self.finding_node = finding_node
+        self.finding_vulnerability = finding_vulnerability
+        self.finding_port = finding_port
+
+    @classmethod
+    def from_report(cls, report: NexposeReport, statuses: Optional[frozenset] = VULNERABLE) -> 'RiskAnalytics':
+        """
+        findings are the tests with a status in `statuses`, every test if None
+        """
+        builder = _Builder(statuses)
+        for node in report.nodes:
+            builder.add_node(node)
+        for vulnerability in report.vulnerability_definition:
+            builder.add_vulnerability(vulnerability)
+        return builder.build()
+
+    @classmethod
+    def load(cls, source: Any, statuses: Optional[frozenset] = VULNERABLE) -> 'RiskAnalytics':
+        """
+        read the report at `source` one record at a time
+        """
+        from nexpose.models.stream import ReportReader
+
+        builder = _Builder(statuses)
+        for record in ReportReader(source, include=INCLUDE):
+            if isinstance(record, Node):
+                builder.add_node(record)
+            elif isinstance(record, Vulnerability):
+                builder.add_vulnerability(record)
+        return builder.build()
+
+    @classmethod
+    def from_findings(cls, findings: Iterable[Finding], statuses: Optional[frozenset] = VULNERABLE) -> 'RiskAnalytics':
+        """
+        as read by `CSVReportReader`, a node is identified by its address and device id
+        """
+        builder = _Builder(statuses)
+        for finding in findings:
+            builder.add_finding(finding)
+        return builder.build()
+
+    @classmethod
+    def concatenate(cls, parts: Sequence['RiskAnalytics']) -> 'RiskAnalytics':
+        """
+        the nodes and findings of every part, each vulnerability and site once
+        """
+        sites, vulnerabilities = _Codes(), _Codes()
+        site_codes = [np.array([sites(site) for site in part.sites], dtype=np.int32) for part in parts]
+        vulnerability_codes = [np.array([vulnerabilities(v) for v in part.vulnerabilities], dtype=np.int32)
+                               for part in parts]
+
+        count = len(vulnerabilities.keys)
+        severity = np.full(count, NO_SEVERITY, dtype=np.int16)
+        pci_severity = np.full(count, NO_SEVERITY, dtype=np.int16)
+        cvss = np.full(count, np.nan)
+        for part, codes in zip(parts, vulnerability_codes):
+            severity[codes] = part.vulnerability_severity
+            pci_severity[codes] = part.vulnerability_pci_severity
+            cvss[codes] = part.vulnerability_cvss
+
+        offsets = np.cumsum([0] + [len(part.node_address) for part in parts[:-1]])
+
+        def joined(arrays: List['np.ndarray'], dtype: Any) -> 'np.ndarray':
+            return np.concatenate(arrays).astype(dtype) if arrays else np.empty(0, dtype=dtype)
+
+        return cls(
+            sites=sites.keys,
+            vulnerabilities=vulnerabilities.keys,
+            node_address=joined([part.node_address for part in parts], np.int64),
+            node_site=joined([codes[part.node_site] for part, codes in zip(parts, site_codes)], np.int32),
+            node_risk=joined([part.node_risk for part in parts], np.float64),
+            vulnerability_severity=severity,
+            vulnerability_pci_severity=pci_severity,
+            vulnerability_cvss=cvss,
+            finding_node=joined([part.finding_node + offset for part, offset in zip(parts, offsets)], np.int32),
+            finding_vulnerability=joined([codes[part.finding_vulnerability]
+                                          for part, codes in zip(parts, vulnerability_codes)], np.int32),
+            finding_port=joined([part.finding_port for part in parts], np.int32),
+        )
+
+    @property
+    def addresses(self) -> Sequence[Optional[str]]:
+        return _Addresses(self.node_address)
+
+    def values(self, name: str) -> 'np.ndarray':
+        """
+        the `name` values, one per node or one per finding as in `VALUES`
+        """
+        if name == 'risk':
+            return self.node_risk
+        if name == 'cvss':
+            return self.vulnerability_cvss[self.finding_vulnerability]
+        if name == 'severity':
+            return self.__severity(self.vulnerability_severity)
+        if name == 'pci_severity':
+            return self.__severity(self.vulnerability_pci_severity)
+        if name == 'findings':
+            return np.ones(len(self.finding_node))
+        raise ValueError('unknown values {!r}, one of {}'.format(name, sorted(VALUES)))
+
+    def __severity(self, severities: 'np.ndarray') -> 'np.ndarray':
+        ret = severities[self.finding_vulnerability].astype(np.float64)
+        ret[ret == NO_SEVERITY] = np.nan
+        return ret
+
+    def groups(self, by: str, level: str, prefix: int = 24) -> Tuple['np.ndarray', List[Any]]:
+        """
+        code of the group of each node or finding, as `level`, with the label of each code; `prefix` is the length of
+        the subnets
+        """
+        if by not in GROUPS:
+            raise ValueError('unknown group {!r}, one of {}'.format(by, sorted(GROUPS)))
+        if GROUPS[by] == 'finding' and level == 'node':
+            raise ValueError('values of the nodes cannot be grouped by {}'.format(by))
+
+        if by == 'node':
+            codes, labels = np.arange(len(self.node_address), dtype=np.int32), _Addresses(self.node_address)
+        elif by == 'site':
+            codes, labels = self.node_site, self.sites
+        elif by == 'subnet':
+            addresses = self.node_address
+            subnets = np.where(addresses == NO_ADDRESS, NO_ADDRESS, addresses >> (32 - prefix) << (32 - prefix))
+            uniques, codes = np.unique(subnets, return_inverse=True)
+            labels = [None if packed == NO_ADDRESS else '{}/{}'.format(_unpacked(int(packed)), prefix)
+                      for packed in uniques]
+        elif by == 'vulnerability':
+            return self.finding_vulnerability, self.vulnerabilities
+        else:
+            # ports and severities are small, their code is the value shifted past -1
+            raw = self.finding_port if by == 'port' else self.vulnerability_severity[self.finding_vulnerability]
+            top = int(raw.max()) if len(raw) else -1
+            return raw.astype(np.int32) + 1, [None] + list(range(top + 1))
+
+        if level == 'finding':
+            codes = codes[self.finding_node]
+        return codes, labels
+
+    def __grouped(self, values: str, by: str, prefix: int) -> Tuple['np.ndarray', 'np.ndarray', List[Any]]:
+        data = self.values(values)
+        codes, labels = self.groups(by, VALUES[values], prefix)
+        known = ~np.isnan(data)
+        if not known.all():
+            codes, data = codes[known], data[known]
+        sums = np.bincount(codes, weights=data, minlength=len(labels))
+        counts = np.bincount(codes, minlength=len(labels))
+        return sums, counts, labels
+
+    def sum_by(self, values: str, by: str, prefix: int = 24) -> Dict[Any, float]:
+        sums, counts, labels = self.__grouped(values, by, prefix)
+        return {labels[i]: float(sums[i]) for i in np.flatnonzero(counts)}
+
+    def mean_by(self, values: str, by: str, prefix: int = 24) -> Dict[Any, float]:
+        sums, counts, labels = self.__grouped(values, by, prefix)
+        return {labels[i]: float(sums[i] / counts[i]) for i in np.flatnonzero(counts)}
+
+    def percentiles(self, values: str, q: Sequence[float] = (50, 90, 99)) -> List[float]:
+        data = self.values(values)
+        data = data[~np.isnan(data)]
+        if not len(data):
+            return [math.nan] * len(q)
+        return [float(p) for p in np.percentile(data, q)]
+
+    def histogram(self, values: str, bins: Any = 10,
+                  value_range: Optional[Tuple[float, float]] = None) -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        counts and bin edges, as `numpy.histogram`
+        """
+        data = self.values(values)
+        return np.histogram(data[~np.isnan(data)], bins=bins, range=value_range)
+
+    def top(self, values: str, k: int, by: str = 'node', prefix: int = 24) -> List[Tuple[Any, float]]:
+        """
+        the `k` groups with the highest sum of `values`, highest first
+        """
+        sums, counts, labels = self.__grouped(values, by, prefix)
+        present = np.flatnonzero(counts)
+        sums = sums[present]
+        if k < len(sums):
+            best = np.argpartition(-sums, k - 1)[:k]
+        else:
+            best = np.arange(len(sums))
+        best = best[np.argsort(-sums[best], kind='stable')]
+        return [(labels[present[i]], float(sums[i])) for i in best]
@@ -0,0 +1,247 @@
+"""
+on disk cache of downloaded reports, keyed by their uri and generation date
+
+    cache = ReportCache('~/.cache/nexpose', max_bytes=1 << 30)
+    nexpose.extra.get_report_raw_xml_2(summary, cache=cache)
+
+reports are stored already parsed, so that a hit reads neither the network nor any xml; the least recently used are
+evicted once the cache grows over `max_bytes`
+
+they are stored as pickles, which can run any code when read back: the directory has to be private to the user, it
+is created with mode 0700, and never one where others can write
+
+`DownloadCache` keeps the raw reports instead, to be read as streams, and is shared with `SeenDefinitions` by the
+processes of `nexpose.pipeline` through file locks
+"""
+import datetime
+import hashlib
+import os
+import pickle
+import threading
+import time
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from nexpose.models.finding import value
+from nexpose.models.report import NexposeReport, Vulnerability
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None  # type: ignore
+
+# a temporary file left untouched this long belongs to a write which died without removing it
+STALE_SECONDS = 3600
+
+
+class CachedReport(NamedTuple):
+    report: NexposeReport
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+@contextmanager
+def locked(path: str) -> Iterator[None]:
+    """
+    lock held by a single process at a time on the file at `path`, created if missing; without fcntl, as on windows,
+    nothing is locked
+    """
+    with open(path, 'a') as f:
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _DiskCache:
+    """
+    files keyed by a report uri and generation date, the least recently used evicted over `max_bytes`
+    """
+
+    SUFFIX = ''
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30) -> None:
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self.sweep()
+
+    @staticmethod
+    def _key(uri: str, generated_on: Optional[datetime.datetime]) -> str:
+        return '{}\0{}'.format(uri, '' if generated_on is None else generated_on.isoformat())
+
+    def path_for(self, uri: str, generated_on: Optional[datetime.datetime]) -> str:
+        name = hashlib.sha1(self._key(uri, generated_on).encode()).hexdigest()
+        return os.path.join(self.directory, name + self.SUFFIX)
+
+    def _write(self, path: str, write: Callable[[BinaryIO], None]) -> None:
+        """
+        the file at `path` written by `write` at once, nothing being left behind if it fails
+        """
+        tmp = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+        try:
+            with open(tmp, 'wb') as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def sweep(self) -> None:
+        """
+        remove the temporary files of writes which died before cleaning up, as when their process was killed, since
+        eviction never sees them
+        """
+        limit = time.time() - STALE_SECONDS
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.tmp'):
+                try:
+                    if entry.stat().st_mtime < limit:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """
+        last use, size and path of each cached file, least recently used first
+        """
+        ret = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUFFIX):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                ret.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(ret)
+
+    def evict(self) -> None:
+        entries = self.entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        # the newest entry is kept even if it does not fit alone
+        for _, entry_size, path in entries[:-1]:
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+
+    def clear(self) -> None:
+        for _, _, path in self.entries():
+            os.remove(path)
+
+
+class ReportCache(_DiskCache):
+    """
+    reports pickled in `directory`, which has to be trusted, see the module documentation
+    """
+
+    VERSION = 1
+    SUFFIX = '.report'
+
+    def get(self, uri: str, generated_on: Optional[datetime.datetime]) -> Optional[CachedReport]:
+        path = self.path_for(uri, generated_on)
+        try:
+            with open(path, 'rb') as f:
+                version, key, report, etag, last_modified = pickle.load(f)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            return None
+        if version != self.VERSION or key != self._key(uri, generated_on):
+            return None
+
+        self._touch(path)
+        return CachedReport(report, etag, last_modified)
+
+    def put(self, uri: str, generated_on: Optional[datetime.datetime], report: NexposeReport,
+            etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        path = self.path_for(uri, generated_on)
+        state = self.VERSION, self._key(uri, generated_on), report, etag, last_modified
+
+        self._write(path, lambda f: pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL))
+        self.evict()
+
+
+class DownloadCache(_DiskCache):
+    """
+    raw xml reports shared between processes; a report is downloaded by only one of them while the others wait
+    """
+
+    SUFFIX = '.xml'
+    LOCKS = 256
+
+    def __lock_for(self, path: str) -> str:
+        # a fixed set of lock files, never removed, rather than one per report which eviction would race with
+        directory = os.path.join(self.directory, 'locks')
+        os.makedirs(directory, exist_ok=True)
+        stripe = int(os.path.basename(path)[:8], 16) % self.LOCKS
+        return os.path.join(directory, '{}.lock'.format(stripe))
+
+    def fetch(self, uri: str, generated_on: Optional[datetime.datetime],
+              download: Callable[[BinaryIO], None]) -> Tuple[BinaryIO, bool]:
+        """
+        the report opened for reading, and whether it was already cached; `download` writes it when missing
+        """
+        path = self.path_for(uri, generated_on)
+        with locked(self.__lock_for(path)):
+            try:
+                ret = open(path, 'rb')
+            except FileNotFoundError:
+                pass
+            else:
+                self._touch(path)
+                return ret, True
+
+            self._write(path, download)
+            ret = open(path, 'rb')
+
+        self.evict()
+        return ret, False
+
+
+class SeenDefinitions:
+    """
+    vulnerability definitions already seen by the processes sharing the file at `path`, by lowercase id and
+    modification date
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.__seen = set()  # type: set[str]
+        self.__offset = 0
+
+    def claim(self, vulnerabilities: Iterable[Vulnerability]) -> List[Vulnerability]:
+        """
+        the ones of `vulnerabilities` never seen before, from now on seen
+        """
+        with locked(self.path + '.lock'):
+            with open(self.path, 'a+', encoding='utf-8') as f:
+                f.seek(self.__offset)
+                self.__seen.update(f.read().splitlines())
+
+                ret = []
+                lines = []
+                for vulnerability in vulnerabilities:
+                    key = '{}\t{}'.format(vulnerability.vulnerability_id.lower(), value(vulnerability.modified))
+                    if key not in self.__seen:
+                        self.__seen.add(key)
+                        ret.append(vulnerability)
+                        lines.append(key + '\n')
+                f.write(''.join(lines))
+                self.__offset = f.tell()
+        return ret
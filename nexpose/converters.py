@@ -0,0 +1,47 @@
+"""
+converters of attribute values, the same dates, addresses and enum values being found all over a report
+"""
+import enum
+from functools import lru_cache
+from typing import Callable, Type, TypeVar
+
+from nexpose.types import str_to_IP
+from nexpose.utils import parse_date
+
+E = TypeVar('E', bound=enum.Enum)
+
+CACHE_SIZE = 1 << 16
+
+date = lru_cache(maxsize=CACHE_SIZE)(parse_date)
+ip = lru_cache(maxsize=CACHE_SIZE)(str_to_IP)
+
+
+class _Lookup(dict):
+    def __init__(self, enum_type: Type[E]) -> None:
+        super().__init__((member.value, member) for member in enum_type)
+        self.enum_type = enum_type
+
+    def __missing__(self, value: str) -> E:
+        return self.enum_type(value)  # let the enum handle aliases and raise its usual error
+
+
+_lookups = {}  # type: dict[type, Callable[[str], enum.Enum]]
+
+
+def lookup(enum_type: Type[E]) -> Callable[[str], E]:
+    """
+    same as calling `enum_type` on a value, with a single dict access
+    """
+    ret = _lookups.get(enum_type)
+    if ret is None:
+        ret = _lookups[enum_type] = _Lookup(enum_type).__getitem__
+    return ret
+
+
+def converter(convert: Callable[[str], object]) -> Callable[[str], object]:
+    """
+    fastest equivalent of `convert`
+    """
+    if isinstance(convert, type) and issubclass(convert, enum.Enum):
+        return lookup(convert)
+    return convert
@@ -0,0 +1,180 @@
+"""
+software inventory of the nodes of reports, by vendor and product, with version range queries
+
+    inventory = SoftwareInventory.load('report.xml')
+    inventory.hosts('OpenSSH', below='7.4')
+    inventory.os[(10, 0, 0, 1)].version
+
+the software of a node, the fingerprints of its services and the operating system it most certainly runs are
+indexed; versions are compared by their runs of digits, as numbers, and of letters, a version coming before the
+longer ones it starts
+"""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union, TYPE_CHECKING
+
+from nexpose.models.report import Fingerprint, NexposeReport, Node, OS
+from nexpose.types import IP
+
+if TYPE_CHECKING:
+    from nexpose.models.stream import Source  # noqa: F401
+
+INCLUDE = frozenset([
+    'nodes.address', 'nodes.fingerprints', 'nodes.software', 'nodes.endpoints.port',
+    'nodes.endpoints.services.fingerprints',
+])
+
+VERSION_PART = re.compile(r'\d+|[a-z]+')
+
+VersionKey = Tuple[Tuple[int, Union[int, str]], ...]
+
+# (lowercase vendor, lowercase product)
+ProductKey = Tuple[Optional[str], str]
+
+
+def version_key(version: Optional[str]) -> VersionKey:
+    """
+    key ordering versions, '6.6.1p1' before '6.10' and '7.4' before '7.4p1'; letters come before digits, so that
+    '2.0.beta' is before '2.0.1'
+    """
+    if version is None:
+        return ()
+    return tuple((0, part) if part.isalpha() else (1, int(part)) for part in VERSION_PART.findall(version.lower()))
+
+
+class Installation(NamedTuple):
+    address: IP
+    vendor: Optional[str]
+    product: str
+    version: Optional[str]
+    certainty: float
+    port: Optional[int]  # None for the software and the operating system of the node
+
+
+class _Versions:
+    """
+    installations of one product, sorted by version on the first query after an addition
+    """
+
+    __slots__ = ('keys', 'installations', 'dirty')
+
+    def __init__(self) -> None:
+        self.keys = []  # type: List[VersionKey]
+        self.installations = []  # type: List[Installation]
+        self.dirty = False
+
+    def add(self, key: VersionKey, installation: Installation) -> None:
+        self.keys.append(key)
+        self.installations.append(installation)
+        self.dirty = True
+
+    def between(self, low: Optional[VersionKey], high: Optional[VersionKey]) -> List[Installation]:
+        if self.dirty:
+            order = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+            self.keys = [self.keys[i] for i in order]
+            self.installations = [self.installations[i] for i in order]
+            self.dirty = False
+
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_left(self.keys, high)
+        return self.installations[start:end]
+
+
+class SoftwareInventory:
+    """
+    installations of each product and operating system of each node, to which nodes can be added as they are read
+    """
+
+    def __init__(self) -> None:
+        self.products = defaultdict(_Versions)  # type: dict[ProductKey, _Versions]
+        self.os = {}  # type: dict[IP, OS]
+
+    @classmethod
+    def build(cls, nodes: Iterable[Node]) -> 'SoftwareInventory':
+        ret = cls()
+        for node in nodes:
+            ret.add_node(node)
+        return ret
+
+    @classmethod
+    def from_report(cls, report: NexposeReport) -> 'SoftwareInventory':
+        return cls.build(report.nodes)
+
+    @classmethod
+    def load(cls, source: 'Source') -> 'SoftwareInventory':
+        """
+        inventory of a report read one node at a time, building only the fingerprints
+        """
+        from nexpose.models.stream import ReportReader
+
+        return cls.build(record for record in ReportReader(source, include=INCLUDE) if isinstance(record, Node))
+
+    def __add(self, address: IP, fingerprint: Fingerprint, port: Optional[int]) -> None:
+        if fingerprint.product is None:
+            return
+        vendor = None if fingerprint.vendor is None else fingerprint.vendor.lower()
+        self.products[vendor, fingerprint.product.lower()].add(version_key(fingerprint.version), Installation(
+            address=address, vendor=fingerprint.vendor, product=fingerprint.product, version=fingerprint.version,
+            certainty=fingerprint.certainty, port=port))
+
+    def add_node(self, node: Node) -> None:
+        systems = [fingerprint for fingerprint in node.fingerprints if isinstance(fingerprint, OS)]
+        if systems:
+            # ties go to the most specific version, then to the name, so that the choice does not depend on set order
+            best = max(systems, key=lambda os: (os.certainty, version_key(os.version), os.product or ''))
+            self.os[node.address] = best
+            self.__add(node.address, best, None)
+
+        for fingerprint in node.software:
+            self.__add(node.address, fingerprint, None)
+        for endpoint in node.endpoints:
+            for service in endpoint.services:
+                for fingerprint in service.fingerprints:
+                    self.__add(node.address, fingerprint, endpoint.port)
+
+    def merge(self, other: 'SoftwareInventory') -> None:
+        for key, versions in other.products.items():
+            for version, installation in zip(versions.keys, versions.installations):
+                self.products[key].add(version, installation)
+        self.os.update(other.os)
+
+    def __versions(self, product: str, vendor: Optional[str]) -> Iterator[_Versions]:
+        product = product.lower()
+        if vendor is not None:
+            versions = self.products.get((vendor.lower(), product))
+            if versions is not None:
+                yield versions
+            return
+        for (_, other), versions in self.products.items():
+            if other == product:
+                yield versions
+
+    def find(self, product: str, vendor: Optional[str] = None, minimum: Optional[str] = None,
+             below: Optional[str] = None, certainty: float = 0.0) -> List[Installation]:
+        """
+        installations of `product` from `vendor`, or any vendor when None, at `minimum` or after and before `below`,
+        by version; the ones of unknown version only match without bounds
+        """
+        low = None if minimum is None else version_key(minimum)
+        high = None if below is None else version_key(below)
+        if low is not None or high is not None:
+            # the empty key of an unknown version is before every other
+            low = max(low or (), ((0, ''),))
+
+        ret = []  # type: List[Installation]
+        for versions in self.__versions(product, vendor):
+            ret.extend(installation for installation in versions.between(low, high)
+                       if installation.certainty >= certainty)
+        return ret
+
+    def hosts(self, product: str, vendor: Optional[str] = None, minimum: Optional[str] = None,
+              below: Optional[str] = None, certainty: float = 0.0) -> FrozenSet[IP]:
+        """
+        addresses of the nodes running `product`, see `find`
+        """
+        return frozenset(installation.address
+                         for installation in self.find(product, vendor, minimum, below, certainty))
+
+    def __len__(self) -> int:
+        return sum(len(versions.keys) for versions in self.products.values())
@@ -2,11 +2,13 @@ import types
 from abc import ABCMeta, abstractmethod
 
 from lxml import etree
-from typing import Iterable, Any, cast, TypeVar, Generic, Callable, Optional
+from typing import Iterable, Iterator, Any, cast, TypeVar, Generic, Mapping, Optional, TYPE_CHECKING
 
-from nexpose.error import AttribNotFullyParsedError, SubElementNotFullyParsedError, TextNotFullyParsedError
 from nexpose.types import Element
 
+if TYPE_CHECKING:
+    from nexpose.models.schema import Schema  # noqa: F401
+
 
 class Object:
     def __repr__(self) -> str:
@@ -41,69 +43,49 @@ class Object:
 
 
 SubClass = TypeVar('SubClass')
-T = TypeVar('T')
 
 
 class XmlParse(Object, Generic[SubClass], metaclass=ABCMeta):
+    _schema: Optional['Schema'] = None
+
     @staticmethod
     @abstractmethod
     def _from_xml(xml: Element) -> SubClass:
         pass
 
-    @staticmethod
-    def __clean_str(text: Optional[str]) -> Optional[str]:
-        if text is None:
-            return None
-
-        res = text.strip()
-        if res == '':
-            res = None
-        return res
-
     @classmethod
     def from_xml(cls, xml: Element) -> SubClass:
-        children = list(xml.iter())
-        for elem in children:
-            elem.text = cls.__clean_str(elem.text)
-            elem.tail = cls.__clean_str(elem.tail)
-
-        ret = cls._from_xml(xml)  # type: SubClass
-
-        for elem in children:
-            if len(elem) > 0:
-                raise SubElementNotFullyParsedError(elem)
-            if elem.attrib:
-                raise AttribNotFullyParsedError(elem)
-            if elem.text is not None or elem.tail is not None:
-                raise TextNotFullyParsedError(elem)
-
-        return ret
-
-    @staticmethod
-    def _pop(xml: Element, key: str, to_apply: Callable[[str], T], default: Any = None,
-             invalid_values: Iterable[Any] = (None,)) -> T:
-        if key not in xml.attrib:
-            return default
+        """
+        `xml` is only read, so the same tree can be parsed again or shared between threads
+        """
+        return cls._from_xml(xml)
 
-        e = xml.attrib.pop(key)
-        if e in invalid_values:
-            return default
 
-        return to_apply(e)
+class XmlFormat(Object, metaclass=ABCMeta):
+    _schema: Optional['Schema'] = None
 
+    def _write_xml(self, root: Element) -> None:
+        pass
 
-class XmlFormat(Object, metaclass=ABCMeta):
-    @abstractmethod
     def _to_xml(self, root: Element) -> None:
         pass
 
     def to_xml(self) -> Element:
         root = etree.Element(self.__class__.__name__)
 
+        self._write_xml(root)
         self._to_xml(root)
 
         return root
 
+    def _stream_xml(self, xf: Any) -> Iterator[None]:
+        """
+        write the element of `to_xml` into the `etree.xmlfile` `xf`, yielding where the output can be sent; models
+        with many children write them one at a time
+        """
+        xf.write(self.to_xml())
+        yield
+
     def __bytes__(self) -> bytes:
         return etree.tostring(
             self.to_xml(),
@@ -111,3 +93,55 @@ class XmlFormat(Object, metaclass=ABCMeta):
             pretty_print=True,
             encoding='UTF-8'
         )
+
+
+class _Chunks:
+    """
+    file object keeping what is written until taken
+    """
+
+    def __init__(self) -> None:
+        self.parts = []  # type: list[bytes]
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        self.parts.append(data)
+        self.size += len(data)
+
+    def take(self) -> bytes:
+        ret = b''.join(self.parts)
+        self.parts = []
+        self.size = 0
+        return ret
+
+
+class XmlRequest:
+    """
+    request of root `tag` written one model of `body` at a time, so that neither its tree nor its bytes are ever
+    whole in memory; `chunks` can be called again to send it again
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, tag: str, attrib: Optional[Mapping[str, str]] = None, body: Iterable[XmlFormat] = ()) -> None:
+        self.tag = tag
+        self.attrib = dict(attrib or {})
+        self.body = list(body)
+
+    def chunks(self) -> Iterator[bytes]:
+        """
+        the request as chunks of about `CHUNK_SIZE` bytes, never empty
+        """
+        out = _Chunks()
+        with etree.xmlfile(out, encoding='UTF-8') as xf:
+            xf.write_declaration()
+            with xf.element(self.tag, self.attrib):
+                for model in self.body:
+                    for _ in model._stream_xml(xf):
+                        if out.size >= self.CHUNK_SIZE:
+                            yield out.take()
+        if out.size:
+            yield out.take()
+
+    def __bytes__(self) -> bytes:
+        return b''.join(self.chunks())
@@ -0,0 +1,223 @@
+"""
+reader of the csv reports of the console, `ReportConfigFormat.csv`, into flat findings
+
+    reader = CSVReportReader('report.csv', where=ReportFilter(min_severity=7))
+    for columns in reader.batches():
+        max(columns['severity'])
+    NDJSONSink('findings.ndjson').write_all(CSVReportReader('report.csv'))
+
+no tree is built: each row is converted to typed values, stored column by column, far cheaper than a raw-xml-v2
+parse when only the findings are needed
+"""
+import csv
+import io
+import itertools
+from typing import Any, Callable, Iterator, List, Optional, Sequence, TYPE_CHECKING
+
+from nexpose.models.finding import Finding
+from nexpose.models.report import TestStatus
+from nexpose.models.stream import Source, _open
+
+if TYPE_CHECKING:
+    from nexpose.models.filter import ReportFilter  # noqa: F401
+
+# status of the result codes of the console
+RESULT_CODES = {
+    've': TestStatus.vulnerable_exploited.value,
+    'vv': TestStatus.vulnerable_version.value,
+    'ov': TestStatus.overridden_vulnerable_version.value,
+    'nv': TestStatus.not_vulnerable.value,
+    'sv': TestStatus.skipped_version.value,
+    'sd': TestStatus.skipped_disabled.value,
+    'er': TestStatus.error.value,
+}
+
+
+Column = List[Any]
+
+
+def _optional(convert: Callable[[str], Any]) -> Callable[[Sequence[str]], Column]:
+    def ret(values: Sequence[str]) -> Column:
+        return [None if value == '' else convert(value) for value in values]
+    return ret
+
+
+def _str(values: Sequence[str]) -> Column:
+    return [value or None for value in values]
+
+
+def _status(values: Sequence[str]) -> Column:
+    # few distinct values, each converted once
+    statuses = {value: _status_value(value) for value in set(values)}
+    return [statuses[value] for value in values]
+
+
+def _status_value(raw: str) -> Optional[str]:
+    if raw == '':
+        return None
+    code = raw.lower()
+    if code in RESULT_CODES:
+        return RESULT_CODES[code]
+    # reports written with the status name instead of its code
+    try:
+        return TestStatus(code).value
+    except ValueError:
+        return TestStatus.unknown.value
+
+
+_int = _optional(int)
+_float = _optional(float)
+
+# field of `Finding` and converter of the values of each known column
+COLUMNS = {
+    'Asset IP Address': ('address', _str),
+    'Asset ID': ('device_id', _str),
+    'Site Name': ('site_name', _str),
+    'Site Importance': ('site_importance', _str),
+    'Asset Risk Score': ('node_risk_score', _float),
+    'Service Protocol': ('protocol', _str),
+    'Service Port': ('port', _int),
+    'Service Name': ('service', _str),
+    'Vulnerability ID': ('vulnerability_id', _str),
+    'Vulnerability Test Key': ('key', _str),
+    'Vulnerability Test Result Code': ('status', _status),
+    'Scan ID': ('scan_id', _str),
+    'Vulnerable Since': ('vulnerable_since', _str),
+    'Vulnerability PCI Compliance Status': ('pci_compliance_status', _str),
+    'Vulnerability Title': ('title', _str),
+    'Vulnerability Severity Level': ('severity', _int),
+    'Vulnerability CVSS Score': ('cvss_score', _float),
+}  # type: dict[str, tuple[str, Callable[[Sequence[str]], Column]]]
+
+# header of each field, as written by `write`
+HEADERS = {field: header for header, (field, _) in COLUMNS.items()}
+
+
+class FindingColumns:
+    """
+    findings stored column by column, a list of values per field of `Finding`; the fields missing from the report
+    have no column and read as None
+    """
+
+    def __init__(self, fields: Sequence[str]) -> None:
+        self.fields = tuple(fields)
+        self.columns = {field: [] for field in self.fields}  # type: dict[str, List[Any]]
+        self.__length = 0
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __getitem__(self, field: str) -> List[Any]:
+        if field not in Finding._fields:
+            raise KeyError(field)
+        return self.columns.get(field) or [None] * self.__length
+
+    def extend(self, columns: Sequence[Column]) -> None:
+        """
+        append the values of `columns`, one per field
+        """
+        for field, values in zip(self.fields, columns):
+            self.columns[field].extend(values)
+        if columns:
+            self.__length += len(columns[0])
+
+    def merge(self, other: 'FindingColumns') -> None:
+        if other.fields != self.fields:
+            raise ValueError('cannot merge columns {} and {}'.format(self.fields, other.fields))
+        for field in self.fields:
+            self.columns[field].extend(other.columns[field])
+        self.__length += len(other)
+
+    def rows(self) -> Iterator[Finding]:
+        columns = [self[field] for field in Finding._fields]
+        return (Finding._make(row) for row in zip(*columns))
+
+
+class CSVReportReader:
+    """
+    findings of the csv report at `source`, a path, bytes or a binary stream, only those accepted by `where`
+
+    iterating gives `Finding`s, `batches` gives `FindingColumns` of at most `batch_size` findings
+
+    `closing`, as the http response that `source` streams, is closed once the report is read or when the reader is
+    closed or used as a context manager
+    """
+
+    def __init__(self, source: Source, where: Optional['ReportFilter'] = None, batch_size: int = 10000,
+                 closing: Optional[Any] = None) -> None:
+        self.source = source
+        self.where = where
+        self.batch_size = batch_size
+        self.closing = closing
+
+    def __enter__(self) -> 'CSVReportReader':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.closing is not None:
+            self.closing.close()
+
+    def batches(self) -> Iterator[FindingColumns]:
+        stream, owned = _open(self.source)
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        try:
+            reader = csv.reader(text)
+            header = next(reader, None)
+            if header is None:
+                return
+
+            known = [(i, COLUMNS[name]) for i, name in enumerate(header) if name in COLUMNS]
+            fields = tuple(field for _, (field, _) in known)
+            if len(set(fields)) != len(fields):
+                raise ValueError('duplicated columns in {}'.format(header))
+            check = None if self.where is None else self.where.row_check(fields)
+
+            while True:
+                rows = [row for row in itertools.islice(reader, self.batch_size) if row]
+                if not rows:
+                    return
+
+                # converted a whole column at a time, far cheaper than a row at a time
+                raw = list(zip(*rows))
+                columns = [convert(raw[i]) for i, (_, convert) in known]
+                if check is not None and columns:
+                    keep = [check(row) for row in zip(*columns)]
+                    columns = [list(itertools.compress(values, keep)) for values in columns]
+
+                ret = FindingColumns(fields)
+                ret.extend(columns)
+                if len(ret):
+                    yield ret
+        finally:
+            text.detach()
+            if owned:
+                stream.close()
+            self.close()
+
+    def columns(self) -> FindingColumns:
+        """
+        every finding at once
+        """
+        ret = None  # type: Optional[FindingColumns]
+        for batch in self.batches():
+            if ret is None:
+                ret = batch
+            else:
+                ret.merge(batch)
+        return FindingColumns(()) if ret is None else ret
+
+    def __iter__(self) -> Iterator[Finding]:
+        for batch in self.batches():
+            yield from batch.rows()
+
+
+def write(findings: Iterator[Finding], out: io.TextIOBase) -> None:
+    """
+    write `findings` as a csv report with every known column
+    """
+    writer = csv.writer(out)
+    writer.writerow([HEADERS[field] for field in Finding._fields])
+    writer.writerows(('' if value is None else value for value in finding) for finding in findings)
@@ -1,43 +1,42 @@
-from typing import Iterable, Set
+from typing import Iterable, Set, Optional
 
 from nexpose.models import XmlParse
+from nexpose.error import SubElementNotFullyParsedError
+from nexpose.models.schema import Schema, Text, ChildList, compile_schemas, wrapped
 from nexpose.types import Element
-from nexpose.utils import xml_pop_list, xml_text_pop
+from nexpose.utils import xml_get_list
 
 
 class Message(XmlParse['Message']):
+    _schema = Schema(
+        message=Text(),
+    )
+
     def __init__(self, message: str) -> None:
         self.message = message
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'Message':
-        assert xml.tag == 'message'
-        return Message(
-            message=xml_text_pop(xml),
-        )
-
 
 class Stacktrace(XmlParse['Stacktrace']):
-    @staticmethod
-    def _from_xml(xml: Element):
-        assert xml.tag == 'stacktrace'
+    _schema = Schema(
+        tag='stacktrace',
+        text=Text(),
+    )
 
-        return Stacktrace()
+    def __init__(self, text: Optional[str] = None) -> None:
+        self.text = text
 
 
 class Exception(XmlParse['Exception']):
+    _schema = Schema(
+        tag='Exception',
+        messages=ChildList('message', Message),
+        stacktraces=ChildList('stacktrace', Stacktrace),
+    )
+
     def __init__(self, messages: Set[Message], stacktraces: Set[Stacktrace]) -> None:
         self.messages = messages
         self.stacktraces = stacktraces
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'Exception':
-        assert xml.tag == 'Exception'
-        return Exception(
-            messages={Message.from_xml(x) for x in xml_pop_list(xml, 'message')},
-            stacktraces={Stacktrace.from_xml(stack) for stack in xml_pop_list(xml, 'stacktrace')},
-        )
-
 
 class Failure(XmlParse['Failure']):
     def __init__(self, messages: Iterable[Message], exceptions: Iterable[Exception]) -> None:
@@ -47,11 +46,17 @@ class Failure(XmlParse['Failure']):
     @staticmethod
     def _from_xml(xml: Element) -> 'Failure':
         assert xml.tag == 'Failure'
+        children = wrapped(xml)
 
-        messages = xml_pop_list(xml, 'Message') or xml_pop_list(xml, 'message')
-        exceptions = xml_pop_list(xml, 'Exception')
+        messages = xml_get_list(xml, 'Message') or xml_get_list(xml, 'message')
+        exceptions = xml_get_list(xml, 'Exception')
+        if len(messages) + len(exceptions) != len(children):
+            raise SubElementNotFullyParsedError(xml)
 
         return Failure(
             messages={Message.from_xml(x) for x in messages},
             exceptions={Exception.from_xml(x) for x in exceptions},
         )
+
+
+compile_schemas(globals())
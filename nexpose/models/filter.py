@@ -0,0 +1,128 @@
+"""
+predicates checked on the attributes of an element before anything below it is built
+"""
+import ipaddress
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Sequence, Tuple, Union
+
+from nexpose.models.report import Endpoint, Node, Test, TestStatus, Vulnerability
+
+Check = Callable[[Mapping[str, str]], bool]
+RowCheck = Callable[[Sequence[Any]], bool]
+
+
+def _key(address: Any) -> Tuple[int, int]:
+    """
+    an address as a comparable key, ipv4 and ipv6 ones never being in the range of the other
+    """
+    address = ipaddress.ip_address(address)
+    return address.version, int(address)
+
+
+def _ranges(networks: Iterable[Any]) -> Tuple[Tuple[Tuple[int, int], Tuple[int, int]], ...]:
+    return tuple((_key(n.network_address), _key(n.broadcast_address)) for n in networks)
+
+
+class ReportFilter:
+    """
+    keep only the nodes in `networks`, the tests with a status in `test_statuses` and whose vulnerability has a
+    severity of at least `min_severity`, the endpoints on `ports`, and the vulnerabilities of at least
+    `min_severity`
+
+    a node, test or endpoint which is left out is dropped with its whole subtree; a node is kept even if none of its
+    tests are
+    """
+
+    def __init__(self, networks: Optional[Iterable[str]] = None,
+                 test_statuses: Optional[Iterable[Union[TestStatus, str]]] = None,
+                 min_severity: Optional[int] = None, ports: Optional[Iterable[int]] = None) -> None:
+        self.networks = None if networks is None else tuple(ipaddress.ip_network(n) for n in networks)
+        self.test_statuses = None if test_statuses is None else frozenset(TestStatus(s) for s in test_statuses)
+        self.min_severity = min_severity
+        self.ports = None if ports is None else frozenset(ports)
+
+    @property
+    def needs_severities(self) -> bool:
+        """
+        tests are read before the vulnerability definitions, so their severity has to be known beforehand
+        """
+        return self.min_severity is not None
+
+    def checks(self, severities: Optional[Mapping[str, int]] = None) -> Dict[type, Check]:
+        """
+        check of the start tag attributes per model, `severities` by lowercase vulnerability id when
+        `needs_severities`
+        """
+        ret = {}  # type: Dict[type, Check]
+
+        if self.networks is not None:
+            ranges = _ranges(self.networks)
+
+            def node(attrib: Mapping[str, str]) -> bool:
+                address = _key(attrib['address'])
+                return any(first <= address <= last for first, last in ranges)
+
+            ret[Node] = node
+
+        test_checks = []  # type: list
+        if self.test_statuses is not None:
+            statuses = frozenset(s.value for s in self.test_statuses)
+            test_checks.append(lambda attrib: attrib.get('status') in statuses)
+        if self.min_severity is not None:
+            if severities is None:
+                raise ValueError('filtering on severity needs the severities of the vulnerabilities')
+            min_severity = self.min_severity
+            test_checks.append(lambda attrib: severities.get(attrib.get('id', '').lower(), -1) >= min_severity)
+            ret[Vulnerability] = lambda attrib: int(attrib['severity']) >= min_severity
+        if len(test_checks) == 1:
+            ret[Test] = test_checks[0]
+        elif test_checks:
+            first, second = test_checks
+            ret[Test] = lambda attrib: first(attrib) and second(attrib)
+
+        if self.ports is not None:
+            ports = self.ports
+            ret[Endpoint] = lambda attrib: int(attrib['port']) in ports
+
+        return ret
+
+    def row_check(self, fields: Sequence[str]) -> RowCheck:
+        """
+        check of a flat finding holding `fields`, as a `Finding` or a row of a csv report, with the same meaning as
+        `checks`: a finding without port is not on an endpoint and so kept whatever `ports`
+        """
+        position = {name: i for i, name in enumerate(fields)}
+
+        def column(name: str) -> int:
+            if name not in position:
+                raise ValueError('filtering on {} needs a {} column'.format(name, name))
+            return position[name]
+
+        checks = []  # type: list[RowCheck]
+
+        if self.networks is not None:
+            ranges = _ranges(self.networks)
+            address = column('address')
+
+            def node(row: Sequence[Any]) -> bool:
+                if row[address] is None:
+                    return False
+                value = _key(row[address])
+                return any(first <= value <= last for first, last in ranges)
+
+            checks.append(node)
+
+        if self.test_statuses is not None:
+            statuses = frozenset(s.value for s in self.test_statuses)
+            status = column('status')
+            checks.append(lambda row: row[status] in statuses)
+        if self.min_severity is not None:
+            min_severity = self.min_severity
+            severity = column('severity')
+            checks.append(lambda row: row[severity] is not None and row[severity] >= min_severity)
+
+        if self.ports is not None:
+            ports = self.ports
+            port = column('port')
+            checks.append(lambda row: row[port] is None or row[port] in ports)
+
+        return lambda row: all(check(row) for check in checks)
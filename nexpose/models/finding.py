@@ -0,0 +1,96 @@
+"""
+flat records of the tests of a node, one per test with its endpoint, service and vulnerability
+"""
+import datetime
+from enum import Enum
+from typing import Any, Iterator, Mapping, NamedTuple, Optional, Tuple
+
+from nexpose.models.report import Node, Test, TestStatus
+
+VULNERABLE = frozenset({TestStatus.vulnerable_version, TestStatus.vulnerable_exploited})
+
+# fields of `NexposeReport.parse` needed by `findings`
+INCLUDE = frozenset(
+    ['nodes.' + name for name in ('address', 'device_id', 'site_name', 'site_importance', 'risk_score')] +
+    ['nodes.tests.' + name for name in ('test_id', 'key', 'status', 'scan_id', 'vulnerable_since',
+                                         'pci_compliance_status')] +
+    ['nodes.endpoints.protocol', 'nodes.endpoints.port', 'nodes.endpoints.services.name'] +
+    ['nodes.endpoints.services.tests.' + name for name in ('test_id', 'key', 'status', 'scan_id',
+                                                           'vulnerable_since', 'pci_compliance_status')]
+)
+
+# title, severity and cvss score of a vulnerability, by lowercase id
+VulnerabilitySummaries = Mapping[str, Tuple[Optional[str], Optional[int], Optional[float]]]
+
+
+class Finding(NamedTuple):
+    address: Optional[str]
+    device_id: Optional[str]
+    site_name: Optional[str]
+    site_importance: Optional[str]
+    node_risk_score: Optional[float]
+    protocol: Optional[str]
+    port: Optional[int]
+    service: Optional[str]
+    vulnerability_id: str
+    key: Optional[str]
+    status: Optional[str]
+    scan_id: Optional[str]
+    vulnerable_since: Optional[str]
+    pci_compliance_status: Optional[str]
+    title: Optional[str]
+    severity: Optional[int]
+    cvss_score: Optional[float]
+
+
+def value(raw: Any) -> Any:
+    """
+    `raw` as a plain string or number
+    """
+    if isinstance(raw, Enum):
+        return raw.value
+    if isinstance(raw, datetime.datetime):
+        return raw.isoformat()
+    return raw
+
+
+def address(node: Node) -> Optional[str]:
+    return None if node.address is None else '.'.join(str(i) for i in node.address)
+
+
+def findings(node: Node, vulnerabilities: VulnerabilitySummaries = None,
+             statuses: Optional[frozenset] = VULNERABLE) -> Iterator[Finding]:
+    """
+    findings of the tests of `node` and of its services with a status in `statuses`, every test if None
+    """
+    vulnerabilities = vulnerabilities or {}
+    head = (address(node), node.device_id, node.site_name, value(node.site_importance), node.risk_score)
+
+    def finding(protocol: Optional[str], port: Optional[int], service: Optional[str], test: Test) -> Finding:
+        title, severity, cvss_score = vulnerabilities.get(test.id.lower(), (None, None, None))
+        return Finding(*head, protocol, port, service, test.id, test.key, value(test.status), test.scan_id,
+                       value(test.vulnerable_since), value(test.pci_compliance_status), title, severity,
+                       cvss_score)
+
+    for test in node.tests:
+        if statuses is None or test.status in statuses:
+            yield finding(None, None, None, test)
+    for endpoint in node.endpoints:
+        protocol = value(endpoint.protocol)
+        for service in endpoint.services:
+            for test in service.tests:
+                if statuses is None or test.status in statuses:
+                    yield finding(protocol, endpoint.port, service.name, test)
+
+
+def vulnerability_summaries(source: Any) -> VulnerabilitySummaries:
+    """
+    title, severity and cvss score of each vulnerability of the report at `source`, read without building it
+    """
+    from nexpose.models.stream import vulnerability_attributes
+
+    return {
+        vulnerability_id: (title, None if severity is None else int(severity), None if cvss is None else float(cvss))
+        for vulnerability_id, (title, severity, cvss)
+        in vulnerability_attributes(source, ('title', 'severity', 'cvssScore')).items()
+    }
@@ -1,18 +1,23 @@
 import abc
 import datetime
-from abc import abstractmethod
 from enum import Enum
 from uuid import uuid4
 
 from lxml.etree import SubElement
-from typing import Callable, Mapping, Optional, Set, Union, List, TypeVar, Generic, Tuple
+from typing import Dict, Optional, Set, Union, TypeVar, Generic, Tuple, Iterable, TYPE_CHECKING
 
-from nexpose.error import WeirdXMLError
+from nexpose.error import WeirdXMLError, TextNotFullyParsedError
 from nexpose.models import XmlParse, XmlFormat
+from nexpose.models.schema import Schema, Attr, Text, Child, Children, ChildList, compile_schemas, check_element
 from nexpose.models.scan import Scan
 from nexpose.models.site import Site
-from nexpose.types import Element, IP, str_to_IP
-from nexpose.utils import xml_pop, parse_date, xml_pop_children, xml_pop_list, xml_text_pop, xml_tail_pop
+from nexpose.converters import date, ip
+from nexpose.types import Element, IP
+from nexpose.utils import xml_text, xml_tail
+
+if TYPE_CHECKING:
+    from nexpose.models.filter import ReportFilter
+    from nexpose.models.stream import Source
 
 T = TypeVar('T')
 
@@ -34,6 +39,16 @@ class ReportTemplateSummaryType(Enum):
 
 
 class ReportTemplateSummary(XmlParse['ReportTemplateSummary']):
+    _schema = Schema(
+        tag='ReportTemplateSummary',
+        template_id=Attr('id'),
+        name=Attr('name'),
+        builtin=Attr('builtin', bool),
+        scope=Attr('scope', ReportScope),
+        template_type=Attr('type', ReportTemplateSummaryType),
+        description=Child('description', 'Description'),
+    )
+
     def __init__(self, template_id: str, name: str, builtin: bool, scope: ReportScope,
                  template_type: ReportTemplateSummaryType, description: 'Description') -> None:
         self.id = template_id
@@ -43,18 +58,6 @@ class ReportTemplateSummary(XmlParse['ReportTemplateSummary']):
         self.template_type = template_type
         self.description = description
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'ReportTemplateSummary':
-        assert xml.tag == 'ReportTemplateSummary'
-        return ReportTemplateSummary(
-            template_id=xml.attrib.pop('id'),
-            name=xml.attrib.pop('name'),
-            builtin=bool(xml.attrib.pop('builtin')),
-            scope=ReportScope(xml.attrib.pop('scope')),
-            template_type=ReportTemplateSummaryType(xml.attrib.pop('type')),
-            description=Description.from_xml(xml_pop(xml, 'description')),
-        )
-
 
 class ReportConfigFormat(Enum):
     pdf = 'pdf'
@@ -71,6 +74,13 @@ class ReportConfigFormat(Enum):
 
 
 class ReportConfig(XmlFormat):
+    _schema = Schema(
+        report_id=Attr('id', source='id'),
+        name=Attr('name'),
+        template=Attr('template-id', source='template.id'),
+        report_format=Attr('format', source='format.value'),
+    )
+
     def __init__(self, template: ReportTemplateSummary, report_format: ReportConfigFormat, site: Site,
                  report_id: int = -1,
                  name: Optional[str] = None) -> None:
@@ -84,13 +94,6 @@ class ReportConfig(XmlFormat):
         self.name = name
 
     def _to_xml(self, root: Element) -> None:
-        root.attrib.update({
-            'id': str(self.id),
-            'name': self.name,
-            'template-id': self.template.id,
-            'format': self.format.value,
-        })
-
         filters = SubElement(root, 'Filters')
         SubElement(filters, 'filter', attrib={
             'type': 'site',
@@ -110,6 +113,13 @@ class ReportSummaryStatus(Enum):
 
 
 class ReportSummary(XmlParse['ReportSummary']):
+    _schema = Schema(
+        summary_id=Attr('id', optional=True),
+        config_id=Attr('cfg-id'),
+        status=Attr('status', ReportSummaryStatus),
+        uri=Attr('report-URI', optional=True),
+    )
+
     def __init__(self, summary_id: Optional[int], config_id: int, status: ReportSummaryStatus,
                  uri: Optional[str]) -> None:
         self.summary_id = summary_id
@@ -117,15 +127,6 @@ class ReportSummary(XmlParse['ReportSummary']):
         self.status = status
         self.uri = uri
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'ReportSummary':
-        return ReportSummary(
-            summary_id=xml.attrib.pop('id', None),
-            config_id=xml.attrib.pop('cfg-id'),
-            status=ReportSummaryStatus(xml.attrib.pop('status')),
-            uri=xml.attrib.pop('report-URI', None),
-        )
-
 
 class ReportConfigSummary(XmlParse['ReportConfigSummary']):
     """
@@ -134,6 +135,16 @@ class ReportConfigSummary(XmlParse['ReportConfigSummary']):
      - `date` can be empty string
     """
 
+    _schema = Schema(
+        template_id=Attr('template-id'),
+        config_id=Attr('cfg-id'),
+        status=Attr('status', ReportSummaryStatus),
+        generated_on=Attr('generated-on', date, invalid=['']),
+        report_uri=Attr('report-URI', optional=True),
+        scope=Attr('scope', ReportScope, optional=True),
+        name=Attr('name', optional=True),
+    )
+
     def __init__(self, template_id: str, config_id: str, status: ReportSummaryStatus, generated_on: datetime.datetime,
                  report_uri: Optional[str], scope: Optional[ReportScope], name: Optional[str]) -> None:
         self.template_id = template_id
@@ -145,32 +156,22 @@ class ReportConfigSummary(XmlParse['ReportConfigSummary']):
 
         self.name = name
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'ReportConfigSummary':
-
-        generated_on_raw = xml.attrib.pop('generated-on')
-        if generated_on_raw == '':
-            generated_on = None
-        else:
-            generated_on = parse_date(generated_on_raw)
-
-        return ReportConfigSummary(
-            template_id=xml.attrib.pop('template-id'),
-            config_id=xml.attrib.pop('cfg-id'),
-            status=ReportSummaryStatus(xml.attrib.pop('status')),
-            generated_on=generated_on,
-            report_uri=xml.attrib.pop('report-URI', None),
-            scope=XmlParse._pop(xml, 'scope', ReportScope),
-
-            name=xml.attrib.pop('name', None),
-        )
-
 
 class Fingerprint(XmlParse['Fingerprint']):
     """
     certainty="0.90" family="vsFTPd" product="vsFTPd" version="2.3.4"
     """
 
+    _schema = Schema(
+        tag='fingerprint',
+        variants={'os': 'OS'},
+        product=Attr('product', optional=True),
+        certainty=Attr('certainty', float),
+        family=Attr('family', optional=True),
+        version=Attr('version', optional=True),
+        vendor=Attr('vendor', optional=True),
+    )
+
     def __init__(self, product: str, certainty: float, family: Optional[str], version: Optional[str],
                  vendor: Optional[str]) -> None:
         self.product = product
@@ -179,27 +180,6 @@ class Fingerprint(XmlParse['Fingerprint']):
         self.version = version
         self.vendor = vendor
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'Fingerprint':
-        fingerprint = Fingerprint(
-            product=xml.attrib.pop('product', None),
-            certainty=float(xml.attrib.pop('certainty')),
-            family=xml.attrib.pop('family', None),
-            version=xml.attrib.pop('version', None),
-            vendor=xml.attrib.pop('vendor', None),
-        )
-
-        childs = {
-            'os': OS.from_sub_xml,
-            'fingerprint': Fingerprint.from_sub_xml,
-        }  # type: Mapping[str, Callable[['Fingerprint', Element], 'Fingerprint']]
-
-        return childs[xml.tag](fingerprint, xml)
-
-    @staticmethod
-    def from_sub_xml(fingerprint: 'Fingerprint', xml: Element) -> 'Fingerprint':
-        return fingerprint
-
 
 class DeviceClass(Enum):
     general = 'General'
@@ -208,35 +188,27 @@ class DeviceClass(Enum):
 
 
 class OS(Fingerprint):
+    _schema = Fingerprint._schema.extend(
+        tag='os',
+        device_class=Attr('device-class', DeviceClass, optional=True),
+        arch=Attr('arch', optional=True),
+    )
+
     def __init__(self, product: str, certainty: float, family: Optional[str], version: Optional[str],
                  device_class: Optional[DeviceClass], vendor: Optional[str], arch: Optional[str]) -> None:
         super().__init__(product=product, certainty=certainty, family=family, version=version, vendor=vendor)
         self.device_class = device_class
         self.arch = arch
 
-    @staticmethod
-    def from_sub_xml(fingerprint: Fingerprint, xml: Element) -> 'OS':
-        return OS(
-            product=fingerprint.product,
-            certainty=fingerprint.certainty,
-            family=fingerprint.family,
-            version=fingerprint.version,
-            device_class=XmlParse._pop(xml, 'device-class', DeviceClass),
-            vendor=fingerprint.vendor,
-            arch=xml.attrib.pop('arch', None),
-        )
-
 
 class Name(XmlParse['Name']):
+    _schema = Schema(
+        text=Text(),
+    )
+
     def __init__(self, text: str) -> None:
         self.text = text
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'Name':
-        return Name(
-            text=xml_text_pop(xml),
-        )
-
 
 class PortStatus(Enum):
     open = 'open'
@@ -248,17 +220,15 @@ class Protocol(Enum):
 
 
 class Config(XmlParse['Config']):
+    _schema = Schema(
+        name=Attr('name'),
+        text=Text(),
+    )
+
     def __init__(self, name: str, text: str) -> None:
         self.name = name
         self.text = text
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'Config':
-        return Config(
-            name=xml.attrib.pop('name'),
-            text=xml_text_pop(xml),
-        )
-
 
 class TestStatus(Enum):
     not_vulnerable = 'not-vulnerable'
@@ -295,15 +265,19 @@ def dispatch_single_nested(xml: Element) -> NestedType:
 def dispatch_nested_parsing(xml: Element) -> Tuple[NestedType, ...]:
     children = list(xml)
     for child in children:
-        xml.remove(child)
+        if xml_tail(child) is not None:
+            raise TextNotFullyParsedError(child)
 
     return tuple(dispatch_single_nested(child) for child in children)
 
 
 class TextElement(XmlParse[T], Generic[T], metaclass=abc.ABCMeta):
-    @abstractmethod
     def __str__(self) -> str:
-        pass
+        """
+        plain text, see `nexpose.render` for markdown and html
+        """
+        from nexpose.render import PLAIN
+        return PLAIN.render(self)
 
 
 class MultiNestedElement(TextElement[T], Generic[T], metaclass=abc.ABCMeta):
@@ -311,25 +285,21 @@ class MultiNestedElement(TextElement[T], Generic[T], metaclass=abc.ABCMeta):
         self.nested = nested
 
     @staticmethod
-    def _parse_nested(xml: Element) -> Tuple[Union[str, NestedType], ...]:
-        ret = [xml_text_pop(xml), xml_tail_pop(xml)]  # type: List[Union[str, NestedType]]
+    def _parse_nested(xml: Element, with_text: bool = True) -> Tuple[Union[str, NestedType], ...]:
+        ret = [xml_text(xml)] if with_text else []  # type: list[Union[str, NestedType]]
 
         for child in xml:
-            xml.remove(child)
-            tail = xml_tail_pop(child)
             ret.append(dispatch_single_nested(child))
-            ret.append(tail)
+            ret.append(xml_tail(child))
 
         return tuple(r for r in ret if r is not None)
 
-    def __str__(self) -> str:
-        return ''.join(str(nested) for nested in self.nested)
-
 
 class Description(MultiNestedElement['Description']):
     @staticmethod
     def _from_xml(xml: Element):
         assert xml.tag == 'description'
+        check_element(xml, children=True, text=True)
 
         return Description(
             nested=Description._parse_nested(xml),
@@ -344,32 +314,25 @@ class URLLink(TextElement['URLLink']):
 
     @staticmethod
     def _from_xml(xml: Element):
-        if xml.attrib['LinkURL'] != xml.attrib.pop('href', xml.attrib['LinkURL']):
+        check_element(xml, attributes=('LinkURL', 'LinkTitle', 'href'), text=True)
+        if xml.attrib['LinkURL'] != xml.attrib.get('href', xml.attrib['LinkURL']):
             raise WeirdXMLError('{} != {}', xml.attrib['LinkURL'], xml.attrib['href'])
 
         return URLLink(
-            url=xml.attrib.pop('LinkURL'),
-            title=xml.attrib.pop('LinkTitle'),
-            text=xml_text_pop(xml),
+            url=xml.attrib['LinkURL'],
+            title=xml.attrib['LinkTitle'],
+            text=xml_text(xml),
         )
 
-    def __str__(self) -> str:
-        return '[{}]({})'.format(self.title, self.url)
-
 
 class OrderedList(TextElement['OrderedList']):
+    _schema = Schema(
+        elements=ChildList('ListItem', 'ListItem', container=tuple),
+    )
+
     def __init__(self, elements: Tuple[NestedType, ...]) -> None:
         self.elements = elements
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        return OrderedList(
-            elements=tuple(ListItem.from_xml(item) for item in xml_pop_list(xml, 'ListItem')),
-        )
-
-    def __str__(self) -> str:
-        return '\n'.join(' - {}'.format(element) for element in self.elements)
-
 
 class ContainerBlockElement(MultiNestedElement['ContainerBlockElement']):
     def __init__(self, nested: Tuple[NestedType, ...], text: Optional[str]) -> None:
@@ -378,63 +341,47 @@ class ContainerBlockElement(MultiNestedElement['ContainerBlockElement']):
 
     @staticmethod
     def _from_xml(xml: Element):
+        check_element(xml, children=True, text=True)
+
         return ContainerBlockElement(
             nested=dispatch_nested_parsing(xml),
-            text=xml_text_pop(xml),
+            text=xml_text(xml),
         )
 
-    def __str__(self) -> str:
-        return '\n'.join(str(nested) for nested in self.nested)
-
 
 class TableCell(TextElement['TableCell']):
+    _schema = Schema(
+        tag='TableCell',
+        content=Child('Paragraph', 'Paragraph'),
+    )
+
     def __init__(self, content: 'Paragraph') -> None:
         self.content = content
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        assert xml.tag == 'TableCell'
-        return TableCell(
-            content=Paragraph.from_xml(xml_pop(xml, 'Paragraph')),
-        )
-
-    def __str__(self) -> str:
-        return '{}'.format(self.content)
-
 
 class TableRow(TextElement['TableRow']):
+    _schema = Schema(
+        tag='TableRow',
+        title=Attr('RowTitle'),
+        cells=ChildList('TableCell', TableCell, container=tuple),
+    )
+
     def __init__(self, title: str, cells: Tuple[TableCell, ...]) -> None:
         self.title = title
         self.cells = cells
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        assert xml.tag == 'TableRow'
-        return TableRow(
-            title=xml.attrib.pop('RowTitle'),
-            cells=tuple(TableCell.from_xml(cell) for cell in xml_pop_list(xml, 'TableCell')),
-        )
-
-    def __str__(self) -> str:
-        return '{}\t{}'.format(self.title, '\t'.join(str(cell) for cell in self.cells))
-
 
 class Table(TextElement['Table']):
+    _schema = Schema(
+        tag='Table',
+        title=Attr('TableTitle'),
+        rows=ChildList('TableRow', TableRow, container=tuple),
+    )
+
     def __init__(self, title: str, rows: Tuple[TableRow, ...]) -> None:
         self.title = title
         self.rows = rows
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        assert xml.tag == 'Table'
-        return Table(
-            title=xml.attrib.pop('TableTitle'),
-            rows=tuple(TableRow.from_xml(row) for row in xml_pop_list(xml, 'TableRow')),
-        )
-
-    def __str__(self) -> str:
-        return '{}\n{}'.format(self.title, '\n'.join(str(row) for row in self.rows))
-
 
 class ListItem(MultiNestedElement['ListItem']):
     def __init__(self, text: str, nested: Tuple[NestedType, ...]) -> None:
@@ -443,28 +390,22 @@ class ListItem(MultiNestedElement['ListItem']):
 
     @staticmethod
     def _from_xml(xml: Element):
+        check_element(xml, children=True, text=True)
+
         return ListItem(
-            text=xml_text_pop(xml),
-            nested=ListItem._parse_nested(xml),
+            text=xml_text(xml),
+            nested=ListItem._parse_nested(xml, with_text=False),
         )
 
-    def __str__(self) -> str:
-        return '{}\n{}'.format(self.text, '\n'.join(str(nested) for nested in self.nested))
-
 
 class UnorderedList(TextElement['UnorderedList']):
+    _schema = Schema(
+        items=ChildList('ListItem', 'ListItem'),
+    )
+
     def __init__(self, items: Set[ListItem]) -> None:
         self.items = frozenset(items)
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        return UnorderedList(
-            items={ListItem.from_xml(item) for item in xml_pop_list(xml, 'ListItem')}
-        )
-
-    def __str__(self) -> str:
-        return '\n'.join(' - {}'.format(item) for item in self.items)
-
 
 class Paragraph(MultiNestedElement['Paragraph']):
     def __init__(self, nested: Tuple[Union[str, NestedType], ...], preformat: Optional[bool]) -> None:
@@ -473,19 +414,29 @@ class Paragraph(MultiNestedElement['Paragraph']):
 
     @staticmethod
     def _from_xml(xml: Element):
-        nested = Paragraph._parse_nested(xml)
+        check_element(xml, attributes=('preformat', 'preFormat'), children=True, text=True)
 
-        preformat = xml.attrib.pop('preformat', None) or xml.attrib.pop('preFormat', None)
+        preformat = xml.get('preformat') or xml.get('preFormat')
         if preformat is not None:
             preformat = bool(preformat)
 
         return Paragraph(
-            nested=nested,
+            nested=Paragraph._parse_nested(xml),
             preformat=preformat,
         )
 
 
 class Test(XmlParse['Test']):
+    _schema = Schema(
+        test_id=Attr('id'),
+        status=Attr('status', TestStatus),
+        key=Attr('key'),
+        scan_id=Attr('scan-id'),
+        vulnerable_since=Attr('vulnerable-since', date, optional=True),
+        pci_compliance_status=Attr('pci-compliance-status', PCIComplianceStatus, optional=True),
+        paragraph=Child('Paragraph', 'Paragraph', optional=True),
+    )
+
     def __init__(self, test_id: str, status: TestStatus, key: str, scan_id: int,
                  vulnerable_since: Optional[datetime.datetime],
                  pci_compliance_status: Optional[PCIComplianceStatus], paragraph: Paragraph) -> None:
@@ -497,26 +448,15 @@ class Test(XmlParse['Test']):
         self.pci_compliance_status = pci_compliance_status
         self.paragraph = paragraph
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        paragraph_xml = xml_pop(xml, 'Paragraph', None)
-        if paragraph_xml is None:
-            paragraph = None
-        else:
-            paragraph = Paragraph.from_xml(paragraph_xml)
-
-        return Test(
-            test_id=xml.attrib.pop('id'),
-            status=TestStatus(xml.attrib.pop('status')),
-            key=xml.attrib.pop('key'),
-            scan_id=xml.attrib.pop('scan-id'),
-            vulnerable_since=XmlParse._pop(xml, 'vulnerable-since', parse_date),
-            pci_compliance_status=XmlParse._pop(xml, 'pci-compliance-status', PCIComplianceStatus),
-            paragraph=paragraph,
-        )
-
 
 class Service(XmlParse['Service']):
+    _schema = Schema(
+        name=Attr('name'),
+        fingerprints=Children('fingerprints', Fingerprint, optional=True),
+        configuration=Children('configuration', Config, optional=True),
+        tests=Children('tests', Test),
+    )
+
     def __init__(self, name: str, fingerprints: Set[Fingerprint], configuration: Set[Config],
                  tests: Set[Test]) -> None:
         self.name = name
@@ -524,43 +464,51 @@ class Service(XmlParse['Service']):
         self.configuration = frozenset(configuration)
         self.tests = frozenset(tests)
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        return Service(
-            name=xml.attrib.pop('name'),
-            fingerprints={Fingerprint.from_xml(fingerprint) for fingerprint in
-                          xml_pop_children(xml, 'fingerprints', [])},
-            configuration={Config.from_xml(config) for config in xml_pop_children(xml, 'configuration', [])},
-            tests={Test.from_xml(test) for test in xml_pop_children(xml, 'tests')},
-        )
-
 
 class Endpoint(XmlParse['Endpoint']):
+    _schema = Schema(
+        protocol=Attr('protocol', Protocol),
+        port=Attr('port', int),
+        status=Attr('status', PortStatus),
+        services=Children('services', Service),
+    )
+
     def __init__(self, protocol: Protocol, port: int, status: PortStatus, services: Set[Service]) -> None:
         self.protocol = protocol
         self.port = port
         self.status = status
         self.services = frozenset(services)
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'Endpoint':
-        return Endpoint(
-            protocol=Protocol(xml.attrib.pop('protocol')),
-            port=int(xml.attrib.pop('port')),
-            status=PortStatus(xml.attrib.pop('status')),
-            services={Service.from_xml(service) for service in xml_pop_children(xml, 'services')},
-        )
-
 
 class NodeStatus(Enum):
     alive = 'alive'
 
 
 class SiteImportance(Enum):
+    very_low = 'Very Low'
+    low = 'Low'
     normal = 'Normal'
+    high = 'High'
+    very_high = 'Very High'
 
 
 class Node(XmlParse['Node']):
+    _schema = Schema(
+        address=Attr('address', ip),
+        status=Attr('status', NodeStatus),
+        device_id=Attr('device-id'),
+        site_name=Attr('site-name'),
+        site_importance=Attr('site-importance', SiteImportance),
+        scan_template_name=Attr('scan-template'),
+        risk_score=Attr('risk-score', float),
+        hardware_address=Attr('hardware-address', optional=True),
+        names=Children('names', Name, optional=True),
+        fingerprints=Children('fingerprints', Fingerprint),
+        software=Children('software', Fingerprint, optional=True),
+        endpoints=Children('endpoints', Endpoint),
+        tests=Children('tests', Test),
+    )
+
     def __init__(self, address: IP, status: NodeStatus, device_id: int, site_name: str,
                  site_importance: SiteImportance, scan_template_name: str, risk_score: float, names: Set[Name],
                  hardware_address: Optional[str], fingerprints: Set[Fingerprint], software: Set[Fingerprint],
@@ -579,35 +527,15 @@ class Node(XmlParse['Node']):
         self.endpoints = frozenset(endpoints)
         self.tests = frozenset(tests)
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'Node':
-        return Node(
-            address=str_to_IP(xml.attrib.pop('address')),
-            status=NodeStatus(xml.attrib.pop('status')),
-            device_id=xml.attrib.pop('device-id'),
-            site_name=xml.attrib.pop('site-name'),
-            site_importance=SiteImportance(xml.attrib.pop('site-importance')),
-            scan_template_name=xml.attrib.pop('scan-template'),
-            risk_score=float(xml.attrib.pop('risk-score')),
-            hardware_address=xml.attrib.pop('hardware-address', None),
-            names={Name.from_xml(name) for name in xml_pop_children(xml, 'names', [])},
-            fingerprints={Fingerprint.from_xml(fingerprint) for fingerprint in xml_pop_children(xml, 'fingerprints')},
-            software={Fingerprint.from_xml(fingerprint) for fingerprint in xml_pop_children(xml, 'software', [])},
-            endpoints={Endpoint.from_xml(endpoint) for endpoint in xml_pop_children(xml, 'endpoints')},
-            tests={Test.from_xml(test) for test in xml_pop_children(xml, 'tests')},
-        )
-
 
 class Malware(XmlParse['Malware']):
+    _schema = Schema(
+        name=ChildList('name', Name),
+    )
+
     def __init__(self, name: Set[Name]) -> None:
         self.name = name
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        return Malware(
-            name={Name.from_xml(name) for name in xml_pop_list(xml, 'name')},
-        )
-
 
 class ExploitType(Enum):
     exploitdb = 'exploitdb'
@@ -621,6 +549,14 @@ class SkillLevel(Enum):
 
 
 class Exploit(XmlParse['Exploit']):
+    _schema = Schema(
+        exploit_id=Attr('id'),
+        title=Attr('title'),
+        exploit_type=Attr('type', ExploitType),
+        link=Attr('link'),
+        skill_level=Attr('skillLevel', SkillLevel),
+    )
+
     def __init__(self, exploit_id: int, title: str, exploit_type: ExploitType, link: str,
                  skill_level: SkillLevel) -> None:
         self.exploit_id = exploit_id
@@ -629,16 +565,6 @@ class Exploit(XmlParse['Exploit']):
         self.link = link
         self.skill_level = skill_level
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        return Exploit(
-            exploit_id=xml.attrib.pop('id'),
-            title=xml.attrib.pop('title'),
-            exploit_type=ExploitType(xml.attrib.pop('type')),
-            link=xml.attrib.pop('link'),
-            skill_level=SkillLevel(xml.attrib.pop('skillLevel')),
-        )
-
 
 class ReferenceSource(Enum):
     apple = 'APPLE'
@@ -669,33 +595,30 @@ class ReferenceSource(Enum):
 
 
 class Reference(XmlParse['Reference']):
+    _schema = Schema(
+        source=Attr('source', ReferenceSource),
+        text=Text(),
+    )
+
     def __init__(self, source: ReferenceSource, text: str) -> None:
         self.source = source
         self.text = text
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        return Reference(
-            source=ReferenceSource(xml.attrib.pop('source')),
-            text=xml_text_pop(xml),
-        )
-
 
 class Tag(XmlParse['Tag']):
+    _schema = Schema(
+        text=Text(),
+    )
+
     def __init__(self, text: str) -> None:
         self.text = text
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        return Tag(
-            text=xml_text_pop(xml),
-        )
-
 
 class Solution(MultiNestedElement['Solution']):
     @staticmethod
     def _from_xml(xml: Element):
         assert xml.tag == 'solution'
+        check_element(xml, children=True, text=True)
 
         return Solution(
             nested=Solution._parse_nested(xml),
@@ -703,6 +626,26 @@ class Solution(MultiNestedElement['Solution']):
 
 
 class Vulnerability(XmlParse['Vulnerability']):
+    _schema = Schema(
+        tag='vulnerability',
+        vulnerability_id=Attr('id'),
+        title=Attr('title'),
+        severity=Attr('severity', int),
+        pci_severity=Attr('pciSeverity', int),
+        cvss_score=Attr('cvssScore', float),
+        cvss_vector=Attr('cvssVector'),
+        published=Attr('published', date),
+        added=Attr('added', date),
+        modified=Attr('modified', date),
+        risk_score=Attr('riskScore', float),
+        malware=Child('malware', Malware),
+        exploits=Children('exploits', Exploit),
+        description=Child('description', 'Description'),
+        references=Children('references', Reference),
+        tags=Children('tags', Tag),
+        solution=Child('solution', 'Solution'),
+    )
+
     def __init__(self, vulnerability_id: str, title: str, severity: int, pci_severity: int, cvss_score: float,
                  cvss_vector: str, published: datetime.datetime, added: datetime.datetime, modified: datetime.datetime,
                  risk_score: float, malware: Malware, exploits: Set[Exploit], description: ContainerBlockElement,
@@ -724,30 +667,15 @@ class Vulnerability(XmlParse['Vulnerability']):
         self.tags = tags
         self.solution = solution
 
-    @staticmethod
-    def _from_xml(xml: Element):
-        assert xml.tag == 'vulnerability'
-        return Vulnerability(
-            vulnerability_id=xml.attrib.pop('id'),
-            title=xml.attrib.pop('title'),
-            severity=int(xml.attrib.pop('severity')),
-            pci_severity=int(xml.attrib.pop('pciSeverity')),
-            cvss_score=float(xml.attrib.pop('cvssScore')),
-            cvss_vector=xml.attrib.pop('cvssVector'),
-            published=parse_date(xml.attrib.pop('published')),
-            added=parse_date(xml.attrib.pop('added')),
-            modified=parse_date(xml.attrib.pop('modified')),
-            risk_score=float(xml.attrib.pop('riskScore')),
-            malware=Malware.from_xml(xml_pop(xml, 'malware')),
-            exploits={Exploit.from_xml(exploit) for exploit in xml_pop_children(xml, 'exploits')},
-            description=Description.from_xml(xml_pop(xml, 'description')),
-            references={Reference.from_xml(reference) for reference in xml_pop_children(xml, 'references')},
-            tags={Tag.from_xml(tag) for tag in xml_pop_children(xml, 'tags')},
-            solution=Solution.from_xml(xml_pop(xml, 'solution')),
-        )
-
 
 class NexposeReport(XmlParse['NexposeReport']):
+    _schema = Schema(
+        version=Attr('version', float),
+        scans=Children('scans', Scan),
+        nodes=Children('nodes', Node),
+        vulnerability_definition=Children('VulnerabilityDefinitions', Vulnerability),
+    )
+
     def __init__(self, version: float, scans: Set[Scan], nodes: Set[Node],
                  vulnerability_definition: Set[Vulnerability]) -> None:
         self.version = version
@@ -755,12 +683,36 @@ class NexposeReport(XmlParse['NexposeReport']):
         self.nodes = frozenset(nodes)
         self.vulnerability_definition = vulnerability_definition
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'NexposeReport':
-        return NexposeReport(
-            version=float(xml.attrib.pop('version')),
-            scans={Scan.from_xml(scan) for scan in xml_pop_children(xml, 'scans')},
-            nodes={Node.from_xml(node) for node in xml_pop_children(xml, 'nodes')},
-            vulnerability_definition={Vulnerability.from_xml(vulnerability) for vulnerability in
-                                      xml_pop_children(xml, 'VulnerabilityDefinitions')},
+    @classmethod
+    def parse(cls, source: 'Source', include: Optional[Iterable[str]] = None,
+              where: Optional['ReportFilter'] = None, budget: Optional[int] = None,
+              directory: Optional[str] = None) -> 'NexposeReport':
+        """
+        read a report from a path, bytes or binary file without loading its whole tree
+
+        `include` restricts the built fields to the given dotted names, as `{'nodes.tests', 'nodes.endpoints.port'}`,
+        and `where` drops what it does not accept while reading, see `ReportReader`
+
+        with a `budget` in bytes, the records over it are kept in a temporary file in `directory`, see
+        `nexpose.models.spill`
+        """
+        if budget is not None:
+            from nexpose.models import spill
+            return spill.parse(source, budget, include, where, directory)
+
+        from nexpose.models.stream import ReportReader
+
+        reader = ReportReader(source, include, where)
+        records: Dict[type, Set[Union[Scan, Node, Vulnerability]]] = {Scan: set(), Node: set(), Vulnerability: set()}
+        for record in reader:
+            records[Vulnerability if isinstance(record, Vulnerability) else type(record)].add(record)
+
+        return cls(
+            version=reader.version,
+            scans=records[Scan],
+            nodes=records[Node],
+            vulnerability_definition=records[Vulnerability],
         )
+
+
+compile_schemas(globals())
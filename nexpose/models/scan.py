@@ -3,9 +3,10 @@ from enum import Enum
 
 from typing import Iterable
 
+from nexpose.converters import date
 from nexpose.models import XmlFormat, Object, XmlParse
+from nexpose.models.schema import Schema, Attr, compile_schemas
 from nexpose.types import Element
-from nexpose.utils import parse_date
 
 
 class Status(Enum):
@@ -32,16 +33,24 @@ class Template(Object):
 
 
 class ScanConfig(XmlFormat):
+    _schema = Schema(
+        template=Attr('templateID', source='template.id'),
+    )
+
     def __init__(self, template: Template) -> None:
         super().__init__()
         self.template = template
 
-    def _to_xml(self, root: Element) -> None:
-        super()._to_xml(root)
-        root.attrib['templateID'] = self.template.id
-
 
 class Scan(XmlParse['Scan']):
+    _schema = Schema(
+        scan_id=Attr('id', int),
+        name=Attr('name'),
+        status=Attr('status', Status),
+        start_time=Attr('startTime', date),
+        end_time=Attr('endTime', date),
+    )
+
     def __init__(self, scan_id: int, name: str, status: Status, start_time: datetime.datetime,
                  end_time: datetime.datetime) -> None:
         self.id = scan_id
@@ -50,16 +59,6 @@ class Scan(XmlParse['Scan']):
         self.start_time = start_time
         self.end_time = end_time
 
-    @staticmethod
-    def _from_xml(xml: Element) -> 'Scan':
-        return Scan(
-            scan_id=int(xml.attrib.pop('id')),
-            name=xml.attrib.pop('name'),
-            status=Status(xml.attrib.pop('status')),
-            start_time=parse_date(xml.attrib.pop('startTime')),
-            end_time=parse_date(xml.attrib.pop('endTime'))
-        )
-
 
 class Vulnerabilities(XmlParse['Vulnerabilities']):
     @staticmethod
@@ -74,3 +73,6 @@ class ScanSummary(XmlParse['ScanSummary']):
     @staticmethod
     def _from_xml(xml: Element) -> 'ScanSummary':
         pass
+
+
+compile_schemas(globals())
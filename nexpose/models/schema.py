@@ -0,0 +1,510 @@
+"""
+declarative description of the xml of a model, compiled once into specialized functions
+
+the compiled `_from_xml` reads the tree without modifying it and checks, in the same pass, that no unknown
+attribute, sub element or text is left behind; the compiled `_write_xml` fills the root of `XmlFormat.to_xml`
+"""
+import abc
+import itertools
+import sys
+from collections import OrderedDict
+
+from lxml import etree
+from lxml.etree import SubElement
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from nexpose.converters import converter
+from nexpose.error import AttribNotFullyParsedError, SubElementNotFullyParsedError, TextNotFullyParsedError
+from nexpose.types import Element
+from nexpose.utils import clean_text
+
+ModelRef = Union[str, type]
+
+# which fields of a model to build, as sorted (field name, sub projection) pairs, FULL meaning every field
+Projection = Optional[Tuple[Tuple[str, Any], ...]]
+FULL = None  # type: Projection
+
+
+class Field:
+    def __init__(self, source: Optional[str]) -> None:
+        self.source = source
+
+
+class Attr(Field):
+    """
+    `invalid` values, as the empty string for some dates, are handled as missing
+    """
+
+    def __init__(self, name: str, convert: Optional[Callable[[str], Any]] = None, optional: bool = False,
+                 default: Any = None, invalid: Iterable[str] = (), source: Optional[str] = None,
+                 format: Callable[[Any], str] = str) -> None:
+        super().__init__(source)
+        self.name = name
+        self.convert = convert
+        self.optional = optional
+        self.default = default
+        self.invalid = frozenset(invalid)
+        self.format = format
+
+
+class Text(Field):
+    def __init__(self, convert: Optional[Callable[[str], Any]] = None, source: Optional[str] = None) -> None:
+        super().__init__(source)
+        self.convert = convert
+
+
+class Child(Field):
+    def __init__(self, tag: str, model: Optional[ModelRef] = None, optional: bool = False, default: Any = None,
+                 source: Optional[str] = None) -> None:
+        super().__init__(source)
+        self.tag = tag
+        self.model = model
+        self.optional = optional
+        self.default = default
+
+
+class Children(Field):
+    """
+    sub elements of the `tag` wrapper element, missing optional wrapper gives an empty container
+    """
+
+    def __init__(self, tag: str, model: ModelRef, optional: bool = False, container: Callable = set,
+                 source: Optional[str] = None) -> None:
+        super().__init__(source)
+        self.tag = tag
+        self.model = model
+        self.optional = optional
+        self.container = container
+
+
+class ChildList(Field):
+    """
+    every direct sub element named `tag`
+    """
+
+    def __init__(self, tag: str, model: ModelRef, container: Callable = set, source: Optional[str] = None) -> None:
+        super().__init__(source)
+        self.tag = tag
+        self.model = model
+        self.container = container
+
+
+class Empty(Field):
+    """
+    empty element only written, for the parts of requests we do not support yet
+    """
+
+    def __init__(self, tag: str) -> None:
+        super().__init__(None)
+        self.tag = tag
+
+
+class Schema:
+    """
+    fields are given in xml order, named as the argument of the model constructor
+
+    `tag` is asserted if given; an element with one of the `variants` tag is parsed by that model instead
+    """
+
+    def __init__(self, tag: Optional[str] = None, variants: Optional[Mapping[str, ModelRef]] = None,
+                 **fields: Field) -> None:
+        self.tag = tag
+        self.variants = dict(variants or {})
+        self.fields = OrderedDict(fields)
+
+    def extend(self, tag: Optional[str] = None, **fields: Field) -> 'Schema':
+        merged = OrderedDict(self.fields)
+        merged.update(fields)
+        return Schema(tag=tag or self.tag, **merged)
+
+    def child_field(self, tag: str) -> Optional[str]:
+        for name, f in self.fields.items():
+            if isinstance(f, (Child, Children, ChildList)) and f.tag == tag:
+                return name
+        return None
+
+    def included(self, projection: Projection) -> Mapping[str, Projection]:
+        """
+        fields to build with their own projection
+
+        every attribute and text is built unless some of them are named, sub elements only if named
+        """
+        if projection is FULL:
+            return OrderedDict((name, FULL) for name in self.fields)
+
+        wanted = dict(projection)
+        scalars = [name for name, f in self.fields.items() if isinstance(f, (Attr, Text))]
+        named_scalars = [name for name in scalars if name in wanted]
+
+        ret = OrderedDict()  # type: OrderedDict[str, Projection]
+        for name in self.fields:
+            if name in wanted:
+                ret[name] = wanted[name]
+            elif name in scalars and not named_scalars:
+                ret[name] = FULL
+        return ret
+
+
+def projection(paths: Iterable[str]) -> Projection:
+    """
+    dotted field names as `nodes.endpoints.port` to a projection
+    """
+    tree = {}  # type: dict[str, Any]
+    for path in paths:
+        node = tree
+        parts = path.split('.')
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+            if node is None:
+                break
+        else:
+            node[parts[-1]] = None
+
+    def freeze(node: Optional[Mapping[str, Any]]) -> Projection:
+        if node is None:
+            return FULL
+        return tuple(sorted((name, freeze(sub)) for name, sub in node.items()))
+
+    return freeze(tree)
+
+
+def wrapped(xml: Element) -> List[Element]:
+    """
+    sub elements of a wrapper, which has to carry nothing else
+    """
+    if xml.keys():
+        raise AttribNotFullyParsedError(xml)
+    text = xml.text
+    if text and not text.isspace():
+        raise TextNotFullyParsedError(xml)
+
+    children = list(xml)
+    for child in children:
+        tail = child.tail
+        if tail and not tail.isspace():
+            raise TextNotFullyParsedError(child)
+
+    return children
+
+
+def check_element(xml: Element, attributes: Iterable[str] = (), children: bool = False, text: bool = False) -> None:
+    """
+    for hand-written parsers, fail on anything they do not read
+    """
+    keys = xml.keys()
+    if keys and not set(attributes).issuperset(keys):
+        raise AttribNotFullyParsedError(xml)
+    if not children and len(xml):
+        raise SubElementNotFullyParsedError(xml[0])
+    if not text:
+        content = xml.text
+        if content and not content.isspace():
+            raise TextNotFullyParsedError(xml)
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+
+MISSING = _Missing()
+
+
+class _Compiler:
+    def __init__(self, cls: type, namespace: Mapping[str, Any]) -> None:
+        self.cls = cls
+        self.namespace = namespace
+        self.globals = {
+            'MISSING': MISSING,
+            'clean_text': clean_text,
+            'wrapped': wrapped,
+            'SubElement': SubElement,
+            'AttribNotFullyParsedError': AttribNotFullyParsedError,
+            'SubElementNotFullyParsedError': SubElementNotFullyParsedError,
+            'TextNotFullyParsedError': TextNotFullyParsedError,
+            'MODEL': cls,
+        }  # type: dict[str, Any]
+        self.__counter = itertools.count()
+
+    def constant(self, value: Any) -> str:
+        name = 'K{}'.format(next(self.__counter))
+        self.globals[name] = value
+        return name
+
+    def parser(self, model: ModelRef, projection: Projection = FULL) -> str:
+        return self.constant(parser(resolve(model, self.namespace), projection, self.namespace))
+
+    def build(self, name: str, lines: List[str]) -> Callable:
+        source = '\n'.join(lines)
+        exec(compile(source, '<schema {}.{}>'.format(self.cls.__qualname__, name), 'exec'), self.globals)
+        return self.globals[name]
+
+    def compile_parse(self, schema: Schema, projection: Projection = FULL) -> Callable[[Element], Any]:
+        lines = ['def _from_xml(xml):']
+        emit = lines.append
+
+        if schema.variants:
+            variants = {tag: self.parser(model, projection) for tag, model in schema.variants.items()}
+            emit('    tag = xml.tag')
+            for tag, variant in variants.items():
+                emit('    if tag == {!r}:'.format(tag))
+                emit('        return {}(xml)'.format(variant))
+        if schema.tag is not None:
+            emit('    assert xml.tag == {!r}, xml.tag'.format(schema.tag))
+
+        attrs = [f.name for f in schema.fields.values() if isinstance(f, Attr)]
+        emit('    keys = xml.keys()')
+        emit('    if keys and not {}.issuperset(keys):'.format(self.constant(frozenset(attrs))))
+        emit('        raise AttribNotFullyParsedError(xml)')
+
+        texts = [name for name, f in schema.fields.items() if isinstance(f, Text)]
+        if not texts:
+            emit('    text = xml.text')
+            emit('    if text and not text.isspace():')
+            emit('        raise TextNotFullyParsedError(xml)')
+
+        included = schema.included(projection)
+
+        children = [(name, f) for name, f in schema.fields.items() if isinstance(f, (Child, Children, ChildList))]
+        for name, f in children:
+            emit('    f_{} = {}'.format(name, '[]' if isinstance(f, ChildList) else 'MISSING'))
+
+        if children:
+            emit('    for child in xml:')
+            emit('        tail = child.tail')
+            emit('        if tail and not tail.isspace():')
+            emit('            raise TextNotFullyParsedError(child)')
+            emit('        tag = child.tag')
+            keyword = 'if'
+            for name, f in children:
+                emit('        {} tag == {!r}:'.format(keyword, f.tag))
+                keyword = 'elif'
+                if isinstance(f, ChildList):
+                    emit('            f_{}.append(child)'.format(name))
+                    continue
+
+                emit('            if f_{} is not MISSING:'.format(name))
+                emit('                raise SubElementNotFullyParsedError(child)')
+                if name not in included:
+                    emit('            f_{} = None'.format(name))
+                elif isinstance(f, Child):
+                    emit('            f_{} = {}(child)'.format(name, self.parser(f.model, included[name])))
+                else:
+                    emit('            f_{} = {}(child)'.format(name, self.constant(self.__items_parser(
+                        f, included[name]))))
+            emit('        else:')
+            emit('            raise SubElementNotFullyParsedError(child)')
+        else:
+            emit('    if len(xml):')
+            emit('        raise SubElementNotFullyParsedError(xml[0])')
+
+        emit('    get = xml.get')
+        for name, f in schema.fields.items():
+            if name not in included:
+                if isinstance(f, (Children, ChildList)):
+                    emit('    f_{} = {}()'.format(name, self.constant(f.container)))
+                else:
+                    emit('    f_{} = None'.format(name))
+            elif isinstance(f, Attr):
+                emit('    f_{} = get({!r})'.format(name, f.name))
+                if not f.optional:
+                    emit('    if f_{} is None:'.format(name))
+                    emit('        raise KeyError({!r})'.format(f.name))
+
+                missing = []  # type: List[str]
+                if f.optional:
+                    missing.append('f_{} is None'.format(name))
+                if f.invalid:
+                    missing.append('f_{} in {}'.format(name, self.constant(f.invalid)))
+
+                value = 'f_{}'.format(name)
+                if f.convert is not None:
+                    value = '{}(f_{})'.format(self.constant(converter(f.convert)), name)
+
+                if missing:
+                    emit('    f_{} = {} if {} else {}'.format(name, self.constant(f.default), ' or '.join(missing),
+                                                          value))
+                elif f.convert is not None:
+                    emit('    f_{} = {}'.format(name, value))
+            elif isinstance(f, Text):
+                value = 'clean_text(xml.text)'
+                if f.convert is not None:
+                    emit('    v = {}'.format(value))
+                    value = 'None if v is None else {}(v)'.format(self.constant(converter(f.convert)))
+                emit('    f_{} = {}'.format(name, value))
+            elif isinstance(f, ChildList):
+                emit('    f_{0} = {1}({2}(child) for child in f_{0})'.format(
+                    name, self.constant(f.container), self.parser(f.model, included[name])))
+            elif isinstance(f, (Child, Children)):
+                emit('    if f_{} is MISSING:'.format(name))
+                if isinstance(f, Children) and f.optional:
+                    emit('        f_{} = {}()'.format(name, self.constant(f.container)))
+                elif isinstance(f, Child) and f.optional:
+                    emit('        f_{} = {}'.format(name, self.constant(f.default)))
+                else:
+                    emit('        raise KeyError({!r})'.format(f.tag))
+            else:
+                raise TypeError('{} cannot be parsed'.format(f))
+
+        emit('    return MODEL({})'.format(', '.join('{0}=f_{0}'.format(name) for name in schema.fields)))
+
+        return self.build('_from_xml', lines)
+
+    def __items_parser(self, f: Children, projection: Projection) -> Callable[[Element], Any]:
+        item_parser = self.globals[self.parser(f.model, projection)]
+        container = f.container
+
+        if container is set:
+            return lambda xml: {item_parser(item) for item in wrapped(xml)}
+        return lambda xml: container(item_parser(item) for item in wrapped(xml))
+
+    def compile_write(self, schema: Schema) -> Callable[[Any, Element], None]:
+        lines = ['def _write_xml(self, root):', '    attrib = root.attrib']
+        emit = lines.append
+
+        for name, f in schema.fields.items():
+            if isinstance(f, Empty):
+                emit('    SubElement(root, {!r})'.format(f.tag))
+                continue
+
+            emit('    v = self.{}'.format(f.source or name))
+            if isinstance(f, Attr):
+                emit('    if v is not None:')
+                emit('        attrib[{!r}] = {}(v)'.format(f.name, self.constant(f.format)))
+            elif isinstance(f, Text):
+                emit('    if v is not None:')
+                emit('        root.text = str(v)')
+            elif isinstance(f, Child):
+                emit('    if v is not None:')
+                emit('        root.append(v.to_xml())')
+            elif isinstance(f, (Children, ChildList)):
+                parent = 'root'
+                if isinstance(f, Children):
+                    emit('    wrapper = SubElement(root, {!r})'.format(f.tag))
+                    parent = 'wrapper'
+                emit('    for item in v:')
+                emit('        {}.append(item.to_xml())'.format(parent))
+
+        return self.build('_write_xml', lines)
+
+    def compile_stream(self, schema: Schema) -> Callable[[Any, Any], Iterator[None]]:
+        """
+        writer of the same element as `compile_write` into an `etree.xmlfile`, yielding after each model so that the
+        output can be sent as it grows
+        """
+        lines = ['def _stream_xml(self, xf):', '    attrib = {}', '    text = None']
+        children = []  # type: List[str]
+        emit = lines.append
+
+        for name, f in schema.fields.items():
+            if isinstance(f, Empty):
+                children.append('        xf.write({})'.format(self.constant(etree.Element(f.tag))))
+                continue
+
+            if isinstance(f, Attr):
+                emit('    v = self.{}'.format(f.source or name))
+                emit('    if v is not None:')
+                emit('        attrib[{!r}] = {}(v)'.format(f.name, self.constant(f.format)))
+            elif isinstance(f, Text):
+                emit('    v = self.{}'.format(f.source or name))
+                emit('    if v is not None:')
+                emit('        text = str(v)')
+            elif isinstance(f, Child):
+                children.append('        v = self.{}'.format(f.source or name))
+                children.append('        if v is not None:')
+                children.append('            yield from v._stream_xml(xf)')
+            elif isinstance(f, (Children, ChildList)):
+                children.append('        v = self.{}'.format(f.source or name))
+                indent = '        '
+                if isinstance(f, Children):
+                    children.append('        with xf.element({!r}):'.format(f.tag))
+                    indent += '    '
+                children.append(indent + 'for item in v:')
+                children.append(indent + '    yield from item._stream_xml(xf)')
+
+        emit('    with xf.element(self.__class__.__name__, attrib):')
+        emit('        if text is not None:')
+        emit('            xf.write(text)')
+        lines.extend(children)
+        emit('    yield')
+        return self.build('_stream_xml', lines)
+
+
+def resolve(model: ModelRef, namespace: Mapping[str, Any]) -> type:
+    if isinstance(model, str):
+        return namespace[model]
+    return model
+
+
+def check_projection(cls: type, projection: Projection) -> None:
+    if projection is FULL:
+        return
+
+    schema = getattr(cls, '_schema', None)
+    if schema is None:
+        raise ValueError('{} can only be built whole'.format(cls.__name__))
+
+    known = dict(schema.fields)
+    for variant in schema.variants.values():
+        known.update(resolve(variant, cls._schema_namespace)._schema.fields)
+
+    for name, sub in projection:
+        if name not in known:
+            raise ValueError('{} has no field {}'.format(cls.__name__, name))
+        f = known[name]
+        if sub is not FULL:
+            if not isinstance(f, (Child, Children, ChildList)):
+                raise ValueError('{}.{} has no sub field'.format(cls.__name__, name))
+            check_projection(resolve(f.model, cls._schema_namespace), sub)
+
+
+def parser(cls: type, projection: Projection = FULL,
+           namespace: Optional[Mapping[str, Any]] = None) -> Callable[[Element], Any]:
+    """
+    parse function of `cls` building only the fields of `projection`, compiled on first use
+    """
+    if getattr(cls, '_schema', None) is None:
+        check_projection(cls, projection)
+        return cls.from_xml
+
+    compile_schema(cls, namespace if namespace is not None else sys.modules[cls.__module__].__dict__)
+    if projection is FULL:
+        return cls._from_xml
+
+    projected = cls.__dict__['_projected_parsers']
+    ret = projected.get(projection)
+    if ret is None:
+        check_projection(cls, projection)
+        ret = _Compiler(cls, cls._schema_namespace).compile_parse(cls._schema, projection)
+        projected[projection] = ret
+    return ret
+
+
+def compile_schema(cls: type, namespace: Mapping[str, Any]) -> None:
+    if '_compiled_schema' in cls.__dict__:
+        return
+    cls._compiled_schema = cls._schema
+    cls._schema_namespace = namespace
+    cls._projected_parsers = {}
+
+    from nexpose.models import XmlFormat
+
+    compiler = _Compiler(cls, namespace)
+    if hasattr(cls, 'from_xml'):
+        cls._from_xml = staticmethod(compiler.compile_parse(cls._schema))
+    if hasattr(cls, 'to_xml'):
+        cls._write_xml = compiler.compile_write(cls._schema)
+        # a hand written `_to_xml` adds content that only `to_xml` knows of
+        if cls._to_xml is XmlFormat._to_xml:
+            cls._stream_xml = compiler.compile_stream(cls._schema)
+
+    abc.update_abstractmethods(cls)
+
+
+def compile_schemas(namespace: Mapping[str, Any]) -> None:
+    """
+    compile every model of the module `namespace` which declares a `_schema`
+    """
+    for value in list(namespace.values()):
+        if isinstance(value, type) and value.__module__ == namespace['__name__'] and '_schema' in value.__dict__:
+            compile_schema(value, namespace)
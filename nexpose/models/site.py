@@ -1,21 +1,24 @@
 import uuid
 
 from lxml.etree import SubElement
-from typing import Iterable, Tuple, Optional
+from typing import Any, Iterable, Iterator, Tuple, Optional
 
 from nexpose.models import XmlFormat
+from nexpose.models.schema import Schema, Attr, Child, Empty, compile_schemas
 from nexpose.models.scan import ScanConfig
 from nexpose.types import IP, Element
 
 
 class Hosts(XmlFormat):
     """
+    `ip_range` and `hosts` are kept as lists, as a request is written again for each attempt
+
     lies:
      - we are not supposed to give ip_range as DNS host, but it works and the range doesn't
     """
     def __init__(self, ip_range: Iterable[Tuple[IP, Optional[IP]]], hosts: Iterable[str]) -> None:
-        self.ip_range = ip_range
-        self.hosts = hosts
+        self.ip_range = list(ip_range)
+        self.hosts = list(hosts)
 
     @staticmethod
     def __ip_to_str(ip: IP) -> Optional[str]:
@@ -34,6 +37,20 @@ class Hosts(XmlFormat):
             elem = SubElement(root, 'host')
             elem.text = self.__ip_to_str(ip[0])
 
+    def _stream_xml(self, xf: Any) -> Iterator[None]:
+        with xf.element(self.__class__.__name__):
+            for host in self.hosts:
+                with xf.element('host'):
+                    xf.write(host)
+                yield
+
+            for ip in self.ip_range:
+                text = self.__ip_to_str(ip[0])
+                with xf.element('host'):
+                    if text is not None:
+                        xf.write(text)
+                yield
+
 
 class Site(XmlFormat):
     """
@@ -41,6 +58,16 @@ class Site(XmlFormat):
      - `id` has to be a number
     """
 
+    _schema = Schema(
+        site_id=Attr('id', source='id'),
+        name=Attr('name'),
+        hosts=Child('Hosts'),
+        credentials=Empty('Credentials'),
+        alerting=Empty('Alerting'),
+        scan_config=Child('ScanConfig'),
+        tags=Empty('Tags'),
+    )
+
     def __init__(self, hosts: Hosts, scan_config: ScanConfig, name: Optional[str] = None, site_id: int = -1) -> None:
         if name is None:
             name = str(uuid.uuid4())
@@ -49,16 +76,5 @@ class Site(XmlFormat):
         self.hosts = hosts
         self.scan_config = scan_config
 
-    def _to_xml(self, root: Element) -> None:
-        super()._to_xml(root)
-
-        root.attrib.update(dict(
-            id=str(self.id),
-            name=self.name,
-        ))
 
-        root.append(self.hosts.to_xml())
-        SubElement(root, 'Credentials')
-        SubElement(root, 'Alerting')
-        root.append(self.scan_config.to_xml())
-        SubElement(root, 'Tags')
+compile_schemas(globals())
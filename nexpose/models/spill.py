@@ -0,0 +1,216 @@
+"""
+reading of reports larger than a memory budget
+
+    with NexposeReport.parse('report.xml', budget=512 << 20) as report:
+        for node in report.nodes:
+            ...
+
+records are kept in memory while they fit in the budget, the next ones are pickled into a temporary file and read
+back one page at a time each time the report is iterated
+
+the memory of a record is estimated from the pickle of one record out of `SAMPLE` of its type, python objects
+taking about `EXPANSION` times the size of their pickle
+"""
+import pickle
+import tempfile
+import threading
+from array import array
+from collections.abc import Set
+from typing import Any, Iterable, Iterator, Optional, TYPE_CHECKING
+
+from nexpose.models.report import NexposeReport, Node, Vulnerability
+from nexpose.models.scan import Scan
+
+if TYPE_CHECKING:
+    from nexpose.models.filter import ReportFilter  # noqa: F401
+    from nexpose.models.stream import Source  # noqa: F401
+
+SAMPLE = 16
+EXPANSION = 4
+
+PAGE_SIZE = 1 << 20
+
+
+class SpillFile:
+    """
+    append only temporary file of pickled records, removed once closed
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.__file = tempfile.TemporaryFile(dir=directory)
+        self.__lock = threading.Lock()
+        self.size = 0
+
+    def append(self, data: bytes) -> int:
+        """
+        offset at which `data` was written
+        """
+        with self.__lock:
+            ret = self.size
+            self.__file.seek(ret)
+            self.__file.write(data)
+            self.size += len(data)
+            return ret
+
+    def read(self, offset: int, length: int) -> bytes:
+        with self.__lock:
+            self.__file.seek(offset)
+            return self.__file.read(length)
+
+    def close(self) -> None:
+        self.__file.close()
+
+
+class SpilledSet(Set):
+    """
+    records held in memory, then the ones in a `SpillFile`; each iteration unpickles new objects for the latter
+    """
+
+    def __init__(self, spill: SpillFile) -> None:
+        self.spill = spill
+        self.held = []  # type: list[Any]
+        self.__offsets = array('q')
+        self.__lengths = array('q')
+
+    def hold(self, record: Any) -> None:
+        self.held.append(record)
+
+    def write(self, data: bytes) -> None:
+        self.__offsets.append(self.spill.append(data))
+        self.__lengths.append(len(data))
+
+    @property
+    def spilled(self) -> int:
+        return len(self.__offsets)
+
+    def __len__(self) -> int:
+        return len(self.held) + len(self.__offsets)
+
+    def __contains__(self, record: Any) -> bool:
+        return any(record == other for other in self)
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.held
+
+        offsets, lengths = self.__offsets, self.__lengths
+        i = 0
+        while i < len(offsets):
+            # records written one after the other are read together
+            start = end = offsets[i]
+            j = i
+            while j < len(offsets) and offsets[j] == end and end - start < PAGE_SIZE:
+                end += lengths[j]
+                j += 1
+
+            page = memoryview(self.spill.read(start, end - start))
+            for k in range(i, j):
+                offset = offsets[k] - start
+                yield pickle.loads(page[offset:offset + lengths[k]])
+            i = j
+
+    @classmethod
+    def _from_iterable(cls, iterable: Iterable[Any]) -> frozenset:
+        return frozenset(iterable)
+
+    __hash__ = None  # type: ignore
+
+
+class _Estimate:
+    """
+    memory of the records of one type, from the pickle of one out of `SAMPLE`
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.sampled = 0
+        self.sampled_bytes = 0
+
+    def add(self, size: int) -> None:
+        self.sampled += 1
+        self.sampled_bytes += size
+
+    def __call__(self, record: Any) -> int:
+        """
+        estimated memory of the next record, `record`
+        """
+        if self.count % SAMPLE == 0:
+            self.add(len(pickle.dumps(record, pickle.HIGHEST_PROTOCOL)))
+        self.count += 1
+        return EXPANSION * self.sampled_bytes // self.sampled
+
+
+class SpilledReport(NexposeReport):
+    """
+    `NexposeReport` whose nodes and vulnerability definitions over the budget are kept in a temporary file, removed on
+    `close`; it is pickled as a plain `NexposeReport`, read back whole
+    """
+
+    def __init__(self, version: float, scans: Iterable[Scan], nodes: SpilledSet, vulnerability_definition: SpilledSet,
+                 spill: SpillFile) -> None:
+        self.version = version
+        self.scans = frozenset(scans)
+        self.nodes = nodes  # type: ignore
+        self.vulnerability_definition = vulnerability_definition  # type: ignore
+        self.spill = spill
+
+    @property
+    def spilled(self) -> int:
+        """
+        count of the records in the temporary file
+        """
+        return self.nodes.spilled + self.vulnerability_definition.spilled  # type: ignore
+
+    def close(self) -> None:
+        self.spill.close()
+
+    def __enter__(self) -> 'SpilledReport':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __reduce__(self) -> Any:
+        return NexposeReport, (self.version, set(self.scans), set(self.nodes), set(self.vulnerability_definition))
+
+    def __repr__(self) -> str:
+        return '{}(version={!r}, scans={!r}, nodes={} records, vulnerability_definition={} records)'.format(
+            type(self).__name__, self.version, self.scans, len(self.nodes), len(self.vulnerability_definition))
+
+
+def parse(source: 'Source', budget: int, include: Optional[Iterable[str]] = None,
+          where: Optional['ReportFilter'] = None, directory: Optional[str] = None) -> SpilledReport:
+    """
+    read a report, keeping in memory its nodes and vulnerability definitions up to about `budget` bytes; the others
+    are written in a temporary file in `directory`, see `NexposeReport.parse` for the other arguments
+    """
+    from nexpose.models.stream import ReportReader
+
+    reader = ReportReader(source, include, where)
+    spill = SpillFile(directory)
+    try:
+        scans = set()
+        records = {Node: SpilledSet(spill), Vulnerability: SpilledSet(spill)}  # type: dict[type, SpilledSet]
+        estimates = {Node: _Estimate(), Vulnerability: _Estimate()}
+        held = 0
+
+        for record in reader:
+            if isinstance(record, Scan):
+                scans.add(record)
+                continue
+
+            kind = Vulnerability if isinstance(record, Vulnerability) else Node
+            estimate = estimates[kind]
+            size = estimate(record)
+            if held + size <= budget:
+                held += size
+                records[kind].hold(record)
+            else:
+                data = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+                estimate.add(len(data))
+                records[kind].write(data)
+
+        return SpilledReport(version=reader.version, scans=scans, nodes=records[Node],
+                             vulnerability_definition=records[Vulnerability], spill=spill)
+    except BaseException:
+        spill.close()
+        raise
@@ -0,0 +1,355 @@
+"""
+reading of raw xml reports one record at a time
+
+a record is a scan, a node or a vulnerability definition, parsed as soon as its closing tag is read and then
+dropped from the tree; with a projection, the sub elements outside of it are never built at all, and the ones a
+filter rejects are dropped before any model is built from them
+"""
+from typing import Any, BinaryIO, Iterable, Iterator, Mapping, Optional, Tuple, Union, TYPE_CHECKING
+
+from lxml import etree
+
+from nexpose.error import AttribNotFullyParsedError, SubElementNotFullyParsedError
+from nexpose.models.schema import FULL, Children, Projection, parser, projection, resolve
+from nexpose.types import Element
+
+if TYPE_CHECKING:
+    from nexpose.models.filter import Check, ReportFilter
+
+Source = Union[str, bytes, BinaryIO]
+
+CHUNK_SIZE = 1 << 16
+
+# what to do with an element: build it as `cls` restricted to a projection, or only walk through it
+Plan = Tuple[str, type, Projection]
+
+
+def _model(cls: type, tag: str) -> type:
+    schema = getattr(cls, '_schema', None)
+    if schema is not None and tag in schema.variants:
+        return resolve(schema.variants[tag], cls._schema_namespace)
+    return cls
+
+
+_plans = {}  # type: dict
+
+
+def _child_plan(plan: Plan, tag: str) -> Optional[Plan]:
+    """
+    plan of a sub element of tag `tag`, None to skip it
+    """
+    key = plan, tag
+    try:
+        return _plans[key]
+    except KeyError:
+        ret = _plans[key] = _find_child_plan(plan, tag)
+        return ret
+
+
+def _find_child_plan(plan: Plan, tag: str) -> Optional[Plan]:
+    kind, cls, proj = plan
+    if kind == 'wrapper':
+        return 'model', _model(cls, tag), proj
+
+    schema = getattr(cls, '_schema', None)
+    if schema is None:
+        return plan
+    name = schema.child_field(tag)
+    if name is None:
+        return plan  # left for the model parser to refuse
+
+    sub = FULL  # type: Projection
+    if proj is not FULL:
+        included = schema.included(proj)
+        if name not in included:
+            return None
+        sub = included[name]
+
+    f = schema.fields[name]
+    model = resolve(f.model, cls._schema_namespace)
+    if isinstance(f, Children):
+        return 'wrapper', model, sub
+    return 'model', _model(model, tag), sub
+
+
+def _open(source: Source) -> Tuple[BinaryIO, bool]:
+    if isinstance(source, str):
+        return open(source, 'rb'), True
+    if isinstance(source, bytes):
+        from io import BytesIO
+        return BytesIO(source), True
+    return source, False
+
+
+def _element(tag: str, attrib: Mapping[str, str]) -> Element:
+    return etree.Element(tag, dict(attrib))
+
+
+class _Target:
+    """
+    parser target building, for each record, only the elements of its plan
+    """
+
+    def __init__(self, sections: Mapping[str, Tuple[type, Projection]], on_root,
+                 checks: Optional[Mapping[type, 'Check']] = None) -> None:
+        self.sections = sections
+        self.on_root = on_root
+        self.checks = checks or {}
+        self.records = []  # type: list[Any]
+        self.__depth = 0
+        self.__skip = 0
+        self.__section = None  # type: Optional[Tuple[type, Projection]]
+        self.__plans = []  # type: list[Plan]
+        self.__builder = None  # type: Optional[etree.TreeBuilder]
+
+    def start(self, tag: str, attrib: Mapping[str, str]) -> None:
+        self.__depth += 1
+        if self.__skip:
+            self.__skip += 1
+            return
+
+        depth = self.__depth
+        if depth == 1:
+            self.on_root(_element(tag, attrib))
+            return
+        if depth == 2:
+            if tag not in self.sections:
+                raise SubElementNotFullyParsedError(_element(tag, attrib))
+            self.__section = self.sections[tag]
+            if self.__section is None:
+                self.__skip = 1
+            elif attrib:
+                raise AttribNotFullyParsedError(_element(tag, attrib))
+            return
+
+        if depth == 3:
+            cls, proj = self.__section
+            plan = 'model', _model(cls, tag), proj  # type: Optional[Plan]
+        else:
+            plan = _child_plan(self.__plans[-1], tag)
+            if plan is None:
+                self.__skip = 1
+                return
+
+        check = self.checks.get(plan[1])
+        if check is not None and plan[0] == 'model' and not check(attrib):
+            self.__skip = 1
+            return
+
+        if depth == 3:
+            self.__builder = etree.TreeBuilder()
+        self.__plans.append(plan)
+        self.__builder.start(tag, attrib)
+
+    def data(self, data: str) -> None:
+        if self.__builder is not None and not self.__skip:
+            self.__builder.data(data)
+
+    def end(self, tag: str) -> None:
+        self.__depth -= 1
+        if self.__skip:
+            self.__skip -= 1
+            return
+        if self.__builder is None:
+            return
+
+        _, cls, proj = self.__plans.pop()
+        self.__builder.end(tag)
+        if self.__plans:
+            return
+
+        xml = self.__builder.close()
+        self.__builder = None
+        self.records.append(parser(cls, proj)(xml))
+
+    def close(self) -> None:
+        pass
+
+
+class _VulnerabilityIndex:
+    """
+    parser target only reading attributes of the vulnerability definitions
+    """
+
+    def __init__(self, attributes: Iterable[str]) -> None:
+        self.attributes = tuple(attributes)
+        self.index = {}  # type: dict[str, Tuple[Optional[str], ...]]
+
+    def start(self, tag: str, attrib: Mapping[str, str]) -> None:
+        if tag == 'vulnerability':  # only found in VulnerabilityDefinitions
+            self.index[attrib['id'].lower()] = tuple(attrib.get(name) for name in self.attributes)
+
+    def close(self) -> Mapping[str, Tuple[Optional[str], ...]]:
+        return self.index
+
+
+def _feed(stream: BinaryIO, xml_parser: etree.XMLParser) -> Iterator[None]:
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        xml_parser.feed(chunk)
+        yield
+
+
+def vulnerability_attributes(source: Source, attributes: Iterable[str]) -> Mapping[str, Tuple[Optional[str], ...]]:
+    """
+    values of `attributes` of each vulnerability of a report, by lowercase id, reading nothing else
+
+    a file object is read from its current position, to which it is put back
+    """
+    stream, owned = _open(source)
+    start = None if owned else stream.tell()
+    try:
+        xml_parser = etree.XMLParser(target=_VulnerabilityIndex(attributes), huge_tree=True)
+        for _ in _feed(stream, xml_parser):
+            pass
+        return xml_parser.close()
+    finally:
+        if owned:
+            stream.close()
+        else:
+            stream.seek(start)
+
+
+def severities(source: Source) -> Mapping[str, int]:
+    """
+    severity of each vulnerability of a report, by lowercase id
+    """
+    return {vulnerability_id: int(severity)
+            for vulnerability_id, (severity,) in vulnerability_attributes(source, ('severity',)).items()}
+
+
+class ReportReader:
+    """
+    iterate over the scans, nodes and vulnerability definitions of a raw xml report, in document order
+
+    `include` is a set of dotted field names of `NexposeReport`, as `nodes.endpoints.port`; when given, only
+    these fields are built, the others are left to None or empty, and their elements are skipped while reading
+
+    `where` is checked on the start tag of the records and sub elements it filters, the rejected ones being dropped
+    at their end tag without building any model; filtering on severity reads the source twice, so a file object has
+    to be seekable
+
+    without a projection, libxml builds the elements of each record before they are dropped, which costs less than
+    going through python for each of their tags; with one, every tag goes through python so that the elements
+    outside of it, and the ones the filter rejects, are not even built
+    """
+
+    SECTIONS = (('scans', 'scans'), ('nodes', 'nodes'), ('VulnerabilityDefinitions', 'vulnerability_definition'))
+    RECORDS = ('scan', 'node', 'vulnerability')
+
+    def __init__(self, source: Source, include: Optional[Iterable[str]] = None,
+                 where: Optional['ReportFilter'] = None) -> None:
+        from nexpose.models.report import NexposeReport
+
+        self.__source = source
+        self.__report = NexposeReport
+        self.projection = FULL if include is None else projection(include)
+        self.where = where
+        self.version = None  # type: Optional[float]
+
+        parser(NexposeReport, self.projection)  # refuse unknown fields before reading anything
+
+    def __iter__(self) -> Iterator[Any]:
+        stream, owned = _open(self.__source)
+        try:
+            checks = self.__checks(stream)
+            if self.projection is FULL:
+                yield from self.__iterparse(stream, checks)
+            else:
+                yield from self.__feed(stream, checks)
+        finally:
+            if owned:
+                stream.close()
+
+    def __read_root(self, xml: Element) -> None:
+        assert xml.tag == 'NexposeReport', xml.tag
+        if not set(xml.keys()) <= {'version'}:
+            raise AttribNotFullyParsedError(xml)
+        self.version = float(xml.get('version'))
+
+    def __sections(self) -> Mapping[str, Optional[Tuple[type, Projection]]]:
+        schema = self.__report._schema
+        included = schema.included(self.projection)
+        ret = {}  # type: dict
+        for tag, name in self.SECTIONS:
+            model = resolve(schema.fields[name].model, self.__report._schema_namespace)
+            ret[tag] = (model, included[name]) if name in included else None
+        return ret
+
+    def __iterparse(self, stream: BinaryIO, checks: Mapping[type, 'Check']) -> Iterator[Any]:
+        sections = self.__sections()
+        # check of each filtered element, by tag, with the tag of the wrapper it has to be in
+        filtered = {tag: (wrapper, checks[model]) for tag, (wrapper, model) in self.__filtered().items()
+                    if model in checks}
+        rejected = set()  # type: set[Element]
+
+        context = etree.iterparse(stream, events=('start', 'end'),
+                                  tag=('NexposeReport',) + self.RECORDS + tuple(filtered), huge_tree=True)
+        for event, xml in context:
+            parent = xml.getparent()
+            if parent is None:
+                if event == 'start':
+                    self.__read_root(xml)
+                else:
+                    self.__check_sections(xml, sections)
+                continue
+
+            if xml.tag in filtered:
+                wrapper, check = filtered[xml.tag]
+                if parent.tag == wrapper:
+                    if event == 'start':
+                        # the elements in a rejected one are checked too, which is cheaper than tracking it
+                        if not check(xml.attrib):
+                            rejected.add(xml)
+                        continue
+                    if xml in rejected:
+                        rejected.discard(xml)
+                        xml.clear()
+                        parent.remove(xml)
+                        continue
+
+            if event == 'start' or parent.getparent() is None or parent.getparent().getparent() is not None:
+                continue
+
+            if parent.tag not in sections:
+                raise SubElementNotFullyParsedError(parent)
+            section = sections[parent.tag]
+            if section is not None:
+                yield parser(*section)(xml)
+
+            xml.clear()
+            while xml.getprevious() is not None:
+                del parent[0]
+
+    def __filtered(self) -> Mapping[str, Tuple[str, type]]:
+        from nexpose.models.report import Endpoint, Node, Test, Vulnerability
+
+        return {'node': ('nodes', Node), 'test': ('tests', Test), 'endpoint': ('endpoints', Endpoint),
+                'vulnerability': ('VulnerabilityDefinitions', Vulnerability)}
+
+    @staticmethod
+    def __check_sections(xml: Element, sections: Mapping[str, Any]) -> None:
+        for section in xml:
+            if section.tag not in sections:
+                raise SubElementNotFullyParsedError(section)
+            if section.keys():
+                raise AttribNotFullyParsedError(section)
+
+    def __checks(self, stream: BinaryIO) -> Mapping[type, 'Check']:
+        if self.where is None:
+            return {}
+        if not self.where.needs_severities:
+            return self.where.checks()
+
+        return self.where.checks(severities(stream))
+
+    def __feed(self, stream: BinaryIO, checks: Mapping[type, 'Check']) -> Iterator[Any]:
+        target = _Target(self.__sections(), self.__read_root, checks)
+        xml_parser = etree.XMLParser(target=target, huge_tree=True)
+        for _ in _feed(stream, xml_parser):
+            yield from target.records
+            target.records.clear()
+        xml_parser.close()
+        yield from target.records
@@ -1,61 +1,86 @@
+import functools
 import logging
+import threading
 from collections import defaultdict
-from http.client import BadStatusLine
 
 import requests
 from lxml import etree
-from requests.packages.urllib3.exceptions import ProtocolError
-from typing import MutableMapping
-from typing import Optional, Mapping, Tuple
+from typing import TYPE_CHECKING, Callable
+from typing import Optional, Mapping, Tuple, Union
 
+from nexpose.models import XmlRequest
 from nexpose.models.failure import Failure
 from nexpose.networkerror import NetworkError
+from nexpose.transport import RetryPolicy, CircuitBreaker, Deadline, Timeout, call_with_retry, hedge
 from nexpose.types import Element
 from nexpose.utils import return_none
 
+if TYPE_CHECKING:
+    from nexpose.modules.session import SessionPool  # noqa: F401
+
 
 class ModuleBase:
     def __init__(self, host: str, port: int = 3780,
-                 sessions_id: Optional[Mapping[Tuple[int, int], str]] = None) -> None:
+                 sessions_id: Optional[Mapping[Tuple[int, int], str]] = None,
+                 session_pool: Optional['SessionPool'] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 timeout: Timeout = (10, 300),
+                 deadline: Optional[float] = None,
+                 hedge_after: Optional[float] = None) -> None:
         self.host = host
         self.port = port
+        self.session_pool = session_pool
 
-        self.sessions_id = defaultdict(return_none)  # type: MutableMapping[Tuple[int, int], Optional[str]]
+        self.sessions_id = defaultdict(return_none)  # type: defaultdict[Tuple[int, int], Optional[str]]
         if sessions_id is not None:
             self.sessions_id.update(sessions_id)
 
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self.retry_policy = retry_policy
+        self.timeout = timeout
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+
         logging.captureWarnings(True)
 
-    def _post(self, xml: Element, api_version: Tuple[int, int] = (1, 1)) -> Element:
+    def _post(self, xml: Union[Element, XmlRequest], api_version: Tuple[int, int] = (1, 1),
+              idempotent: bool = False, deadline: Optional[float] = None) -> Element:
+        if self.session_pool is None:
+            return self.__post(xml=xml, api_version=api_version, session_id=self.sessions_id[api_version],
+                               idempotent=idempotent, deadline=deadline)
+
+        with self.session_pool.acquire(api_version=api_version) as session:
+            try:
+                return self.__post(xml=xml, api_version=api_version, session_id=session.id,
+                                   idempotent=idempotent, deadline=deadline)
+            except NetworkError as e:
+                if not e.is_session_timeout:
+                    raise
+                self.session_pool.renew(session)
+
+            return self.__post(xml=xml, api_version=api_version, session_id=session.id,
+                               idempotent=idempotent, deadline=deadline)
+
+    def __post(self, xml: Union[Element, XmlRequest], api_version: Tuple[int, int], session_id: Optional[str],
+               idempotent: bool, deadline: Optional[float]) -> Element:
         url = 'https://{host}:{port}/api/{api_version}/xml'.format(
             host=self.host,
             port=self.port,
             api_version='.'.join([str(v) for v in api_version])
         )
 
-        session_id = self.sessions_id[api_version]
         if session_id is not None:
             xml.attrib['session-id'] = session_id
 
-        req_raw = etree.tostring(xml,
-                                 xml_declaration=True,
-                                 pretty_print=True,
-                                 encoding='UTF-8')
+        if isinstance(xml, XmlRequest):
+            # written again for each attempt, as a chunked upload
+            body = xml.chunks  # type: Callable[[], object]
+        else:
+            body = functools.partial(etree.tostring, xml, xml_declaration=True, encoding='UTF-8')
 
-        session = self.__get_session()
-        while True:
-            try:
-                ans = session.post(url=url, data=req_raw, verify=False)
-                break
-            except requests.exceptions.ConnectionError as e:
-                match = len(e.args) == 1
-                match = match and isinstance(e.args[0], ProtocolError)
-                match = match and len(e.args[0].args) == 2
-                match = match and e.args[0].args[0] == 'Connection aborted.'
-                match = match and isinstance(e.args[0].args[1], BadStatusLine)
-
-                if not match:
-                    raise
+        ans = self.__send(lambda session, timeout: session.post(url=url, data=body(), verify=False, timeout=timeout),
+                          reset=True, idempotent=idempotent, deadline=deadline)
 
         ans_xml = etree.fromstring(ans.content)
 
@@ -63,7 +88,18 @@ class ModuleBase:
 
         return ans_xml
 
-    def _get_xml(self, path: str) -> Element:
+    def _get_xml(self, path: str, deadline: Optional[float] = None) -> Element:
+        ans = self._get(path, deadline=deadline)
+        ans_xml = etree.fromstring(ans.content)
+
+        return ans_xml
+
+    def _get(self, path: str, headers: Optional[Mapping[str, str]] = None,
+             deadline: Optional[float] = None, stream: bool = False) -> requests.Response:
+        """
+        with `stream`, only the headers are read, the body being left to read from the response, which has to be
+        closed
+        """
         assert not path.startswith('/')
         url = 'https://{host}:{port}/{path}'.format(
             host=self.host,
@@ -71,30 +107,61 @@ class ModuleBase:
             path=path,
         )
 
-        session = self.__get_session(reset=False)
+        return self.__send(lambda session, timeout: session.get(url=url, headers=headers, verify=False,
+                                                                timeout=timeout, stream=stream),
+                           reset=False, idempotent=True, deadline=deadline)
+
+    def __send(self, request: Callable[[requests.Session, Timeout], requests.Response], reset: bool,
+               idempotent: bool, deadline: Optional[float]) -> requests.Response:
+        session = self.__get_session(reset=reset)
+
+        def call(timeout: Timeout) -> requests.Response:
+            if not idempotent or self.hedge_after is None:
+                return request(session, timeout)
+            return hedge(lambda: request(self.__copy_session(session), timeout), hedge_after=self.hedge_after)
+
+        return call_with_retry(
+            call,
+            policy=self.retry_policy,
+            breaker=CircuitBreaker.for_console(self.host, self.port),
+            deadline=Deadline(self.deadline if deadline is None else deadline),
+            timeout=self.timeout,
+            idempotent=idempotent,
+        )
 
-        ans = session.get(url=url, verify=False)
-        ans_xml = etree.fromstring(ans.content)
+    # session of the current thread, shared by every module so that a download sees the cookies of the last call
+    __local = threading.local()
 
-        return ans_xml
+    @staticmethod
+    def __new_session() -> requests.Session:
+        session = requests.Session()
+        session.headers['Content-Type'] = 'text/xml'
+        return session
 
-    __session = None
+    @staticmethod
+    def __copy_session(session: requests.Session) -> requests.Session:
+        """
+        hedged requests run concurrently, they cannot share a session
+        """
+        ret = ModuleBase.__new_session()
+        ret.cookies.update(session.cookies)
+        return ret
 
     @staticmethod
     def __get_session(reset: bool = True) -> requests.Session:
         """
+        one session per thread, as a session and its cookies cannot be shared by concurrent calls
+
         lies:
          - it is not solely based on login token but also on cookies
         """
-        if ModuleBase.__session is None:
-            session = requests.Session()
-            session.headers['Content-Type'] = 'text/xml'
-            ModuleBase.__session = session
-        else:
-            if reset:
-                ModuleBase.__session.cookies.clear()  # nexpose dislike having login cookies and login for other thing
+        session = getattr(ModuleBase.__local, 'session', None)
+        if session is None:
+            session = ModuleBase.__local.session = ModuleBase.__new_session()
+        elif reset:
+            session.cookies.clear()  # nexpose dislike having login cookies and login for other thing
 
-        return ModuleBase.__session
+        return session
 
     @staticmethod
     def __check_failure(xml: Element, api_version: Tuple[int, int]) -> None:
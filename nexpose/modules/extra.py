@@ -1,8 +1,73 @@
+import requests
+from lxml import etree
+from typing import BinaryIO, Optional, TYPE_CHECKING
+
+from nexpose.models.csv_report import CSVReportReader
 from nexpose.models.report import ReportConfigSummary, NexposeReport
 from nexpose.modules import ModuleBase
 
+if TYPE_CHECKING:
+    from nexpose.cache import ReportCache  # noqa: F401
+    from nexpose.models.filter import ReportFilter  # noqa: F401
+
 
 class Extra(ModuleBase):
-    def get_report_raw_xml_2(self, report: ReportConfigSummary) -> NexposeReport:
-        xml = self._get_xml(report.report_uri[1:])
-        return NexposeReport.from_xml(xml)
+    def get_report_raw_xml_2(self, report: ReportConfigSummary, cache: Optional['ReportCache'] = None) -> NexposeReport:
+        """
+        with a `cache`, a report already fetched for the same generation is not downloaded again; without a
+        generation date, the console is asked whether it changed since
+        """
+        if cache is None:
+            xml = self._get_xml(report.report_uri[1:])
+            return NexposeReport.from_xml(xml)
+
+        cached = cache.get(report.report_uri, report.generated_on)
+        if cached is not None and report.generated_on is not None:
+            return cached.report
+
+        headers = {}
+        if cached is not None:
+            if cached.etag is not None:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified is not None:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        ans = self._get(report.report_uri[1:], headers=headers)
+        if ans.status_code == 304 and cached is not None:
+            return cached.report
+
+        ret = NexposeReport.from_xml(etree.fromstring(ans.content))
+        cache.put(report.report_uri, report.generated_on, ret,
+                  etag=ans.headers.get('ETag'), last_modified=ans.headers.get('Last-Modified'))
+        return ret
+
+    CHUNK_SIZE = 1 << 16
+
+    def download_report(self, report: ReportConfigSummary, out: BinaryIO) -> int:
+        """
+        write the report as given by the console to `out` as it is received, returning its size
+        """
+        ret = 0
+        with self._get(report.report_uri[1:], stream=True) as ans:
+            for chunk in ans.iter_content(self.CHUNK_SIZE):
+                out.write(chunk)
+                ret += len(chunk)
+        return ret
+
+    def get_report_csv(self, report: ReportConfigSummary, where: Optional['ReportFilter'] = None) -> CSVReportReader:
+        """
+        findings of a report generated as `ReportConfigFormat.csv`, read from the network as they are iterated, so
+        only once; the connection is given back once they are read, or when the reader is closed
+
+            with nexpose.extra.get_report_csv(summary) as reader:
+                next(iter(reader))
+        """
+        ans = self._get(report.report_uri[1:], stream=True)
+        try:
+            ans.raise_for_status()
+        except requests.HTTPError:
+            ans.close()
+            raise
+        ans.raw.decode_content = True
+        ans.raw.auto_close = False  # read through a io.TextIOWrapper, which needs to see the end of the body
+        return CSVReportReader(ans.raw, where=where, closing=ans)
@@ -1,20 +1,31 @@
 import copy
+import datetime
+import threading
 
 from lxml.etree import Element
-from typing import Iterable
+from typing import Iterable, List, Optional, Tuple
 
-from nexpose.models.report import ReportTemplateSummary, ReportConfig, ReportSummary, ReportConfigSummary
+from nexpose.models.report import ReportTemplateSummary, ReportConfig, ReportSummary, ReportConfigSummary, \
+    ReportConfigFormat
+from nexpose.models.site import Site
 from nexpose.modules import ModuleBase
-from nexpose.utils import xml_pop_list, xml_pop
+from nexpose.networkerror import NetworkError
+from nexpose.utils import xml_get_list, xml_get
+
+# name of the configs owned by `ReportRegistry`, that it reuses and deletes
+MANAGED_PREFIX = 'nexpose-managed-'
+
+# template id, format and site id of a config
+ConfigKey = Tuple[str, ReportConfigFormat, str]
 
 
 class Report(ModuleBase):
     def report_template_listing(self) -> Iterable[ReportTemplateSummary]:
         request = Element('ReportTemplateListingRequest')
 
-        ans = self._post(xml=request)
+        ans = self._post(xml=request, idempotent=True)
 
-        templates = xml_pop_list(xml=ans, key='ReportTemplateSummary')
+        templates = xml_get_list(xml=ans, key='ReportTemplateSummary')
 
         return (ReportTemplateSummary.from_xml(template) for template in templates)
 
@@ -36,11 +47,99 @@ class Report(ModuleBase):
 
         ans = self._post(xml=request)
 
-        return ReportSummary.from_xml(xml_pop(xml=ans, key='ReportSummary'))
+        return ReportSummary.from_xml(xml_get(xml=ans, key='ReportSummary'))
 
     def report_listing(self) -> Iterable[ReportConfigSummary]:
         request = Element('ReportListingRequest')
 
-        ans = self._post(xml=request)
+        ans = self._post(xml=request, idempotent=True)
+
+        return (ReportConfigSummary.from_xml(report) for report in xml_get_list(xml=ans, key='ReportConfigSummary'))
+
+    def report_delete(self, config_id: str) -> None:
+        """
+        delete the report config `config_id` with its generated reports
+        """
+        request = Element('ReportDeleteRequest', attrib={
+            'reportcfg-id': str(config_id),
+        })
 
-        return (ReportConfigSummary.from_xml(report) for report in xml_pop_list(xml=ans, key='ReportConfigSummary'))
+        self._post(xml=request)
+
+
+def managed_name(key: ConfigKey) -> str:
+    template_id, report_format, site_id = key
+    return '{}{}-{}-site-{}'.format(MANAGED_PREFIX, template_id, report_format.value, site_id)
+
+
+class ReportRegistry:
+    """
+    one report config per template, format and site, named after them, found in `report_listing` or created on
+    first use and then generated again on each run
+    """
+
+    def __init__(self, report: Report) -> None:
+        self.report = report
+        self.__configs = {}  # type: dict[ConfigKey, ReportConfig]
+        self.__lock = threading.Lock()
+
+    def config(self, template: ReportTemplateSummary, report_format: ReportConfigFormat, site: Site) -> ReportConfig:
+        key = (template.id, report_format, str(site.id))
+
+        with self.__lock:
+            ret = self.__configs.get(key)
+            if ret is not None:
+                return ret
+
+            name = managed_name(key)
+            existing = next((summary for summary in self.report.report_listing()
+                             if summary.name == name and summary.template_id == template.id), None)
+            if existing is not None:
+                ret = ReportConfig(template=template, report_format=report_format, site=site,
+                                   report_id=existing.config_id, name=name)
+            else:
+                ret = self.report.report_save_request(ReportConfig(template=template, report_format=report_format,
+                                                                   site=site, name=name))
+
+            self.__configs[key] = ret
+            return ret
+
+    def generate(self, template: ReportTemplateSummary, report_format: ReportConfigFormat,
+                 site: Site) -> ReportSummary:
+        """
+        generate the config of `template`, `report_format` and `site`; it is looked up again on the next call if
+        the console refused it and no longer lists it, as when it was deleted behind our back
+        """
+        config = self.config(template, report_format, site)
+        try:
+            return self.report.report_generate(config)
+        except NetworkError:
+            if all(str(summary.config_id) != str(config.id) for summary in self.report.report_listing()):
+                self.forget(config.id)
+            raise
+
+    def forget(self, config_id: str) -> None:
+        with self.__lock:
+            for key, config in list(self.__configs.items()):
+                if str(config.id) == str(config_id):
+                    del self.__configs[key]
+
+    def collect(self, max_age: datetime.timedelta, now: Optional[datetime.datetime] = None) -> List[str]:
+        """
+        delete the managed configs last generated more than `max_age` ago, and those never generated but by this
+        registry, as when their generation failed, returning their ids
+        """
+        if now is None:
+            now = datetime.datetime.now()
+        with self.__lock:
+            live = {str(config.id) for config in self.__configs.values()}
+
+        stale = [summary.config_id for summary in self.report.report_listing()
+                 if summary.name is not None and summary.name.startswith(MANAGED_PREFIX) and
+                 (now - summary.generated_on > max_age if summary.generated_on is not None
+                  else str(summary.config_id) not in live)]
+
+        for config_id in stale:
+            self.report.report_delete(config_id)
+            self.forget(config_id)
+        return stale
@@ -5,7 +5,7 @@ from nexpose.models.scan import Scan as ScanModel, ScanSummary, Status
 from nexpose.models.scan import Template
 from nexpose.models.site import Site
 from nexpose.modules import ModuleBase
-from nexpose.utils import xml_pop
+from nexpose.utils import xml_get
 
 
 class Scan(ModuleBase):
@@ -37,7 +37,7 @@ class Scan(ModuleBase):
         })
 
         ans = self._post(xml=request)
-        scan = xml_pop(xml=ans, key='Scan')
+        scan = xml_get(xml=ans, key='Scan')
 
         return int(scan.attrib['scan-id'])
 
@@ -46,7 +46,7 @@ class Scan(ModuleBase):
             'scan-id': str(scan_id),
         })
 
-        ans = self._post(xml=request)
+        ans = self._post(xml=request, idempotent=True)
 
         return Status(ans.attrib['status'])
 
@@ -55,7 +55,7 @@ class Scan(ModuleBase):
             'scan-id': str(scan.id),
         })
 
-        ans = self._post(xml=request)
-        summary = xml_pop(xml=ans, key='ScanSummary')
+        ans = self._post(xml=request, idempotent=True)
+        summary = xml_get(xml=ans, key='ScanSummary')
 
         return ScanSummary.from_xml(xml=summary)
@@ -1,7 +1,13 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
 from lxml.etree import Element
-from typing import Tuple
+from typing import Tuple, Iterator, Optional
 
 from nexpose.modules import ModuleBase
+from nexpose.networkerror import NetworkError
 
 
 class Session(ModuleBase):
@@ -19,3 +25,163 @@ class Session(ModuleBase):
         request = Element('LogoutRequest')
 
         self._post(xml=request, api_version=api_version)
+
+
+class PooledSession:
+    def __init__(self, api_version: Tuple[int, int], session_id: str) -> None:
+        self.api_version = api_version
+        self.id = session_id
+        self.logged_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.logged_at
+
+
+class SessionPool:
+    """
+    hold up to `size` logged sessions per api version and lend them to one caller at a time
+
+    sessions older than `max_age - renew_margin` are logged again in the background while idle, so that
+    long jobs do not hit the console session timeout; a caller hitting it anyway can `renew` its session
+    """
+
+    def __init__(self, host: str, user_id: str, password: str, port: int = 3780, size: int = 1,
+                 max_age: float = 600, renew_margin: float = 60, background_renew: bool = True) -> None:
+        if size < 1:
+            raise ValueError(size)
+
+        self.host = host
+        self.port = port
+        self.user_id = user_id
+        self.password = password
+        self.size = size
+        self.max_age = max_age
+        self.renew_margin = renew_margin
+
+        self.__available = threading.Condition()
+        self.__idle = defaultdict(deque)  # type: defaultdict[Tuple[int, int], deque[PooledSession]]
+        self.__count = defaultdict(int)  # type: defaultdict[Tuple[int, int], int]
+        self.__closed = threading.Event()
+
+        self.__renewer: Optional[threading.Thread] = None
+        if background_renew:
+            self.__renewer = threading.Thread(target=self.__renew_loop, name='nexpose-session-renew', daemon=True)
+            self.__renewer.start()
+
+    def __enter__(self) -> 'SessionPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __login(self, api_version: Tuple[int, int]) -> str:
+        session = Session(host=self.host, port=self.port)
+        return session.login(user_id=self.user_id, password=self.password, api_version=api_version)
+
+    def __logout(self, api_version: Tuple[int, int], session_id: str) -> None:
+        session = Session(host=self.host, port=self.port, sessions_id={api_version: session_id})
+        try:
+            session.logout(api_version=api_version)
+        except NetworkError:
+            pass  # already expired on the console side
+
+    def __take(self, api_version: Tuple[int, int]) -> PooledSession:
+        with self.__available:
+            while True:
+                if self.__closed.is_set():
+                    raise RuntimeError('session pool is closed')
+
+                idle = self.__idle[api_version]
+                if idle:
+                    session = idle.popleft()
+                    break
+
+                if self.__count[api_version] < self.size:
+                    self.__count[api_version] += 1
+                    session = None
+                    break
+
+                self.__available.wait()
+
+        try:
+            if session is None:
+                session = PooledSession(api_version=api_version, session_id=self.__login(api_version))
+            elif session.age >= self.max_age:
+                self.renew(session)
+        except BaseException:
+            self.__discard(api_version)
+            raise
+
+        return session
+
+    def __give_back(self, session: PooledSession) -> None:
+        with self.__available:
+            if self.__closed.is_set():
+                self.__count[session.api_version] -= 1
+            else:
+                self.__idle[session.api_version].append(session)
+            self.__available.notify()
+
+        if self.__closed.is_set():
+            self.__logout(session.api_version, session.id)
+
+    def __discard(self, api_version: Tuple[int, int]) -> None:
+        with self.__available:
+            self.__count[api_version] -= 1
+            self.__available.notify()
+
+    @contextmanager
+    def acquire(self, api_version: Tuple[int, int] = (1, 1)) -> Iterator[PooledSession]:
+        session = self.__take(api_version)
+        try:
+            yield session
+        finally:
+            self.__give_back(session)
+
+    def renew(self, session: PooledSession) -> None:
+        """
+        login again in place of `session`, which has to be held by the caller
+        """
+        old_id = session.id
+
+        session.id = self.__login(session.api_version)
+        session.logged_at = time.monotonic()
+
+        self.__logout(session.api_version, old_id)
+
+    def __renew_loop(self) -> None:
+        period = max(self.renew_margin / 2, 1)
+
+        while not self.__closed.wait(period):
+            with self.__available:
+                to_renew = []  # type: list[PooledSession]
+                for idle in self.__idle.values():
+                    for session in list(idle):
+                        if session.age >= self.max_age - self.renew_margin:
+                            idle.remove(session)
+                            to_renew.append(session)
+
+            for session in to_renew:
+                try:
+                    self.renew(session)
+                except Exception:
+                    self.__discard(session.api_version)
+                else:
+                    self.__give_back(session)
+
+    def close(self) -> None:
+        with self.__available:
+            self.__closed.set()
+            idle = [session for sessions in self.__idle.values() for session in sessions]
+            for sessions in self.__idle.values():
+                sessions.clear()
+            for session in idle:
+                self.__count[session.api_version] -= 1
+            self.__available.notify_all()
+
+        if self.__renewer is not None and self.__renewer is not threading.current_thread():
+            self.__renewer.join()
+
+        for session in idle:
+            self.__logout(session.api_version, session.id)
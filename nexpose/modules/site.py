@@ -2,14 +2,14 @@ import copy
 
 from lxml.etree import Element
 
+from nexpose.models import XmlRequest
 from nexpose.models.site import Site as SiteModel
 from nexpose.modules import ModuleBase
 
 
 class Site(ModuleBase):
     def site_save(self, site: SiteModel) -> SiteModel:
-        request = Element('SiteSaveRequest')
-        request.append(site.to_xml())
+        request = XmlRequest('SiteSaveRequest', body=[site])
 
         ans = self._post(xml=request)
 
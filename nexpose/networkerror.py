@@ -1,7 +1,43 @@
+import re
+
+from typing import Iterable
+
 from nexpose.models.failure import Failure
 
 
 class NetworkError(Exception):
+    __SESSION_TIMEOUT = re.compile(r'session.*(timed out|time out|expired|not found|invalid)|invalid session',
+                                   re.IGNORECASE)
+
     def __init__(self, failure: Failure) -> None:
         super().__init__(repr(failure))
         self.failure = failure
+
+    def __messages(self) -> Iterable[str]:
+        for message in self.failure.messages:
+            yield message.message or ''
+        for exception in self.failure.exceptions:
+            for message in exception.messages:
+                yield message.message or ''
+
+    @property
+    def is_session_timeout(self) -> bool:
+        """
+        lies:
+         - the console has no error code for it, only a message
+        """
+        return any(self.__SESSION_TIMEOUT.search(message) for message in self.__messages())
+
+
+class CircuitOpenError(Exception):
+    """
+    the console failed too much lately, calls are refused until `retry_in` seconds
+    """
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(retry_in)
+        self.retry_in = retry_in
+
+
+class DeadlineExceededError(Exception):
+    pass
@@ -0,0 +1,291 @@
+"""
+download and parse of many reports in a pool of processes, their records streamed to a sink
+
+    with SQLiteSink('history.db') as sink:
+        metrics = pipeline.run(summaries, workers=8, sink=sink, nexpose=nexpose, cache_directory='~/.cache/nexpose')
+    metrics.report()
+
+the workers share an on disk cache of downloads, so that a report is downloaded once, and the set of vulnerability
+definitions already sent during the run, so that the sink gets each of them once; they send their records in batches through a
+bounded queue, and block while it is full, so that a slow sink slows them down rather than filling the memory
+"""
+import io
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, BinaryIO, Dict, IO, Iterable, Iterator, Optional, Tuple, TYPE_CHECKING
+
+from nexpose.cache import DownloadCache, SeenDefinitions
+from nexpose.models.report import ReportConfigSummary, Vulnerability
+from nexpose.models.stream import ReportReader
+
+if TYPE_CHECKING:
+    from nexpose import Nexpose  # noqa: F401
+    from nexpose.models.filter import ReportFilter  # noqa: F401
+    from nexpose.sinks import Sink  # noqa: F401
+
+# how long the parent waits on the queue before checking that the workers are still alive
+POLL = 1.0
+
+
+class WorkerMetrics:
+    __slots__ = ('pid', 'reports', 'records', 'bytes', 'cache_hits', 'download_seconds', 'parse_seconds',
+                 'blocked_seconds')
+
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        self.reports = 0
+        self.records = 0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.download_seconds = 0.0
+        self.parse_seconds = 0.0
+        # waiting for the sink, on the full queue
+        self.blocked_seconds = 0.0
+
+    def merge(self, other: 'WorkerMetrics') -> None:
+        for name in self.__slots__[1:]:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    @property
+    def records_per_second(self) -> float:
+        """
+        records parsed per second of parsing
+        """
+        return self.records / self.parse_seconds if self.parse_seconds else 0.0
+
+
+class PipelineMetrics:
+    def __init__(self) -> None:
+        self.workers = {}  # type: Dict[int, WorkerMetrics]
+        self.records = 0
+        self.sink_seconds = 0.0
+        self.elapsed = 0.0
+
+    def add(self, metrics: WorkerMetrics) -> None:
+        self.workers.setdefault(metrics.pid, WorkerMetrics(metrics.pid)).merge(metrics)
+
+    @property
+    def reports(self) -> int:
+        return sum(worker.reports for worker in self.workers.values())
+
+    def report(self, out: IO[str] = sys.stderr) -> None:
+        out.write('{} reports, {} records in {:.3f} s, {:.3f} s in the sink\n'.format(
+            self.reports, self.records, self.elapsed, self.sink_seconds))
+        out.write('{:>8} {:>8} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}\n'.format(
+            'pid', 'reports', 'hits', 'MiB', 'download', 'parse', 'blocked', 'records/s'))
+        for pid, worker in sorted(self.workers.items()):
+            out.write('{:>8} {:>8} {:>10} {:>10.1f} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.0f}\n'.format(
+                pid, worker.reports, worker.cache_hits, worker.bytes / 2 ** 20, worker.download_seconds,
+                worker.parse_seconds, worker.blocked_seconds, worker.records_per_second))
+
+
+class _Worker:
+    """
+    state of a worker process, made once by `_start_worker`
+    """
+
+    def __init__(self, records: Any, connection: Dict[str, Any], directory: str, max_bytes: int,
+                 include: Optional[Iterable[str]], where: Optional['ReportFilter'], batch_size: int,
+                 definitions: Optional[str]) -> None:
+        from nexpose.modules.extra import Extra
+
+        self.records = records
+        # every message of a report is read before its end, so nothing is left to flush when the worker exits but
+        # after an error, when the parent stops reading
+        records.cancel_join_thread()
+        self.extra = Extra(**connection)
+        self.downloads = DownloadCache(os.path.join(directory, 'downloads'), max_bytes)
+        self.definitions = None if definitions is None else SeenDefinitions(definitions)
+        self.include = include
+        self.where = where
+        self.batch_size = batch_size
+
+    def fetch(self, summary: ReportConfigSummary, metrics: WorkerMetrics) -> BinaryIO:
+        def download(out: BinaryIO) -> None:
+            metrics.bytes += self.extra.download_report(summary, out)
+
+        if summary.generated_on is None:
+            # nothing tells whether a cached copy is still the report
+            out = io.BytesIO()
+            download(out)
+            out.seek(0)
+            return out
+
+        ret, hit = self.downloads.fetch(summary.report_uri, summary.generated_on, download)
+        metrics.cache_hits += hit
+        return ret
+
+    def put(self, item: Tuple[str, int, Any], metrics: WorkerMetrics) -> None:
+        start = time.perf_counter()
+        self.records.put(item)
+        metrics.blocked_seconds += time.perf_counter() - start
+
+    def process(self, task: int, summary: ReportConfigSummary) -> None:
+        metrics = WorkerMetrics(os.getpid())
+        start = time.perf_counter()
+        stream = self.fetch(summary, metrics)
+        metrics.download_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = []  # type: list[Any]
+        vulnerabilities = []  # type: list[Vulnerability]
+        with stream:
+            for record in ReportReader(stream, self.include, self.where):
+                metrics.records += 1
+                if isinstance(record, Vulnerability) and self.definitions is not None:
+                    vulnerabilities.append(record)
+                    if len(vulnerabilities) >= self.batch_size:
+                        batch.extend(self.definitions.claim(vulnerabilities))
+                        vulnerabilities = []
+                else:
+                    batch.append(record)
+
+                if len(batch) >= self.batch_size:
+                    self.put(('records', task, batch), metrics)
+                    batch = []
+
+        if vulnerabilities:
+            batch.extend(self.definitions.claim(vulnerabilities))
+        if batch:
+            self.put(('records', task, batch), metrics)
+
+        metrics.reports = 1
+        metrics.parse_seconds = time.perf_counter() - start - metrics.blocked_seconds
+        self.put(('end', task, metrics), metrics)
+
+
+_worker = None  # type: Optional[_Worker]
+
+
+def _start_worker(*args: Any) -> None:
+    global _worker
+    _worker = _Worker(*args)
+
+
+def _process(task: int, summary: ReportConfigSummary) -> None:
+    try:
+        _worker.process(task, summary)
+    except BaseException:
+        _worker.records.put(('error', task, None))
+        raise
+
+
+def run(report_summaries: Iterable[ReportConfigSummary], workers: int = 4, sink: Optional['Sink'] = None, *,
+        nexpose: 'Nexpose', cache_directory: Optional[str] = None, max_bytes: int = 1 << 34,
+        include: Optional[Iterable[str]] = None, where: Optional['ReportFilter'] = None, batch_size: int = 256,
+        max_batches: Optional[int] = None, deduplicate: bool = True,
+        seen_definitions: Optional[str] = None) -> PipelineMetrics:
+    """
+    download, parse and write to `sink` the raw-xml-v2 reports of `report_summaries`, in `workers` processes
+    connecting to the console of `nexpose`, which has to be logged in with session ids rather than a session pool
+
+    the downloads are kept in `cache_directory`, up to `max_bytes`, a temporary directory being used for this run
+    only when None; at most `max_batches` batches of `batch_size` records wait for the sink; `include` and `where`
+    are as in `ReportReader`, and with `deduplicate` a vulnerability definition reaches the sink once, for the
+    first report of the run it is found in
+
+    the definitions sent are forgotten at the end of the run, unless kept in the file at `seen_definitions`, for
+    runs feeding the same sink: a definition sent by any of them is then never sent again
+    """
+    connection = dict(nexpose._kwargs)
+    if connection.get('session_pool') is not None:
+        raise ValueError('the workers cannot share a session pool, log in with session ids')
+
+    metrics = PipelineMetrics()
+    start = time.perf_counter()
+    with _directory(cache_directory) as directory, tempfile.TemporaryDirectory() as scratch:
+        definitions = None
+        if deduplicate:
+            definitions = seen_definitions or os.path.join(scratch, 'definitions')
+
+        context = multiprocessing.get_context()
+        records = context.Queue(max_batches or 4 * workers)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_start_worker,
+                                 initargs=(records, connection, directory, max_bytes, include, where, batch_size,
+                                           definitions)) as executor:
+            pending = {}  # type: Dict[int, Future]
+            summaries = enumerate(report_summaries)
+            try:
+                _drain(executor, summaries, pending, records, 2 * workers, sink, metrics)
+            except BaseException:
+                for future in pending.values():
+                    future.cancel()
+                _discard(pending, records)
+                raise
+
+    if sink is not None:
+        sink.flush()
+    metrics.elapsed = time.perf_counter() - start
+    return metrics
+
+
+class _directory:
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = path
+        self.__temporary = None  # type: Optional[tempfile.TemporaryDirectory]
+
+    def __enter__(self) -> str:
+        if self.path is not None:
+            ret = os.path.expanduser(self.path)
+            os.makedirs(ret, mode=0o700, exist_ok=True)
+            return ret
+        self.__temporary = tempfile.TemporaryDirectory()
+        return self.__temporary.name
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self.__temporary is not None:
+            self.__temporary.cleanup()
+
+
+def _drain(executor: ProcessPoolExecutor, summaries: Iterator[Tuple[int, ReportConfigSummary]],
+           pending: Dict[int, Future], records: Any, in_flight: int, sink: Optional['Sink'],
+           metrics: PipelineMetrics) -> None:
+    """
+    write the records of the workers to `sink`, with at most `in_flight` reports submitted at once
+    """
+    def submit() -> None:
+        for task, summary in summaries:
+            pending[task] = executor.submit(_process, task, summary)
+            return
+
+    for _ in range(in_flight):
+        submit()
+
+    while pending:
+        try:
+            kind, task, payload = records.get(timeout=POLL)
+        except queue.Empty:
+            for future in pending.values():
+                if future.done():
+                    future.result()  # a worker died without a word
+            continue
+
+        if kind == 'records':
+            metrics.records += len(payload)
+            if sink is not None:
+                start = time.perf_counter()
+                for record in payload:
+                    sink.write(record)
+                metrics.sink_seconds += time.perf_counter() - start
+        elif kind == 'end':
+            metrics.add(payload)
+            del pending[task]
+            submit()
+        else:
+            pending.pop(task).result()
+
+
+def _discard(pending: Dict[int, Future], records: Any) -> None:
+    """
+    empty the queue until the running tasks end, as they may be blocked on it
+    """
+    while not all(future.done() for future in pending.values()):
+        try:
+            records.get(timeout=0.1)
+        except queue.Empty:
+            pass
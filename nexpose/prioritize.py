@@ -0,0 +1,219 @@
+"""
+the findings to remediate first across reports, ranked by a scoring function and kept in a bounded heap
+
+    work = prioritize(['site-1.xml', 'site-2.xml'], top=100, workers=4)
+    for remediation in work.ranked:
+        print(remediation.score, remediation.address, remediation.vulnerability_id)
+
+each finding is scored as soon as its node is read, only the `top` best being kept; as the vulnerability definitions
+come after the nodes in a report, their factors are first read on their own, without building the nodes
+"""
+import heapq
+import math
+from typing import Any, Callable, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from nexpose.models.finding import VULNERABLE, address, value
+from nexpose.models.report import Node, SkillLevel, Test, TestStatus, Vulnerability
+from nexpose.models.stream import ReportReader
+
+INCLUDE = frozenset([
+    'nodes.address', 'nodes.device_id', 'nodes.site_name', 'nodes.site_importance', 'nodes.risk_score',
+    'nodes.tests.test_id', 'nodes.tests.status',
+    'nodes.endpoints.port', 'nodes.endpoints.services.name',
+    'nodes.endpoints.services.tests.test_id', 'nodes.endpoints.services.tests.status',
+])
+
+VULNERABILITY_INCLUDE = frozenset(
+    ['vulnerability_definition.' + name
+     for name in ('vulnerability_id', 'title', 'severity', 'cvss_score', 'risk_score', 'malware',
+                  'exploits.skill_level')]
+)
+
+
+class Factors(NamedTuple):
+    """
+    what a finding is scored on; `skill_level` is the one of the easiest exploit of the vulnerability
+    """
+    status: Optional[TestStatus]
+    node_risk_score: Optional[float]
+    site_importance: Optional[str]
+    title: Optional[str]
+    severity: Optional[int]
+    cvss_score: Optional[float]
+    risk_score: Optional[float]
+    skill_level: Optional[SkillLevel]
+    malware: bool
+
+
+# factors of a vulnerability, from title to malware
+VulnerabilityFactors = Tuple[Optional[str], Optional[int], Optional[float], Optional[float], Optional[SkillLevel], bool]
+
+UNKNOWN = (None, None, None, None, None, False)  # type: VulnerabilityFactors
+
+# easiest first
+SKILL_LEVELS = (SkillLevel.novice, SkillLevel.intermediate, SkillLevel.expert)
+
+
+def vulnerability_factors(vulnerability: Vulnerability) -> VulnerabilityFactors:
+    skills = {exploit.skill_level for exploit in vulnerability.exploits or ()}
+    skill_level = next((level for level in SKILL_LEVELS if level in skills), None)
+    return (vulnerability.title, vulnerability.severity, vulnerability.cvss_score, vulnerability.risk_score,
+            skill_level, vulnerability.malware is not None)
+
+
+def report_factors(source: Any) -> Mapping[str, VulnerabilityFactors]:
+    """
+    factors of each vulnerability of the report at `source`, by lowercase id, without building its nodes
+
+    a file object is read from its current position, to which it is put back
+    """
+    start = None if isinstance(source, (str, bytes)) else source.tell()
+    ret = {vulnerability.vulnerability_id.lower(): vulnerability_factors(vulnerability)
+           for vulnerability in ReportReader(source, include=VULNERABILITY_INCLUDE)}
+    if start is not None:
+        source.seek(start)
+    return ret
+
+
+class Scoring:
+    """
+    the cvss score of the vulnerability, or its severity without one, raised by its risk score, by its exploits
+    the easier they are and by malware; then weighted by the test status, the site importance and the risk score of
+    the node
+    """
+
+    EXPLOIT = {SkillLevel.novice: 3.0, SkillLevel.intermediate: 2.0, SkillLevel.expert: 1.0}
+    STATUS = {TestStatus.vulnerable_exploited: 2.0, TestStatus.vulnerable_version: 1.0}
+    IMPORTANCE = {'Very Low': 0.5, 'Low': 0.75, 'Normal': 1.0, 'High': 1.5, 'Very High': 2.0}
+
+    def __init__(self, risk: float = 0.005, malware: float = 2.0, node_risk: float = 0.1,
+                 exploit: Optional[Mapping[SkillLevel, float]] = None,
+                 status: Optional[Mapping[TestStatus, float]] = None,
+                 importance: Optional[Mapping[str, float]] = None) -> None:
+        self.risk = risk
+        self.malware = malware
+        self.node_risk = node_risk
+        self.exploit = self.EXPLOIT if exploit is None else exploit
+        self.status = self.STATUS if status is None else status
+        self.importance = self.IMPORTANCE if importance is None else importance
+
+    def __call__(self, factors: Factors) -> float:
+        base = factors.cvss_score if factors.cvss_score is not None else factors.severity or 0
+        base += self.risk * (factors.risk_score or 0) + self.exploit.get(factors.skill_level, 0.0)
+        if factors.malware:
+            base += self.malware
+        return (base * self.status.get(factors.status, 0.5) * self.importance.get(factors.site_importance, 1.0) *
+                (1 + self.node_risk * math.log10(1 + max(factors.node_risk_score or 0, 0))))
+
+
+class Remediation(NamedTuple):
+    """
+    missing strings are empty, so that remediations of equal scores are ordered
+    """
+    score: float
+    address: str
+    vulnerability_id: str
+    port: int  # -1 for a test of the node
+    service: str
+    device_id: str
+    site_name: str
+    title: str
+    status: str
+
+
+class Prioritizer:
+    """
+    the `top` best scored findings with a status in `statuses`, mergeable with the ones of other reports
+    """
+
+    def __init__(self, top: int = 100, score: Optional[Callable[[Factors], float]] = None,
+                 statuses: frozenset = VULNERABLE) -> None:
+        if top < 1:
+            raise ValueError(top)
+        self.top = top
+        self.score = Scoring() if score is None else score
+        self.statuses = statuses
+        self.findings = 0
+        self.__heap = []  # type: List[Remediation]
+
+    @property
+    def ranked(self) -> List[Remediation]:
+        """
+        best scored first
+        """
+        return sorted(self.__heap, reverse=True)
+
+    def __push(self, remediation: Remediation) -> None:
+        if len(self.__heap) < self.top:
+            heapq.heappush(self.__heap, remediation)
+        elif remediation > self.__heap[0]:
+            heapq.heapreplace(self.__heap, remediation)
+
+    def add_node(self, node: Node, vulnerabilities: Optional[Mapping[str, VulnerabilityFactors]] = None) -> None:
+        """
+        `vulnerabilities` factors by lowercase id, as `report_factors`
+        """
+        vulnerabilities = vulnerabilities or {}
+        host = address(node) or ''
+        importance = value(node.site_importance)
+        heap = self.__heap
+
+        def add(port: int, service: str, test: Test) -> None:
+            factors = vulnerabilities.get(test.id.lower(), UNKNOWN)
+            score = self.score(Factors(test.status, node.risk_score, importance, *factors))
+            self.findings += 1
+            # most findings are below the heap, and dropped before building their remediation
+            if len(heap) >= self.top and score < heap[0].score:
+                return
+            self.__push(Remediation(score, host, test.id, port, service, node.device_id or '', node.site_name or '',
+                                    factors[0] or '', value(test.status)))
+
+        for test in node.tests:
+            if test.status in self.statuses:
+                add(-1, '', test)
+        for endpoint in node.endpoints:
+            for service in endpoint.services:
+                for test in service.tests:
+                    if test.status in self.statuses:
+                        add(endpoint.port, service.name or '', test)
+
+    def add_report(self, source: Any) -> None:
+        """
+        read the report at `source`, never holding more than one of its nodes
+        """
+        vulnerabilities = report_factors(source)
+        for node in ReportReader(source, include=INCLUDE):
+            self.add_node(node, vulnerabilities)
+
+    def merge(self, other: 'Prioritizer') -> None:
+        self.findings += other.findings
+        for remediation in other.__heap:
+            self.__push(remediation)
+
+
+def _prioritize_one(source: Any, top: int, score: Optional[Callable[[Factors], float]],
+                    statuses: frozenset) -> Prioritizer:
+    ret = Prioritizer(top, score, statuses)
+    ret.add_report(source)
+    return ret
+
+
+def prioritize(sources: Iterable[Any], top: int = 100, score: Optional[Callable[[Factors], float]] = None,
+               statuses: frozenset = VULNERABLE, workers: Optional[int] = None) -> Prioritizer:
+    """
+    best scored findings of the reports at `sources`, one after the other or in a pool of `workers` processes, in
+    which case the sources have to be paths or bytes and `score` has to be picklable
+    """
+    ret = Prioritizer(top, score, statuses)
+    if not workers:
+        for source in sources:
+            ret.add_report(source)
+        return ret
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_prioritize_one, source, top, score, statuses) for source in sources]
+        for future in futures:
+            ret.merge(future.result())
+    return ret
@@ -0,0 +1,248 @@
+"""
+profiling of report parsing and api requests
+
+    with profile() as p:
+        NexposeReport.parse('report.xml')
+    p.report()
+    p.write_collapsed('parse.collapsed')  # flamegraph.pl parse.collapsed > parse.svg
+
+or for a whole run, `NEXPOSE_PROFILE=/tmp/run python script.py` writes /tmp/run.txt and /tmp/run.collapsed at exit
+
+time and calls are given per model class from cProfile, the memory still held at the end per model class from
+tracemalloc, and time and memory per request type; stacks are sampled every `interval` seconds in the profiled thread
+"""
+import atexit
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, IO, Iterator, Optional, Tuple
+
+from nexpose.models import XmlParse
+from nexpose.modules import ModuleBase
+
+# code compiled from a schema, see `nexpose.models.schema._Compiler.build`
+SCHEMA_CODE = re.compile(r'<schema ([\w.]+)\.\w+>')
+
+
+class Usage:
+    __slots__ = ('calls', 'seconds', 'bytes')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes = 0
+
+
+def _subclasses(cls: type) -> Iterator[type]:
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _subclasses(sub)
+
+
+def _model_codes() -> Dict[Tuple[str, int, str], str]:
+    """
+    model class of the hand written parse functions, by cProfile key
+    """
+    ret = {}
+    for cls in _subclasses(XmlParse):
+        function = getattr(cls.__dict__.get('_from_xml'), '__func__', None)
+        code = getattr(function, '__code__', None)
+        if code is not None and not SCHEMA_CODE.match(code.co_filename):
+            ret[(code.co_filename, code.co_firstlineno, code.co_name)] = cls.__name__
+    return ret
+
+
+def _model_of(filename: str) -> Optional[str]:
+    match = SCHEMA_CODE.match(filename)
+    return None if match is None else match.group(1)
+
+
+def _frame_label(code: Any) -> str:
+    name = getattr(code, 'co_qualname', code.co_name)
+    if code.co_filename.startswith('<'):
+        return code.co_filename.strip('<>').replace(' ', ':')
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return '{}:{}'.format(module, name)
+
+
+class Profile:
+    def __init__(self, memory: bool = True, interval: Optional[float] = 0.005, frames: int = 8) -> None:
+        self.memory = memory
+        self.interval = interval
+        self.frames = frames
+
+        self.profiler = cProfile.Profile()
+        self.requests = {}  # type: Dict[str, Usage]
+        self.models = {}  # type: Dict[str, Usage]
+        self.stacks = Counter()  # type: Counter
+        self.elapsed = 0.0
+
+        self.__patched = []  # type: list[Tuple[type, str, Any]]
+        self.__stop = threading.Event()
+        self.__sampler = None  # type: Optional[threading.Thread]
+        self.__started_tracing = False
+        self.__start = 0.0
+
+    def __request(self, argument: str, kind: Callable[[Any], str], original: Callable) -> Callable:
+        """
+        `original` timed by the request type `kind` gives of its `argument`
+        """
+        requests = self.requests
+        memory = self.memory
+
+        def wrapper(module: ModuleBase, *args: Any, **kwargs: Any) -> Any:
+            usage = requests.setdefault(kind(args[0] if args else kwargs[argument]), Usage())
+            before = tracemalloc.get_traced_memory()[0] if memory else 0
+            start = time.perf_counter()
+            try:
+                return original(module, *args, **kwargs)
+            finally:
+                usage.calls += 1
+                usage.seconds += time.perf_counter() - start
+                if memory:
+                    usage.bytes += tracemalloc.get_traced_memory()[0] - before
+
+        return wrapper
+
+    def __patch(self, cls: type, name: str, wrapper: Callable) -> None:
+        self.__patched.append((cls, name, cls.__dict__[name]))
+        setattr(cls, name, wrapper)
+
+    def __sample(self, thread_id: int) -> None:
+        while not self.__stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self) -> 'Profile':
+        # `_get_xml` goes through `_get`
+        self.__patch(ModuleBase, '_post', self.__request('xml', lambda xml: xml.tag, ModuleBase._post))
+        self.__patch(ModuleBase, '_get', self.__request('path', lambda path: 'GET ' + path.split('/')[0],
+                                                        ModuleBase._get))
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.__started_tracing = True
+        if self.interval is not None:
+            self.__stop.clear()
+            self.__sampler = threading.Thread(target=self.__sample, args=(threading.get_ident(),), daemon=True)
+            self.__sampler.start()
+
+        self.__start = time.perf_counter()
+        self.profiler.enable()
+        return self
+
+    def stop(self) -> None:
+        self.profiler.disable()
+        self.elapsed += time.perf_counter() - self.__start
+
+        if self.__sampler is not None:
+            self.__stop.set()
+            self.__sampler.join()
+            self.__sampler = None
+
+        while self.__patched:
+            cls, name, original = self.__patched.pop()
+            setattr(cls, name, original)
+
+        self.__collect_models()
+        if self.memory:
+            self.__collect_memory(tracemalloc.take_snapshot())
+            if self.__started_tracing:
+                tracemalloc.stop()
+                self.__started_tracing = False
+
+    def __enter__(self) -> 'Profile':
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def __collect_models(self) -> None:
+        codes = _model_codes()
+        for key, (_, calls, own, _, _) in pstats.Stats(self.profiler).stats.items():
+            model = _model_of(key[0]) or codes.get(key)
+            if model is not None:
+                usage = self.models.setdefault(model, Usage())
+                usage.calls += calls
+                usage.seconds += own
+
+    def __collect_memory(self, snapshot: tracemalloc.Snapshot) -> None:
+        """
+        memory allocated while parsing a model and still held, given to the innermost model being parsed
+        """
+        for statistic in snapshot.statistics('traceback'):
+            for frame in reversed(statistic.traceback):
+                model = _model_of(frame.filename)
+                if model is not None:
+                    self.models.setdefault(model, Usage()).bytes += statistic.size
+                    break
+
+    def stats(self) -> pstats.Stats:
+        return pstats.Stats(self.profiler)
+
+    def report(self, out: IO[str] = sys.stderr, limit: int = 20) -> None:
+        out.write('profiled {:.3f} s\n\n'.format(self.elapsed))
+
+        def table(title: str, usages: Dict[str, Usage]) -> None:
+            out.write('{:40} {:>10} {:>10} {:>12}\n'.format(title, 'calls', 'seconds', 'KiB'))
+            for name, usage in sorted(usages.items(), key=lambda item: -item[1].seconds)[:limit]:
+                out.write('{:40} {:>10} {:>10.4f} {:>12.1f}\n'.format(
+                    name, usage.calls, usage.seconds, usage.bytes / 1024))
+            out.write('\n')
+
+        table('model', self.models)
+        table('request', self.requests)
+
+        stats = pstats.Stats(self.profiler, stream=out)
+        stats.sort_stats('tottime').print_stats(limit)
+
+    def collapsed(self) -> Iterator[str]:
+        """
+        sampled stacks in the collapsed format of flamegraph.pl, root first
+        """
+        for stack, count in sorted(self.stacks.items()):
+            yield '{} {}'.format(stack, count)
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, 'w') as f:
+            for line in self.collapsed():
+                f.write(line + '\n')
+
+
+def profile(memory: bool = True, interval: Optional[float] = 0.005, frames: int = 8) -> Profile:
+    """
+    context manager profiling its body; allocations are only traced if `memory`, `frames` deep, and the stacks only
+    sampled if `interval` is not None
+    """
+    return Profile(memory=memory, interval=interval, frames=frames)
+
+
+def profile_environment(variable: str = 'NEXPOSE_PROFILE') -> Optional[Profile]:
+    """
+    profile until exit when `variable` is set, writing the report and the collapsed stacks next to its value
+    """
+    prefix = os.environ.get(variable)
+    if not prefix:
+        return None
+
+    ret = profile().start()
+
+    def dump() -> None:
+        ret.stop()
+        with open(prefix + '.txt', 'w') as f:
+            ret.report(f)
+        ret.write_collapsed(prefix + '.collapsed')
+
+    atexit.register(dump)
+    return ret
@@ -0,0 +1,390 @@
+"""
+rendering of the rich text of vulnerabilities, written to a text stream in a single walk of the element tree
+"""
+import html
+import re
+import threading
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from io import StringIO
+from typing import Callable, Dict, Hashable, Match, NamedTuple, Optional, Sequence, TextIO, Union
+from urllib.parse import urlsplit
+
+from nexpose.models.report import ContainerBlockElement, Description, ListItem, MultiNestedElement, \
+    OrderedList, Paragraph, Solution, Table, TableCell, TableRow, TextElement, UnorderedList, URLLink, Vulnerability
+
+INLINE = (str, URLLink)
+# links to anything else, as javascript:, are written as their text
+LINK_SCHEMES = frozenset(['http', 'https', 'mailto'])
+
+_MARKDOWN = re.compile(r'[\\`*_\[\]<>|~]')
+# the start of a heading, list item, quote or rule
+_MARKDOWN_LINE = re.compile(r'^([ \t]*\d*)([#+=-]|(?<=\d)[.)])(?=[ \t=-]|$)', re.MULTILINE)
+
+
+def _escaped(match: Match[str]) -> str:
+    return '\\' + match.group()
+
+
+def _linkable(url: str) -> bool:
+    return urlsplit(url.strip()).scheme.lower() in LINK_SCHEMES
+
+
+class RenderedVulnerability(NamedTuple):
+    description: str
+    solution: str
+
+
+class _Writer:
+    """
+    text stream prefixing every new line with the current indentation
+    """
+
+    def __init__(self, out: TextIO) -> None:
+        self.out = out
+        self.indent = ''
+
+    def write(self, text: str) -> None:
+        if self.indent:
+            text = text.replace('\n', '\n' + self.indent)
+        self.out.write(text)
+
+
+class Renderer(metaclass=ABCMeta):
+    """
+    base of the renderers, each element type being written by its own method
+
+    the rendering of the description and solution of a vulnerability is kept for the next vulnerability with the
+    same id and modification date, up to `cache_size` of them
+    """
+
+    def __init__(self, cache_size: int = 4096) -> None:
+        self.__write: Dict[type, Callable[[_Writer, TextElement], None]] = {
+            Description: self._nested,
+            Solution: self._nested,
+            Paragraph: self._paragraph,
+            ContainerBlockElement: self._container,
+            URLLink: self._link,
+            OrderedList: self._ordered_list,
+            UnorderedList: self._unordered_list,
+            ListItem: self._list_item,
+            Table: self._table,
+            TableRow: self._table_row,
+            TableCell: self._table_cell,
+        }
+        self.cache_size = cache_size
+        self.__cache: OrderedDict[Hashable, RenderedVulnerability] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def write(self, element: TextElement, out: TextIO) -> None:
+        self._write(_Writer(out), element)
+
+    def render(self, element: Optional[TextElement]) -> str:
+        if element is None:
+            return ''
+        out = StringIO()
+        self.write(element, out)
+        return out.getvalue()
+
+    def vulnerability(self, vulnerability: Vulnerability) -> RenderedVulnerability:
+        key = vulnerability.vulnerability_id, vulnerability.modified
+        with self.__lock:
+            ret = self.__cache.get(key)
+            if ret is not None:
+                self.__cache.move_to_end(key)
+                return ret
+
+        ret = RenderedVulnerability(
+            description=self.render(vulnerability.description),
+            solution=self.render(vulnerability.solution),
+        )
+
+        with self.__lock:
+            self.__cache[key] = ret
+            if len(self.__cache) > self.cache_size:
+                self.__cache.popitem(last=False)
+        return ret
+
+    def _write(self, out: _Writer, element: TextElement) -> None:
+        self.__write[type(element)](out, element)
+
+    def _text(self, out: _Writer, text: str) -> None:
+        out.write(text)
+
+    def _any(self, out: _Writer, nested: Union[str, TextElement]) -> None:
+        if isinstance(nested, str):
+            self._text(out, nested)
+        else:
+            self._write(out, nested)
+
+    def _join(self, out: _Writer, separator: str, elements: Sequence[Union[str, TextElement]]) -> None:
+        for i, element in enumerate(elements):
+            if i:
+                out.write(separator)
+            self._any(out, element)
+
+    def _nested(self, out: _Writer, element: MultiNestedElement) -> None:
+        for nested in element.nested:
+            self._any(out, nested)
+
+    def _paragraph(self, out: _Writer, paragraph: Paragraph) -> None:
+        self._nested(out, paragraph)
+
+    @abstractmethod
+    def _container(self, out: _Writer, container: ContainerBlockElement) -> None:
+        pass
+
+    @abstractmethod
+    def _link(self, out: _Writer, link: URLLink) -> None:
+        pass
+
+    @abstractmethod
+    def _ordered_list(self, out: _Writer, ordered: OrderedList) -> None:
+        pass
+
+    @abstractmethod
+    def _unordered_list(self, out: _Writer, unordered: UnorderedList) -> None:
+        pass
+
+    @abstractmethod
+    def _list_item(self, out: _Writer, item: ListItem) -> None:
+        pass
+
+    @abstractmethod
+    def _table(self, out: _Writer, table: Table) -> None:
+        pass
+
+    @abstractmethod
+    def _table_row(self, out: _Writer, row: TableRow) -> None:
+        pass
+
+    def _table_cell(self, out: _Writer, cell: TableCell) -> None:
+        self._write(out, cell.content)
+
+
+class PlainRenderer(Renderer):
+    """
+    the text as given by `str`, with links in markdown style
+    """
+
+    def _container(self, out: _Writer, container: ContainerBlockElement) -> None:
+        self._join(out, '\n', container.nested)
+
+    def _link(self, out: _Writer, link: URLLink) -> None:
+        out.write('[{}]({})'.format(link.title, link.url))
+
+    def _list(self, out: _Writer, items: Sequence[ListItem]) -> None:
+        for i, item in enumerate(items):
+            out.write('\n - ' if i else ' - ')
+            self._write(out, item)
+
+    def _ordered_list(self, out: _Writer, ordered: OrderedList) -> None:
+        self._list(out, ordered.elements)
+
+    def _unordered_list(self, out: _Writer, unordered: UnorderedList) -> None:
+        self._list(out, tuple(unordered.items))
+
+    def _list_item(self, out: _Writer, item: ListItem) -> None:
+        out.write(item.text or '')
+        out.write('\n')
+        self._join(out, '\n', item.nested)
+
+    def _table(self, out: _Writer, table: Table) -> None:
+        out.write(table.title)
+        out.write('\n')
+        self._join(out, '\n', table.rows)
+
+    def _table_row(self, out: _Writer, row: TableRow) -> None:
+        out.write(row.title)
+        out.write('\t')
+        self._join(out, '\t', row.cells)
+
+
+class MarkdownRenderer(Renderer):
+    """
+    blocks separated by blank lines, lists indented under their item and tables with the row titles as first column
+
+    the text is escaped, so that nothing in it reads as markdown
+    """
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        text = _MARKDOWN.sub(_escaped, text)
+        return _MARKDOWN_LINE.sub(r'\1\\\2', text)
+
+    def _text(self, out: _Writer, text: str) -> None:
+        out.write(self._escape(text))
+
+    def _inline(self, out: _Writer, element: MultiNestedElement) -> None:
+        previous = None
+        for nested in element.nested:
+            if previous is not None:
+                out.write(' ' if isinstance(previous, INLINE) and isinstance(nested, INLINE) else '\n\n')
+            self._any(out, nested)
+            previous = nested
+
+    def _nested(self, out: _Writer, element: MultiNestedElement) -> None:
+        self._inline(out, element)
+
+    def _paragraph(self, out: _Writer, paragraph: Paragraph) -> None:
+        if not paragraph.preformat:
+            self._inline(out, paragraph)
+            return
+
+        out.write('```\n')
+        for nested in paragraph.nested:
+            if isinstance(nested, str):
+                out.write(nested)
+            elif isinstance(nested, URLLink):
+                out.write(' {} '.format(nested.url))
+            else:
+                out.write('\n')
+                PLAIN._write(out, nested)
+                out.write('\n')
+        out.write('\n```')
+
+    def _container(self, out: _Writer, container: ContainerBlockElement) -> None:
+        self._join(out, '\n\n', container.nested)
+
+    def _link(self, out: _Writer, link: URLLink) -> None:
+        text = self._escape(link.text or link.title)
+        if not _linkable(link.url):
+            out.write(text)
+            return
+        url = re.sub(r'[\\()]', _escaped, link.url.strip()).replace(' ', '%20')
+        out.write('[{}]({})'.format(text, url))
+
+    def _list(self, out: _Writer, items: Sequence[ListItem], marker: Callable[[int], str]) -> None:
+        indent = out.indent
+        for i, item in enumerate(items):
+            prefix = marker(i)
+            if i:
+                out.write('\n')
+            out.write(prefix)
+            out.indent = indent + ' ' * len(prefix)
+            self._write(out, item)
+            out.indent = indent
+
+    def _ordered_list(self, out: _Writer, ordered: OrderedList) -> None:
+        self._list(out, ordered.elements, lambda i: '{}. '.format(i + 1))
+
+    def _unordered_list(self, out: _Writer, unordered: UnorderedList) -> None:
+        self._list(out, tuple(unordered.items), lambda i: '- ')
+
+    def _list_item(self, out: _Writer, item: ListItem) -> None:
+        if item.text is not None:
+            self._text(out, item.text)
+        for i, nested in enumerate(item.nested):
+            if i or item.text is not None:
+                out.write('\n')
+            self._any(out, nested)
+
+    @staticmethod
+    def _cell(text: str) -> str:
+        return _MARKDOWN.sub(_escaped, text.replace('\n', ' '))
+
+    def _table(self, out: _Writer, table: Table) -> None:
+        columns = max((len(row.cells) for row in table.rows), default=0)
+        out.write('| {} |{}\n'.format(self._cell(table.title), ' |' * columns))
+        out.write('|---|{}'.format('---|' * columns))
+        for row in table.rows:
+            out.write('\n')
+            self._table_row(out, row)
+
+    def _table_row(self, out: _Writer, row: TableRow) -> None:
+        out.write('| {} |'.format(self._cell(row.title)))
+        for cell in row.cells:
+            out.write(' {} |'.format(self._cell(PLAIN.render(cell))))
+
+
+class HtmlRenderer(Renderer):
+    """
+    escaped html fragments, a paragraph holding other blocks being a div, and links only to http, https or
+    mailto urls
+    """
+
+    def _text(self, out: _Writer, text: str) -> None:
+        out.write(html.escape(text, quote=False))
+
+    def _nested(self, out: _Writer, element: MultiNestedElement) -> None:
+        previous = None
+        for nested in element.nested:
+            if isinstance(previous, INLINE) and isinstance(nested, INLINE):
+                out.write(' ')
+            self._any(out, nested)
+            previous = nested
+
+    def _paragraph(self, out: _Writer, paragraph: Paragraph) -> None:
+        if paragraph.preformat:
+            tag = 'pre'
+        elif all(isinstance(nested, INLINE) for nested in paragraph.nested):
+            tag = 'p'
+        else:
+            tag = 'div'
+        out.write('<{}>'.format(tag))
+        self._nested(out, paragraph)
+        out.write('</{}>'.format(tag))
+
+    def _container(self, out: _Writer, container: ContainerBlockElement) -> None:
+        out.write('<div>')
+        self._join(out, '', container.nested)
+        out.write('</div>')
+
+    def _link(self, out: _Writer, link: URLLink) -> None:
+        text = html.escape(link.text or link.title, quote=False)
+        if not _linkable(link.url):
+            out.write(text)
+            return
+        out.write('<a href="{}" title="{}">{}</a>'.format(html.escape(link.url.strip()), html.escape(link.title),
+                                                          text))
+
+    def _list(self, out: _Writer, tag: str, items: Sequence[ListItem]) -> None:
+        out.write('<{}>'.format(tag))
+        for item in items:
+            out.write('<li>')
+            self._write(out, item)
+            out.write('</li>')
+        out.write('</{}>'.format(tag))
+
+    def _ordered_list(self, out: _Writer, ordered: OrderedList) -> None:
+        self._list(out, 'ol', ordered.elements)
+
+    def _unordered_list(self, out: _Writer, unordered: UnorderedList) -> None:
+        self._list(out, 'ul', tuple(unordered.items))
+
+    def _list_item(self, out: _Writer, item: ListItem) -> None:
+        if item.text is not None:
+            self._text(out, item.text)
+        self._nested(out, item)
+
+    def _table(self, out: _Writer, table: Table) -> None:
+        out.write('<table><caption>')
+        self._text(out, table.title)
+        out.write('</caption>')
+        self._join(out, '', table.rows)
+        out.write('</table>')
+
+    def _table_row(self, out: _Writer, row: TableRow) -> None:
+        out.write('<tr><th>')
+        self._text(out, row.title)
+        out.write('</th>')
+        for cell in row.cells:
+            out.write('<td>')
+            self._write(out, cell)
+            out.write('</td>')
+        out.write('</tr>')
+
+
+PLAIN = PlainRenderer()
+
+
+def renderer(style: str, cache_size: int = 4096) -> Renderer:
+    """
+    `plain`, `markdown` or `html`
+    """
+    styles: Dict[str, Callable[[int], Renderer]] = {
+        'plain': PlainRenderer,
+        'markdown': MarkdownRenderer,
+        'html': HtmlRenderer,
+    }
+    return styles[style](cache_size)
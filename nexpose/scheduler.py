@@ -0,0 +1,222 @@
+import heapq
+import itertools
+import logging
+import time
+
+from requests.exceptions import RequestException
+from typing import Callable, Hashable, Iterable, List, Optional
+
+from nexpose.models.scan import Status
+from nexpose.models.site import Site
+from nexpose.modules.scan import Scan
+from nexpose.networkerror import NetworkError, CircuitOpenError, DeadlineExceededError
+
+ENDED_STATUSES = frozenset([Status.finished, Status.stopped, Status.error, Status.aborted])
+DISPATCH_ERRORS = (NetworkError, RequestException, CircuitOpenError, DeadlineExceededError)
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledScan:
+    def __init__(self, site: Site, priority: int, engine: Optional[Hashable], submitted_at: float) -> None:
+        self.site = site
+        self.priority = priority
+        self.engine = engine
+        self.submitted_at = submitted_at
+
+        self.not_before = submitted_at
+        self.attempts = 0
+        self.scan_id = None  # type: Optional[int]
+        self.dispatched_at = None  # type: Optional[float]
+        self.ended_at = None  # type: Optional[float]
+        self.status = None  # type: Optional[Status]
+        self.error = None  # type: Optional[Exception]
+
+    @property
+    def wait_time(self) -> Optional[float]:
+        if self.dispatched_at is None:
+            return None
+        return self.dispatched_at - self.submitted_at
+
+
+class SchedulerMetrics:
+    def __init__(self, queue_depth: int, running: int, completed: int, failed: int, mean_wait: Optional[float],
+                 max_wait: Optional[float], throughput: Optional[float]) -> None:
+        self.queue_depth = queue_depth
+        self.running = running
+        self.completed = completed
+        self.failed = failed
+        self.mean_wait = mean_wait
+        self.max_wait = max_wait
+        self.throughput = throughput
+
+    def __repr__(self) -> str:
+        return '{}({})'.format(self.__class__.__name__,
+                               ', '.join('{}={!r}'.format(k, v) for k, v in sorted(self.__dict__.items())))
+
+
+class ScanScheduler:
+    """
+    queue sites and start their scans as engines become free
+
+    higher `priority` is scanned first, then first submitted first scanned;
+    at most `max_concurrent` scans run on the console and at most `max_per_engine` on each `engine` given
+    at submission; a dispatch failing is retried `max_retries` times with exponential delay
+    """
+
+    def __init__(self, scan: Scan, max_concurrent: int, max_per_engine: Optional[int] = None,
+                 max_retries: int = 3, retry_delay: float = 5,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if max_concurrent < 1:
+            raise ValueError(max_concurrent)
+
+        self.scan = scan
+        self.max_concurrent = max_concurrent
+        self.max_per_engine = max_per_engine
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.clock = clock
+
+        self.__queue = []  # type: list[tuple[int, int, ScheduledScan]]
+        self.__sequence = itertools.count()
+        self.__running = {}  # type: dict[int, ScheduledScan]
+        self.__per_engine = {}  # type: dict[Hashable, int]
+
+        self.__started_at = None  # type: Optional[float]
+        self.__completed = []  # type: List[ScheduledScan]
+        self.__failed = []  # type: List[ScheduledScan]
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.__queue)
+
+    @property
+    def running(self) -> Iterable[ScheduledScan]:
+        return list(self.__running.values())
+
+    def submit(self, site: Site, priority: int = 0, engine: Optional[Hashable] = None) -> ScheduledScan:
+        scheduled = ScheduledScan(site=site, priority=priority, engine=engine, submitted_at=self.clock())
+        self.__push(scheduled)
+        return scheduled
+
+    def __push(self, scheduled: ScheduledScan) -> None:
+        heapq.heappush(self.__queue, (-scheduled.priority, next(self.__sequence), scheduled))
+
+    def __engine_full(self, engine: Optional[Hashable]) -> bool:
+        if engine is None or self.max_per_engine is None:
+            return False
+        return self.__per_engine.get(engine, 0) >= self.max_per_engine
+
+    def __dispatch(self, scheduled: ScheduledScan, now: float) -> bool:
+        scheduled.attempts += 1
+        try:
+            scan_id = self.scan.site_scan(site=scheduled.site)
+        except DISPATCH_ERRORS as e:
+            scheduled.error = e
+            if scheduled.attempts > self.max_retries:
+                logger.warning('giving up scanning site %s: %r', scheduled.site.id, e)
+                scheduled.ended_at = now
+                self.__failed.append(scheduled)
+                return False
+
+            scheduled.not_before = now + self.retry_delay * 2 ** (scheduled.attempts - 1)
+            self.__push(scheduled)
+            return True
+
+        if self.__started_at is None:
+            self.__started_at = now
+
+        scheduled.scan_id = scan_id
+        scheduled.dispatched_at = now
+        scheduled.error = None
+        self.__running[scan_id] = scheduled
+        if scheduled.engine is not None:
+            self.__per_engine[scheduled.engine] = self.__per_engine.get(scheduled.engine, 0) + 1
+
+        return True
+
+    def __reap(self, now: float) -> List[ScheduledScan]:
+        ended = []  # type: List[ScheduledScan]
+
+        for scan_id, scheduled in list(self.__running.items()):
+            try:
+                status = self.scan.scan_status(scan_id=scan_id)
+            except DISPATCH_ERRORS as e:
+                logger.debug('unable to get status of scan %s: %r', scan_id, e)
+                continue
+
+            scheduled.status = status
+            if status not in ENDED_STATUSES:
+                continue
+
+            del self.__running[scan_id]
+            if scheduled.engine is not None:
+                self.__per_engine[scheduled.engine] -= 1
+            scheduled.ended_at = now
+            if status is Status.error:
+                self.__failed.append(scheduled)
+            else:
+                self.__completed.append(scheduled)
+            ended.append(scheduled)
+
+        return ended
+
+    def __fill(self, now: float) -> List[ScheduledScan]:
+        postponed = []  # type: List[ScheduledScan]
+        given_up = []  # type: List[ScheduledScan]
+
+        while self.__queue and len(self.__running) < self.max_concurrent:
+            _, _, scheduled = heapq.heappop(self.__queue)
+
+            if scheduled.not_before > now or self.__engine_full(scheduled.engine):
+                postponed.append(scheduled)
+                continue
+
+            if not self.__dispatch(scheduled, now):
+                given_up.append(scheduled)
+
+        for scheduled in postponed:
+            self.__push(scheduled)
+
+        return given_up
+
+    def poll(self) -> List[ScheduledScan]:
+        """
+        update running scans, start queued ones in the freed slots and return the scans which ended,
+        including those which could not be dispatched
+        """
+        now = self.clock()
+        ended = self.__reap(now)
+        ended.extend(self.__fill(now))
+        return ended
+
+    def run(self, poll_interval: float = 5, sleep: Callable[[float], None] = time.sleep) -> List[ScheduledScan]:
+        """
+        poll until every submitted scan ended, return them in end order
+        """
+        ended = []  # type: List[ScheduledScan]
+
+        while True:
+            ended.extend(self.poll())
+            if not self.__queue and not self.__running:
+                return ended
+            sleep(poll_interval)
+
+    def metrics(self) -> SchedulerMetrics:
+        waits = [s.wait_time for s in self.__completed] + [s.wait_time for s in self.__running.values()]
+
+        throughput = None
+        if self.__started_at is not None and self.__completed:
+            elapsed = self.clock() - self.__started_at
+            if elapsed > 0:
+                throughput = len(self.__completed) / elapsed
+
+        return SchedulerMetrics(
+            queue_depth=self.queue_depth,
+            running=len(self.__running),
+            completed=len(self.__completed),
+            failed=len(self.__failed),
+            mean_wait=sum(waits) / len(waits) if waits else None,
+            max_wait=max(waits) if waits else None,
+            throughput=throughput,
+        )
@@ -0,0 +1,256 @@
+"""
+full text search over the vulnerability definitions of a report
+
+    index = VulnerabilityIndex.for_report('report.xml')
+    index.search('openssl AND NOT "denial of service"')
+    index.nodes('CVE-2014-0160')
+
+a query is made of words and "quoted phrases", combined with AND (or nothing), OR, NOT and parentheses; a word
+holding punctuation, as CVE-2014-0160, is searched as the phrase of its tokens
+
+an index is saved with `marshal`, as plain lists, dicts and tuples, so that reading one found next to a report never
+runs any code, unlike a pickle
+"""
+import marshal
+import os
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from nexpose.models.finding import VULNERABLE
+from nexpose.models.report import Node, NexposeReport, Test, Vulnerability
+from nexpose.render import PLAIN
+from nexpose.types import IP
+
+# positions of two fields of a document are this far apart, so that no phrase spans both
+FIELD_GAP = 1 << 20
+
+TOKEN = re.compile(r'\w+')
+QUERY = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+
+Postings = Dict[int, Tuple[int, ...]]
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(text.lower())
+
+
+def _vulnerable_tests(node: Node) -> Iterator[Test]:
+    tests = list(node.tests)
+    for endpoint in node.endpoints:
+        for service in endpoint.services:
+            tests.extend(service.tests)
+    return (test for test in tests if test.status in VULNERABLE)
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+class VulnerabilityIndex:
+    """
+    positional inverted index of the title, description, solution, references and tags of vulnerabilities, with
+    the nodes found vulnerable to each of them
+    """
+
+    VERSION = 2
+
+    def __init__(self) -> None:
+        self.ids = []  # type: List[str]
+        self.postings = defaultdict(dict)  # type: Dict[str, Postings]
+        self.affected = defaultdict(set)  # type: Dict[str, Set[IP]]
+
+    @classmethod
+    def build(cls, vulnerabilities: Iterable[Vulnerability], nodes: Iterable[Node] = ()) -> 'VulnerabilityIndex':
+        ret = cls()
+        for vulnerability in vulnerabilities:
+            ret.add(vulnerability)
+        for node in nodes:
+            ret.add_node(node)
+        return ret
+
+    @classmethod
+    def from_report(cls, report: NexposeReport) -> 'VulnerabilityIndex':
+        return cls.build(report.vulnerability_definition, report.nodes)
+
+    def add(self, vulnerability: Vulnerability) -> None:
+        doc = len(self.ids)
+        self.ids.append(vulnerability.vulnerability_id)
+
+        fields = [
+            vulnerability.title,
+            PLAIN.render(vulnerability.description),
+            PLAIN.render(vulnerability.solution),
+            ' '.join(reference.text for reference in vulnerability.references),
+            ' '.join(tag.text for tag in vulnerability.tags),
+        ]
+
+        positions = defaultdict(list)  # type: Dict[str, List[int]]
+        for i, field in enumerate(fields):
+            for position, token in enumerate(tokenize(field or ''), i * FIELD_GAP):
+                positions[token].append(position)
+        for token, token_positions in positions.items():
+            self.postings[token][doc] = tuple(token_positions)
+
+    def add_node(self, node: Node) -> None:
+        for test in _vulnerable_tests(node):
+            self.affected[test.id.lower()].add(node.address)
+
+    @property
+    def everything(self) -> FrozenSet[int]:
+        return frozenset(range(len(self.ids)))
+
+    def _word(self, token: str) -> Set[int]:
+        return set(self.postings.get(token, ()))
+
+    def _phrase(self, tokens: List[str]) -> Set[int]:
+        if not tokens:
+            return set()
+        if len(tokens) == 1:
+            return self._word(tokens[0])
+
+        postings = [self.postings.get(token) for token in tokens]
+        if not all(postings):
+            return set()
+
+        ret = set()
+        for doc in set.intersection(*(set(p) for p in postings)):
+            starts = set(postings[0][doc])
+            for offset, p in enumerate(postings[1:], 1):
+                starts &= {position - offset for position in p[doc]}
+                if not starts:
+                    break
+            else:
+                ret.add(doc)
+        return ret
+
+    def _terms(self, query: str) -> List[Tuple[str, object]]:
+        ret = []  # type: List[Tuple[str, object]]
+        position = 0
+        query = query.rstrip()
+        while position < len(query):
+            match = QUERY.match(query, position)
+            if match is None:
+                raise QuerySyntaxError('unterminated phrase at {}'.format(position))
+            position = match.end()
+
+            opening, closing, phrase, word = match.groups()
+            if opening:
+                ret.append(('(', None))
+            elif closing:
+                ret.append((')', None))
+            elif phrase is not None:
+                ret.append(('phrase', tokenize(phrase)))
+            elif word in ('AND', 'OR', 'NOT'):
+                ret.append((word, None))
+            else:
+                ret.append(('phrase', tokenize(word)))
+        return ret
+
+    def match(self, query: str) -> Set[int]:
+        """
+        documents matching `query`
+        """
+        terms = self._terms(query)
+        position = 0
+
+        def peek() -> Optional[str]:
+            return terms[position][0] if position < len(terms) else None
+
+        def take(kind: str) -> object:
+            nonlocal position
+            if peek() != kind:
+                raise QuerySyntaxError('expected {} in {!r}'.format(kind, query))
+            position += 1
+            return terms[position - 1][1]
+
+        def either() -> Set[int]:
+            ret = both()
+            while peek() == 'OR':
+                take('OR')
+                ret = ret | both()
+            return ret
+
+        def both() -> Set[int]:
+            ret = negation()
+            while peek() in ('AND', 'NOT', 'phrase', '('):
+                if peek() == 'AND':
+                    take('AND')
+                ret = ret & negation()
+            return ret
+
+        def negation() -> Set[int]:
+            if peek() == 'NOT':
+                take('NOT')
+                return set(self.everything - negation())
+            return atom()
+
+        def atom() -> Set[int]:
+            if peek() == '(':
+                take('(')
+                ret = either()
+                take(')')
+                return ret
+            return self._phrase(take('phrase'))
+
+        ret = either()
+        if position != len(terms):
+            raise QuerySyntaxError('unexpected {} in {!r}'.format(terms[position][0], query))
+        return ret
+
+    def search(self, query: str) -> List[str]:
+        """
+        ids of the vulnerabilities matching `query`, in indexing order
+        """
+        return [self.ids[doc] for doc in sorted(self.match(query))]
+
+    def nodes(self, query: str) -> Mapping[str, FrozenSet[IP]]:
+        """
+        addresses of the nodes vulnerable to each vulnerability matching `query`
+        """
+        return {vulnerability_id: frozenset(self.affected.get(vulnerability_id.lower(), ()))
+                for vulnerability_id in self.search(query)}
+
+    def save(self, path: str) -> None:
+        state = self.VERSION, self.ids, dict(self.postings), dict(self.affected)
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp, 'wb') as f:
+            marshal.dump(state, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'VulnerabilityIndex':
+        with open(path, 'rb') as f:
+            state = marshal.load(f)
+        if not isinstance(state, tuple) or len(state) != 4 or state[0] != cls.VERSION:
+            raise ValueError('{} is not an index of version {}'.format(path, cls.VERSION))
+        _, ids, postings, affected = state
+        if not (isinstance(ids, list) and isinstance(postings, dict) and isinstance(affected, dict)):
+            raise ValueError('{} is not an index'.format(path))
+
+        ret = cls()
+        ret.ids = ids
+        ret.postings.update(postings)
+        ret.affected.update(affected)
+        return ret
+
+    @staticmethod
+    def path_for(report_path: str) -> str:
+        return report_path + '.index'
+
+    @classmethod
+    def for_report(cls, report_path: str) -> 'VulnerabilityIndex':
+        """
+        index saved next to the report at `report_path`, built and saved first if missing or older than the report
+        """
+        path = cls.path_for(report_path)
+        try:
+            if os.stat(path).st_mtime >= os.stat(report_path).st_mtime:
+                return cls.load(path)
+        except (OSError, ValueError, EOFError, TypeError):
+            pass
+
+        include = {'vulnerability_definition', 'nodes.address', 'nodes.tests', 'nodes.endpoints.services.tests'}
+        ret = cls.from_report(NexposeReport.parse(report_path, include=include))
+        ret.save(path)
+        return ret
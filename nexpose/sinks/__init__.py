@@ -0,0 +1,66 @@
+"""
+destinations of the records of a report, fed one record at a time so that the whole report is never in memory
+"""
+from abc import ABCMeta, abstractmethod
+from typing import Any, Iterable, Optional
+
+from nexpose.models.finding import Finding
+from nexpose.models.report import Node, Vulnerability
+from nexpose.models.scan import Scan
+
+
+class Sink(metaclass=ABCMeta):
+    """
+    a record is a `Scan`, a `Node` or a `Vulnerability`, as given by `ReportReader`, or a `Finding` for the sinks
+    taking flat findings, as given by `CSVReportReader`
+    """
+
+    def write(self, record: Any) -> None:
+        if isinstance(record, Node):
+            self.write_node(record)
+        elif isinstance(record, Vulnerability):
+            self.write_vulnerability(record)
+        elif isinstance(record, Scan):
+            self.write_scan(record)
+        elif isinstance(record, Finding):
+            self.write_finding(record)
+        else:
+            raise TypeError('unknown record {!r}'.format(record))
+
+    def write_all(self, records: Iterable[Any]) -> None:
+        for record in records:
+            self.write(record)
+        self.flush()
+
+    def load(self, source: Any, include: Optional[Iterable[str]] = None, where: Optional[Any] = None) -> None:
+        """
+        stream the report at `source` into the sink, see `ReportReader` for `include` and `where`
+        """
+        from nexpose.models.stream import ReportReader
+        self.write_all(ReportReader(source, include, where))
+
+    def write_scan(self, scan: Scan) -> None:
+        pass
+
+    @abstractmethod
+    def write_node(self, node: Node) -> None:
+        pass
+
+    @abstractmethod
+    def write_vulnerability(self, vulnerability: Vulnerability) -> None:
+        pass
+
+    def write_finding(self, finding: Finding) -> None:
+        raise TypeError('{} does not take findings'.format(type(self).__name__))
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> 'Sink':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,84 @@
+"""
+newline delimited json export, one object per finding
+"""
+import gzip
+import json
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
+
+from nexpose.models.finding import INCLUDE, Finding, VULNERABLE, VulnerabilitySummaries, findings, \
+    vulnerability_summaries
+from nexpose.models.report import Node, Vulnerability
+from nexpose.sinks import Sink
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), check_circular=False).encode
+
+
+class NDJSONSink(Sink):
+    """
+    write the findings of each node as soon as it is read, with the title, severity and cvss score of its
+    vulnerability
+
+    `out` is a path or a binary stream, gzip compressed if `compress`; when fed through `load`, the vulnerabilities
+    are first read on their own, otherwise they can be given as `vulnerabilities`
+    """
+
+    def __init__(self, out: Union[str, BinaryIO], compress: bool = False,
+                 vulnerabilities: Optional[VulnerabilitySummaries] = None,
+                 statuses: Optional[frozenset] = VULNERABLE, buffer_size: int = 1000) -> None:
+        self.__owned = isinstance(out, str)
+        raw = open(out, 'wb') if isinstance(out, str) else out
+        self.__raw = raw
+        self.__compressed = gzip.GzipFile(fileobj=raw, mode='wb') if compress else None
+        self.__out = self.__compressed or raw
+
+        self.vulnerabilities = vulnerabilities
+        self.statuses = statuses
+        self.buffer_size = buffer_size
+        self.written = 0
+        self.__lines = []  # type: list[str]
+
+    def load(self, source: Any, include: Optional[Iterable[str]] = None, where: Optional[Any] = None) -> None:
+        if self.vulnerabilities is None:
+            self.vulnerabilities = vulnerability_summaries(source)
+        if include is None:
+            include = INCLUDE
+        super().load(source, include, where)
+
+    def write_finding(self, finding: Finding) -> None:
+        self.__lines.append(_encode(finding._asdict()))
+        if len(self.__lines) >= self.buffer_size:
+            self.flush()
+
+    def write_node(self, node: Node) -> None:
+        for finding in findings(node, self.vulnerabilities, self.statuses):
+            self.write_finding(finding)
+
+    def write_vulnerability(self, vulnerability: Vulnerability) -> None:
+        pass
+
+    def flush(self) -> None:
+        if self.__lines:
+            self.__lines.append('')
+            self.__out.write('\n'.join(self.__lines).encode())
+            self.written += len(self.__lines) - 1
+            self.__lines.clear()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+            if self.__compressed is not None:
+                self.__compressed.close()
+        finally:
+            if self.__owned:
+                self.__raw.close()
+
+
+def read(path: str) -> Iterator[dict]:
+    """
+    the objects of an export, gzip compressed or not
+    """
+    with open(path, 'rb') as f:
+        compressed = f.read(2) == b'\x1f\x8b'
+    with (gzip.open if compressed else open)(path, 'rt', encoding='utf-8') as lines:
+        for line in lines:
+            yield json.loads(line)
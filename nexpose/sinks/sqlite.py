@@ -0,0 +1,242 @@
+"""
+report history in a sqlite database
+
+nodes are keyed by device id and replace their previous endpoints, services and tests; vulnerabilities are keyed
+by id and only written again when their modification date changed
+"""
+import sqlite3
+from typing import Any, Dict, Optional, Tuple
+
+from nexpose.models.finding import address, value
+from nexpose.models.report import Node, Vulnerability
+from nexpose.models.scan import Scan
+from nexpose.sinks import Sink
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scans (
+    scan_id INTEGER PRIMARY KEY,
+    name TEXT,
+    status TEXT,
+    start_time TEXT,
+    end_time TEXT
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    device_id INTEGER PRIMARY KEY,
+    address TEXT,
+    status TEXT,
+    site_name TEXT,
+    site_importance TEXT,
+    scan_template TEXT,
+    risk_score REAL,
+    hardware_address TEXT
+);
+CREATE TABLE IF NOT EXISTS endpoints (
+    device_id INTEGER NOT NULL,
+    protocol TEXT,
+    port INTEGER,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS endpoints_device ON endpoints (device_id);
+CREATE TABLE IF NOT EXISTS services (
+    device_id INTEGER NOT NULL,
+    protocol TEXT,
+    port INTEGER,
+    name TEXT
+);
+CREATE INDEX IF NOT EXISTS services_device ON services (device_id);
+CREATE TABLE IF NOT EXISTS tests (
+    device_id INTEGER NOT NULL,
+    protocol TEXT,
+    port INTEGER,
+    service TEXT,
+    vulnerability_id TEXT,
+    key TEXT,
+    status TEXT,
+    scan_id INTEGER,
+    vulnerable_since TEXT,
+    pci_compliance_status TEXT
+);
+CREATE INDEX IF NOT EXISTS tests_device ON tests (device_id);
+CREATE INDEX IF NOT EXISTS tests_vulnerability ON tests (vulnerability_id);
+CREATE TABLE IF NOT EXISTS vulnerabilities (
+    vulnerability_id TEXT PRIMARY KEY,
+    title TEXT,
+    severity INTEGER,
+    pci_severity INTEGER,
+    cvss_score REAL,
+    cvss_vector TEXT,
+    published TEXT,
+    added TEXT,
+    modified TEXT,
+    risk_score REAL
+);
+CREATE TABLE IF NOT EXISTS vulnerability_references (
+    vulnerability_id TEXT NOT NULL,
+    source TEXT,
+    reference TEXT
+);
+CREATE INDEX IF NOT EXISTS vulnerability_references_id ON vulnerability_references (vulnerability_id);
+'''
+
+INSERT = {
+    'scans': 'INSERT OR REPLACE INTO scans VALUES (?, ?, ?, ?, ?)',
+    'nodes': 'INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+    'endpoints': 'INSERT INTO endpoints VALUES (?, ?, ?, ?)',
+    'services': 'INSERT INTO services VALUES (?, ?, ?, ?)',
+    'tests': 'INSERT INTO tests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'vulnerabilities': 'INSERT OR REPLACE INTO vulnerabilities VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'vulnerability_references': 'INSERT INTO vulnerability_references VALUES (?, ?, ?)',
+}
+
+# children replaced with their parent, by table of the parent
+CHILDREN = {
+    'nodes': ('endpoints', 'services', 'tests'),
+    'vulnerabilities': ('vulnerability_references',),
+}
+KEYS = {
+    'nodes': 'device_id',
+    'vulnerabilities': 'vulnerability_id',
+}
+
+
+class SQLiteSink(Sink):
+    """
+    every write of a sink is done in a single transaction, committed on `flush`, with rows sent by `batch_size`
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000) -> None:
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.skipped = 0
+
+        self.__rows = {table: [] for table in INSERT}  # type: Dict[str, list[Tuple]]
+        self.__keys = {table: set() for table in CHILDREN}  # type: Dict[str, set[Any]]
+        self.__modified = None  # type: Optional[Dict[str, str]]
+        self.__in_transaction = False
+
+    def __begin(self) -> None:
+        if not self.__in_transaction:
+            self.connection.execute('BEGIN')
+            self.__in_transaction = True
+
+    def __add(self, table: str, row: Tuple) -> None:
+        self.__rows[table].append(row)
+
+    def __replace(self, table: str, key: Any) -> None:
+        """
+        the children of a batch are deleted before any of its rows are inserted, so a key written twice sends the
+        batch holding the first one
+        """
+        keys = self.__keys[table]
+        if key in keys:
+            self.__send(table)
+        keys.add(key)
+
+    def __full(self, table: str) -> bool:
+        return len(self.__rows[table]) >= self.batch_size
+
+    def __send(self, *tables: str) -> None:
+        self.__begin()
+        for table in tables:
+            rows = self.__rows[table]
+            if not rows:
+                continue
+
+            children = CHILDREN.get(table, ())
+            if children:
+                keys = [(row[0],) for row in rows]
+                for child in children:
+                    self.connection.executemany('DELETE FROM {} WHERE {} = ?'.format(child, KEYS[table]), keys)
+            self.connection.executemany(INSERT[table], rows)
+            rows.clear()
+            if children:
+                self.__keys[table].clear()
+
+            for child in children:
+                self.connection.executemany(INSERT[child], self.__rows[child])
+                self.__rows[child].clear()
+
+    def write_scan(self, scan: Scan) -> None:
+        self.__add('scans', (scan.id, scan.name, value(scan.status), value(scan.start_time),
+                             value(scan.end_time)))
+        if self.__full('scans'):
+            self.__send('scans')
+
+    def write_node(self, node: Node) -> None:
+        device_id = int(node.device_id)
+        self.__replace('nodes', device_id)
+        self.__add('nodes', (device_id, address(node), value(node.status), node.site_name,
+                             value(node.site_importance), node.scan_template_name, node.risk_score,
+                             node.hardware_address))
+
+        for test in node.tests:
+            self.__test(device_id, None, None, None, test)
+        for endpoint in node.endpoints:
+            protocol = value(endpoint.protocol)
+            self.__add('endpoints', (device_id, protocol, endpoint.port, value(endpoint.status)))
+            for service in endpoint.services:
+                self.__add('services', (device_id, protocol, endpoint.port, service.name))
+                for test in service.tests:
+                    self.__test(device_id, protocol, endpoint.port, service.name, test)
+
+        if self.__full('nodes'):
+            self.__send('nodes')
+
+    def __test(self, device_id: int, protocol: Optional[str], port: Optional[int], service: Optional[str],
+               test: Any) -> None:
+        self.__add('tests', (device_id, protocol, port, service, test.id, test.key, value(test.status),
+                             test.scan_id, value(test.vulnerable_since), value(test.pci_compliance_status)))
+
+    def stored_modified(self) -> Dict[str, str]:
+        """
+        modification date of the stored vulnerabilities, by id
+        """
+        if self.__modified is None:
+            self.__modified = dict(self.connection.execute('SELECT vulnerability_id, modified FROM vulnerabilities'))
+        return self.__modified
+
+    def write_vulnerability(self, vulnerability: Vulnerability) -> None:
+        modified = value(vulnerability.modified)
+        stored = self.stored_modified()
+        if modified is not None and stored.get(vulnerability.vulnerability_id) == modified:
+            self.skipped += 1
+            return
+        stored[vulnerability.vulnerability_id] = modified
+
+        v = vulnerability
+        self.__replace('vulnerabilities', v.vulnerability_id)
+        self.__add('vulnerabilities', (v.vulnerability_id, v.title, v.severity, v.pci_severity, v.cvss_score,
+                                       v.cvss_vector, value(v.published), value(v.added), modified, v.risk_score))
+        for reference in v.references:
+            self.__add('vulnerability_references', (v.vulnerability_id, value(reference.source), reference.text))
+
+        if self.__full('vulnerabilities'):
+            self.__send('vulnerabilities')
+
+    def flush(self) -> None:
+        self.__send(*(table for table in INSERT if table not in sum(CHILDREN.values(), ())))
+        if self.__in_transaction:
+            self.connection.execute('COMMIT')
+            self.__in_transaction = False
+
+    def rollback(self) -> None:
+        for rows in self.__rows.values():
+            rows.clear()
+        for keys in self.__keys.values():
+            keys.clear()
+        self.__modified = None
+        if self.__in_transaction:
+            self.connection.execute('ROLLBACK')
+            self.__in_transaction = False
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self.connection.close()
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is not None:
+            self.rollback()
+        self.close()
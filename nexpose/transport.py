@@ -0,0 +1,218 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+from typing import Callable, Optional, Iterable, Tuple, TypeVar, Union
+
+from nexpose.networkerror import CircuitOpenError, DeadlineExceededError
+
+T = TypeVar('T')
+Timeout = Union[None, float, Tuple[Optional[float], Optional[float]]]
+
+
+class RetryPolicy:
+    """
+    exponential backoff, `jitter` is the fraction of each delay which is randomized
+
+    connection errors are always retried, as the console tends to abort connections under load;
+    read timeouts and `retry_statuses` only for idempotent calls, as the console might have processed the request
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30, jitter: float = 1,
+                 retry_statuses: Iterable[int] = (502, 503, 504),
+                 rand: Callable[[], float] = random.random) -> None:
+        if max_attempts < 1:
+            raise ValueError(max_attempts)
+        if not 0 <= jitter <= 1:
+            raise ValueError(jitter)
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.rand = rand
+
+    def delay(self, attempt: int) -> float:
+        cap = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return cap * (1 - self.jitter + self.jitter * self.rand())
+
+    def is_retryable(self, error: Exception, idempotent: bool) -> bool:
+        if isinstance(error, (requests.exceptions.ReadTimeout, requests.exceptions.HTTPError)):
+            return idempotent
+        return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+class Deadline:
+    def __init__(self, seconds: Optional[float], clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.expire_at = None if seconds is None else clock() + seconds
+
+    def remaining(self) -> Optional[float]:
+        if self.expire_at is None:
+            return None
+        return self.expire_at - self.clock()
+
+    def check(self) -> None:
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceededError()
+
+    def timeout(self, timeout: Timeout) -> Timeout:
+        """
+        shrink a requests `timeout` to fit in the remaining time
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+    def sleep(self, delay: float) -> None:
+        remaining = self.remaining()
+        if remaining is not None and remaining <= delay:
+            raise DeadlineExceededError()
+        time.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    open after `failure_threshold` consecutive transport failures, then fail fast for `reset_timeout` seconds;
+    after that, let a single call through to probe the console
+    """
+
+    closed = 'closed'
+    open = 'open'
+    half_open = 'half-open'
+
+    __registry = {}  # type: dict[Tuple[str, int], CircuitBreaker]
+    __registry_lock = threading.Lock()
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+
+        self.__lock = threading.Lock()
+        self.__failures = 0
+        self.__opened_at = None  # type: Optional[float]
+        self.__probing = False
+
+    @classmethod
+    def for_console(cls, host: str, port: int) -> 'CircuitBreaker':
+        with cls.__registry_lock:
+            breaker = cls.__registry.get((host, port))
+            if breaker is None:
+                breaker = cls()
+                cls.__registry[(host, port)] = breaker
+            return breaker
+
+    @property
+    def state(self) -> str:
+        with self.__lock:
+            return self.__state()
+
+    def __state(self) -> str:
+        if self.__opened_at is None:
+            return self.closed
+        if self.clock() - self.__opened_at < self.reset_timeout:
+            return self.open
+        return self.half_open
+
+    def before_call(self) -> None:
+        with self.__lock:
+            state = self.__state()
+            if state == self.closed:
+                return
+            if state == self.half_open and not self.__probing:
+                self.__probing = True
+                return
+            raise CircuitOpenError(self.__opened_at + self.reset_timeout - self.clock())
+
+    def record_success(self) -> None:
+        with self.__lock:
+            self.__failures = 0
+            self.__opened_at = None
+            self.__probing = False
+
+    def record_failure(self) -> None:
+        with self.__lock:
+            self.__failures += 1
+            if self.__probing or self.__failures >= self.failure_threshold:
+                self.__opened_at = self.clock()
+            self.__probing = False
+
+    def release(self) -> None:
+        """
+        end a call which failed for another reason than the console, without counting it
+        """
+        with self.__lock:
+            self.__probing = False
+
+
+def hedge(call: Callable[[], T], hedge_after: float, max_hedges: int = 1) -> T:
+    """
+    start `call` again each `hedge_after` seconds while none of the previous ones returned, up to `max_hedges`
+    more times; return the first result or raise the first error if every started call failed
+    """
+    executor = ThreadPoolExecutor(max_workers=max_hedges + 1)
+    try:
+        pending = {executor.submit(call)}
+        launched = 1
+        errors = []  # type: list[BaseException]
+
+        while pending:
+            timeout = hedge_after if launched <= max_hedges else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    return future.result()
+                errors.append(error)
+
+            if not done:
+                pending.add(executor.submit(call))
+                launched += 1
+
+        raise errors[0]
+    finally:
+        executor.shutdown(wait=False)
+
+
+def call_with_retry(call: Callable[[Timeout], requests.Response], policy: RetryPolicy, breaker: CircuitBreaker,
+                    deadline: Deadline, timeout: Timeout, idempotent: bool) -> requests.Response:
+    attempt = 0
+    while True:
+        # before taking the probe of a half open breaker, which every exit path below gives back
+        attempt_timeout = deadline.timeout(timeout)
+        breaker.before_call()
+
+        error = None  # type: Optional[Exception]
+        try:
+            ans = call(attempt_timeout)
+        except requests.exceptions.RequestException as e:
+            error = e
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            if ans.status_code not in policy.retry_statuses:
+                breaker.record_success()
+                return ans
+            error = requests.exceptions.HTTPError(response=ans)
+
+        breaker.record_failure()
+        attempt += 1
+        if not policy.is_retryable(error, idempotent) or attempt >= policy.max_attempts:
+            raise error
+
+        deadline.sleep(policy.delay(attempt - 1))
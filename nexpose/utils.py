@@ -1,62 +1,54 @@
 import datetime
 
-from typing import Iterable, TypeVar, Callable, Optional
+from typing import Iterable, TypeVar, Optional
 
 from nexpose.types import Element as ElementType
 
 T = TypeVar('T')
 
 
-def xml_pop_apply(xml: ElementType, key: str, func: Callable[[ElementType], ElementType],
-                  *default: ElementType) -> ElementType:
+def xml_get(xml: ElementType, key: str, *default: ElementType) -> ElementType:
     elem = xml.find(key)
     if elem is None:
         if len(default) == 0:
             raise KeyError(key)
         return default[0]
 
-    xml.remove(elem)
+    return elem
 
-    return func(elem)
 
+def xml_get_list(xml: ElementType, key: str) -> Iterable[ElementType]:
+    return xml.findall(key)
 
-def xml_pop(xml: ElementType, key: str, *default: ElementType) -> ElementType:
-    return xml_pop_apply(xml, key, lambda x: x, *default)
 
+def clean_text(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
 
-def xml_pop_list(xml: ElementType, key: str) -> Iterable[ElementType]:
-    elems = xml.findall(key)
+    res = text.strip()
+    if res == '':
+        res = None
+    return res
 
-    for elem in elems:
-        xml.remove(elem)
 
-    return elems
+def xml_text(xml: ElementType) -> Optional[str]:
+    return clean_text(xml.text)
 
 
-def xml_pop_children(xml: ElementType, key: str, *default: ElementType) -> Iterable[ElementType]:
-    elem = xml_pop(xml, key, *default)
-    children = list(elem)
-
-    for child in children:
-        elem.remove(child)
-
-    return children
-
-
-def xml_text_pop(xml: ElementType) -> Optional[str]:
-    text = xml.text
-    xml.text = None
-    return text
-
-
-def xml_tail_pop(xml: ElementType) -> Optional[str]:
-    tail = xml.tail
-    xml.tail = None
-    return tail
-
+def xml_tail(xml: ElementType) -> Optional[str]:
+    return clean_text(xml.tail)
 
 
 def parse_date(raw: str) -> datetime.datetime:
+    """
+    `raw` as `%Y%m%dT%H%M%S%f`, sliced directly when it has the fixed width nexpose uses
+    """
+    if 16 <= len(raw) <= 21 and raw[8] == 'T' and raw.isascii() and raw[:8].isdigit() and raw[9:].isdigit():
+        try:
+            return datetime.datetime(int(raw[:4]), int(raw[4:6]), int(raw[6:8]), int(raw[9:11]), int(raw[11:13]),
+                                     int(raw[13:15]), int(raw[15:].ljust(6, '0')))
+        except ValueError:
+            pass  # strptime also accepts shorter fields
     return datetime.datetime.strptime(raw, '%Y%m%dT%H%M%S%f')
 
 def return_none():
@@ -4,5 +4,9 @@ setup(
     name='nexpose',
     version='0.1',
     packages=find_packages(exclude=['test']),
+    python_requires='>=3.10',
     install_requires=['requests', 'mypy_lang', 'lxml'],
+    extras_require={
+        'analytics': ['numpy'],
+    },
 )
@@ -1,5 +1,11 @@
 import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from typing import Mapping, Optional, Any, Tuple
 from typing import MutableSet
@@ -61,7 +67,7 @@ class TestBaseLogged(TestBase):
 
         self.nexpose = Nexpose(**kwargs)
 
-        self.added_site = set()  # type: MutableSet[Site]
+        self.added_site: MutableSet[Site] = set()
 
     def tearDown(self):
         super().tearDown()
@@ -71,3 +77,36 @@ class TestBaseLogged(TestBase):
 
         for api_version in [(1, 1)]:
             self.nexpose.session.logout(api_version=api_version)
+
+
+@unittest.skipIf(shutil.which('openssl') is None, 'needs openssl to sign the stub console certificate')
+class TestBaseStub(unittest.TestCase):
+    """
+    `nexpose` connects to a stub console on localhost, an https server answering with `handler`, with a self signed
+    certificate
+    """
+
+    handler = BaseHTTPRequestHandler  # type: type[BaseHTTPRequestHandler]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        cert = os.path.join(self.directory.name, 'cert.pem')
+        key = os.path.join(self.directory.name, 'key.pem')
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'ec', '-pkeyopt', 'ec_paramgen_curve:prime256v1',
+                        '-nodes', '-days', '1', '-subj', '/CN=localhost', '-keyout', key, '-out', cert],
+                       check=True, capture_output=True)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler)
+        self.server.daemon_threads = True
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        self.nexpose = Nexpose(host='127.0.0.1', port=self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
@@ -0,0 +1,79 @@
+import unittest
+from collections import Counter
+
+from lxml import etree
+
+from bench.synthetic import generate_bytes
+from nexpose.aggregate import FleetStatistics, HyperLogLog, aggregate
+from nexpose.models.finding import VULNERABLE
+from nexpose.models.report import NexposeReport
+
+
+class TestHyperLogLog(unittest.TestCase):
+    def test_estimate(self):
+        for count in (0, 10, 1000, 50000):
+            hll = HyperLogLog()
+            for i in range(count):
+                hll.add('host-{}'.format(i))
+                hll.add('host-{}'.format(i))
+            self.assertLessEqual(abs(len(hll) - count), max(1, count * 0.03))
+
+    def test_merge(self):
+        left, right, both = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+        for i in range(3000):
+            (left if i % 2 else right).add(str(i))
+            both.add(str(i))
+        left.merge(right)
+        self.assertEqual(both.registers, left.registers)
+
+        with self.assertRaises(ValueError):
+            left.merge(HyperLogLog(11))
+
+
+class TestFleetStatistics(unittest.TestCase):
+    REPORTS = [generate_bytes(nodes=15, vulnerabilities=8, seed=seed) for seed in range(3)]
+
+    def expected(self):
+        per_vulnerability, per_severity, importance = Counter(), Counter(), Counter()
+        risks = []
+        for raw in self.REPORTS:
+            report = NexposeReport.from_xml(etree.fromstring(raw))
+            severities = {v.vulnerability_id.lower(): v.severity for v in report.vulnerability_definition}
+            for node in report.nodes:
+                importance[node.site_importance.value] += 1
+                risks.append(node.risk_score)
+                tests = list(node.tests) + [t for e in node.endpoints for s in e.services for t in s.tests]
+                for test in tests:
+                    if test.status in VULNERABLE:
+                        per_vulnerability[test.id] += 1
+                        per_severity[severities[test.id.lower()]] += 1
+        return per_vulnerability, per_severity, importance, sorted(risks, reverse=True)
+
+    def check(self, stats):
+        per_vulnerability, per_severity, importance, risks = self.expected()
+        self.assertEqual(3, stats.reports)
+        self.assertEqual(45, stats.nodes)
+        self.assertEqual(per_vulnerability, stats.per_vulnerability)
+        self.assertEqual(per_severity, stats.per_severity)
+        self.assertEqual(importance, stats.per_site_importance)
+        self.assertEqual(risks[:4], [risk for risk, _, _ in stats.riskiest])
+        # the synthetic reports share their addresses
+        self.assertEqual(15, len(stats.hosts))
+
+    def test_serial(self):
+        self.check(aggregate(self.REPORTS, top=4))
+
+    def test_merge(self):
+        partials = []
+        for raw in self.REPORTS:
+            partial = FleetStatistics(top=4)
+            partial.add_report(raw)
+            partials.append(partial)
+
+        stats = FleetStatistics(top=4)
+        for partial in reversed(partials):
+            stats.merge(partial)
+        self.check(stats)
+
+    def test_pool(self):
+        self.check(aggregate(self.REPORTS, workers=2, top=4))
@@ -0,0 +1,115 @@
+import math
+import unittest
+from collections import Counter, defaultdict
+
+from lxml import etree
+
+from bench.synthetic import generate_bytes, generate_csv_bytes
+from nexpose.models.csv_report import CSVReportReader
+from nexpose.models.finding import VULNERABLE
+from nexpose.models.report import NexposeReport
+
+try:
+    import numpy
+    from nexpose.analytics import RiskAnalytics
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'needs numpy')
+class TestRiskAnalytics(unittest.TestCase):
+    RAW = generate_bytes(nodes=40, vulnerabilities=15)
+
+    def setUp(self):
+        self.report = NexposeReport.from_xml(etree.fromstring(self.RAW))
+        self.analytics = RiskAnalytics.load(self.RAW)
+        self.vulnerabilities = {v.vulnerability_id.lower(): v for v in self.report.vulnerability_definition}
+
+    def findings(self):
+        for node in self.report.nodes:
+            for test in node.tests:
+                if test.status in VULNERABLE:
+                    yield node, None, self.vulnerabilities[test.id.lower()]
+            for endpoint in node.endpoints:
+                for service in endpoint.services:
+                    for test in service.tests:
+                        if test.status in VULNERABLE:
+                            yield node, endpoint.port, self.vulnerabilities[test.id.lower()]
+
+    def assertSums(self, expected, actual):
+        self.assertEqual(set(expected), set(actual))
+        for key, value in expected.items():
+            self.assertAlmostEqual(value, actual[key])
+
+    def test_same_as_from_report(self):
+        other = RiskAnalytics.from_report(self.report)
+        self.assertSums(self.analytics.sum_by('cvss', by='site'), other.sum_by('cvss', by='site'))
+        self.assertEqual(len(self.analytics.finding_node), len(other.finding_node))
+
+    def test_sums(self):
+        risk, cvss, ports, severities = defaultdict(float), defaultdict(float), Counter(), Counter()
+        for node in self.report.nodes:
+            risk[node.site_name] += node.risk_score
+        for node, port, vulnerability in self.findings():
+            subnet = '{}.{}.{}.0/24'.format(*node.address[:3])
+            cvss[subnet] += vulnerability.cvss_score
+            ports[port] += 1
+            severities[vulnerability.severity] += 1
+
+        self.assertSums(risk, self.analytics.sum_by('risk', by='site'))
+        self.assertSums(cvss, self.analytics.sum_by('cvss', by='subnet'))
+        self.assertSums(ports, self.analytics.sum_by('findings', by='port'))
+        self.assertSums(severities, self.analytics.sum_by('findings', by='severity'))
+
+        with self.assertRaises(ValueError):
+            self.analytics.sum_by('risk', by='port')
+
+    def test_distribution(self):
+        scores = sorted(v.cvss_score for _, _, v in self.findings())
+        median = self.analytics.percentiles('cvss', (50,))[0]
+        self.assertAlmostEqual(float(numpy.median(scores)), median)
+
+        counts, edges = self.analytics.histogram('severity', bins=10, value_range=(0, 10))
+        self.assertEqual(len(scores), counts.sum())
+        self.assertEqual(11, len(edges))
+
+    def test_top(self):
+        nodes = sorted(self.report.nodes, key=lambda node: -node.risk_score)[:5]
+        self.assertEqual([('.'.join(str(i) for i in node.address), node.risk_score) for node in nodes],
+                         self.analytics.top('risk', 5))
+
+        per_port = Counter()
+        for _, port, vulnerability in self.findings():
+            per_port[port] += vulnerability.cvss_score
+        top = self.analytics.top('cvss', 3, by='port')
+        self.assertEqual([port for port, _ in sorted(per_port.items(), key=lambda i: -i[1])[:3]],
+                         [port for port, _ in top])
+
+    def test_concatenate(self):
+        twice = RiskAnalytics.concatenate([self.analytics, self.analytics])
+        self.assertSums({key: 2 * value for key, value in self.analytics.sum_by('cvss', by='vulnerability').items()},
+                        twice.sum_by('cvss', by='vulnerability'))
+
+        other = RiskAnalytics.load(generate_bytes(nodes=10, seed=1))
+        both = RiskAnalytics.concatenate([self.analytics, other])
+        self.assertEqual(50, len(both.node_address))
+        self.assertEqual(len(self.analytics.finding_node) + len(other.finding_node), len(both.finding_node))
+        self.assertTrue(math.isclose(sum(both.sum_by('risk', by='site').values()),
+                                     float(numpy.nansum(both.node_risk))))
+
+    def test_from_csv(self):
+        raw = generate_csv_bytes(nodes=40, vulnerabilities=15)
+        flat = RiskAnalytics.from_findings(CSVReportReader(raw))
+        self.assertEqual(len(self.analytics.finding_node), len(flat.finding_node))
+        self.assertSums(self.analytics.sum_by('cvss', by='port'), flat.sum_by('cvss', by='port'))
+
+        # a node without any test is not in a csv report
+        every = RiskAnalytics.load(self.RAW, statuses=None)
+        flat = RiskAnalytics.from_findings(CSVReportReader(raw), statuses=None)
+        self.assertSums(every.sum_by('risk', by='subnet'), flat.sum_by('risk', by='subnet'))
+
+    def test_ipv6(self):
+        raw = (b'Asset IP Address,Vulnerability ID,Vulnerability Test Result Code\n'
+               b'10.0.0.1,ssh-weak,ve\n::1,ssh-weak,ve\n')
+        with self.assertRaisesRegex(ValueError, 'only ipv4'):
+            RiskAnalytics.from_findings(CSVReportReader(raw))
@@ -0,0 +1,29 @@
+import datetime
+import unittest
+
+from nexpose.converters import converter, date, ip, lookup
+from nexpose.models.report import Protocol, TestStatus as Status
+from nexpose.utils import parse_date
+
+
+class TestConverters(unittest.TestCase):
+    def test_parse_date(self):
+        for raw in ['20160220T085834722', '20160220T085834', '20160220T0858347', '20160220T085834722123',
+                    '2016220T85834722', '20160220T245834722', '２0160220T085834722']:
+            self.assertEqual(parse_date(raw), datetime.datetime.strptime(raw, '%Y%m%dT%H%M%S%f'), raw)
+
+    def test_invalid_date(self):
+        for raw in ['', '20160220', '20161320T085834722', '20160220T085834722x']:
+            self.assertRaises(ValueError, parse_date, raw)
+            self.assertRaises(ValueError, date, raw)
+
+    def test_cached(self):
+        self.assertIs(date('20160220T085834722'), date('20160220T085834722'))
+        self.assertEqual(ip('10.0.0.1'), (10, 0, 0, 1))
+        self.assertRaises(ValueError, ip, '10.0.1')
+
+    def test_lookup(self):
+        self.assertIs(lookup(Status)('vulnerable-version'), Status.vulnerable_version)
+        self.assertIs(converter(Protocol), lookup(Protocol))
+        self.assertIs(converter(float), float)
+        self.assertRaises(ValueError, lookup(Protocol), 'sctp')
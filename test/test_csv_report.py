@@ -0,0 +1,149 @@
+import io
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler
+
+import requests
+
+from bench.synthetic import generate_bytes, generate_csv_bytes
+from nexpose.models.csv_report import CSVReportReader
+from nexpose.models.filter import ReportFilter
+from nexpose.models.finding import INCLUDE, findings, vulnerability_summaries
+from nexpose.models.report import NexposeReport, ReportConfigSummary, ReportSummaryStatus
+from nexpose.sinks.ndjson import NDJSONSink
+from nexpose.sinks.sqlite import SQLiteSink
+from test import TestBaseStub
+
+
+def _normalized(finding):
+    # empty strings of the report read back as None
+    return tuple(None if value == '' else value for value in finding)
+
+
+def _sorted(findings):
+    return sorted(findings, key=lambda finding: [(value is not None, value) for value in finding])
+
+
+class TestCSVReport(unittest.TestCase):
+    XML = generate_bytes(nodes=20, vulnerabilities=10)
+    CSV = generate_csv_bytes(nodes=20, vulnerabilities=10)
+
+    def xml_findings(self, where=None):
+        summaries = vulnerability_summaries(self.XML)
+        report = NexposeReport.parse(self.XML, include=INCLUDE, where=where)
+        return _sorted(_normalized(f) for node in report.nodes for f in findings(node, summaries, statuses=None))
+
+    def test_same_findings(self):
+        self.assertEqual(self.xml_findings(), _sorted(CSVReportReader(self.CSV)))
+
+    def test_filter(self):
+        for where in (ReportFilter(networks=['10.0.0.0/29']), ReportFilter(test_statuses=['vulnerable-version']),
+                      ReportFilter(min_severity=6), ReportFilter(ports=[22]),
+                      ReportFilter(networks=['10.0.0.8/29'], min_severity=3, ports=[443])):
+            expected = self.xml_findings(where)
+            self.assertTrue(expected)
+            self.assertEqual(expected, _sorted(CSVReportReader(self.CSV, where=where)))
+
+    def test_batches(self):
+        batches = list(CSVReportReader(self.CSV, batch_size=50).batches())
+        self.assertTrue(all(len(batch) <= 50 for batch in batches[:-1]))
+
+        columns = CSVReportReader(self.CSV).columns()
+        self.assertEqual(sum(len(batch) for batch in batches), len(columns))
+        self.assertEqual([severity for batch in batches for severity in batch['severity']], columns['severity'])
+        self.assertTrue(all(isinstance(severity, int) for severity in columns['severity']))
+
+    def test_partial_columns(self):
+        raw = ('﻿"Asset IP Address","Service Port","Vulnerability Test Result Code","Vulnerability ID",'
+               '"Vulnerability CVE IDs","Vulnerability Severity Level","Vulnerability Title"\n'
+               '"10.0.0.1","22","VE","ssh-weak","CVE-2016-0001","8","Weak SSH"\n'
+               '"10.0.0.2","","vv","tls-old","","4","Old TLS"\n'
+               '"10.0.0.3","443","zz","tls-old","","4","Old TLS"\n').encode()
+        reader = CSVReportReader(raw)
+        rows = list(reader)
+
+        self.assertEqual(['10.0.0.1', '10.0.0.2', '10.0.0.3'], [row.address for row in rows])
+        self.assertEqual([22, None, 443], [row.port for row in rows])
+        self.assertEqual(['vulnerable-exploited', 'vulnerable-version', 'unknown'], [row.status for row in rows])
+        self.assertEqual([None] * 3, reader.columns()['cvss_score'])
+
+        self.assertEqual(['ssh-weak'], [row.vulnerability_id for row in CSVReportReader(
+            raw, where=ReportFilter(min_severity=5))])
+        self.assertEqual([], list(CSVReportReader(b'')))
+
+    def test_missing_filtered_column(self):
+        raw = b'Asset IP Address,Vulnerability ID\n10.0.0.1,ssh-weak\n'
+        self.assertEqual(1, len(list(CSVReportReader(raw, where=ReportFilter(networks=['10.0.0.0/8'])))))
+        with self.assertRaises(ValueError):
+            list(CSVReportReader(raw, where=ReportFilter(ports=[22])))
+
+    def test_sinks(self):
+        out = io.BytesIO()
+        sink = NDJSONSink(out)
+        sink.write_all(CSVReportReader(self.CSV, where=ReportFilter(min_severity=8)))
+        records = [json.loads(line) for line in out.getvalue().decode().splitlines()]
+        self.assertTrue(records)
+        self.assertTrue(all(record['severity'] >= 8 for record in records))
+
+        with SQLiteSink(':memory:') as sqlite:
+            with self.assertRaises(TypeError):
+                sqlite.write_all(CSVReportReader(self.CSV))
+
+
+class _StubConsole(BaseHTTPRequestHandler):
+    """
+    the csv report in two halves, the second one only sent once the test allows it
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = TestCSVReport.CSV
+        head, tail = body[:len(body) // 2], body[len(body) // 2:]
+        self.send_response(self.server.status)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(head)
+        self.wfile.flush()
+        self.server.read.wait(5)
+        self.server.released = True
+        self.wfile.write(tail)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCSVDownload(TestBaseStub):
+    handler = _StubConsole
+
+    def setUp(self):
+        super().setUp()
+        self.server.read = threading.Event()
+        self.server.released = False
+        self.server.status = 200
+
+    SUMMARY = ReportConfigSummary(template_id='basic-vulnerability-check-csv', config_id=0,
+                                  status=ReportSummaryStatus.generated, generated_on=None, report_uri='/reports/0',
+                                  scope=None, name=None)
+
+    def test_streamed(self):
+        # returned while the console still holds back the end of the report
+        reader = self.nexpose.extra.get_report_csv(self.SUMMARY)
+        self.assertFalse(self.server.released)
+
+        self.server.read.set()
+        self.assertEqual(list(CSVReportReader(TestCSVReport.CSV)), list(reader))
+        self.assertTrue(reader.closing.raw.closed)
+
+    def test_closed_unread(self):
+        self.server.read.set()
+        with self.nexpose.extra.get_report_csv(self.SUMMARY) as reader:
+            pass
+        self.assertTrue(reader.closing.raw.closed)
+
+    def test_error_status(self):
+        self.server.read.set()
+        self.server.status = 404
+        self.assertRaises(requests.HTTPError, self.nexpose.extra.get_report_csv, self.SUMMARY)
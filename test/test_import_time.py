@@ -0,0 +1,22 @@
+import unittest
+
+from bench.bench_import import SCENARIOS, import_times
+
+
+class TestImportTime(unittest.TestCase):
+    def test_import_nexpose(self):
+        code, budget = SCENARIOS['import nexpose']
+        times = import_times(code)
+
+        for heavy in ('requests', 'lxml', 'lxml.etree', 'nexpose.modules', 'nexpose.models.report'):
+            self.assertNotIn(heavy, times.modules)
+        self.assertLess(times.total, budget)
+
+    def test_scan_module(self):
+        code, budget = SCENARIOS['scan module']
+        times = import_times(code)
+
+        self.assertIn('nexpose.modules.scan', times.modules)
+        for unused in ('nexpose.modules.extra', 'nexpose.models.report', 'nexpose.modules.report'):
+            self.assertNotIn(unused, times.modules)
+        self.assertLess(times.total, budget)
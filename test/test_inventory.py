@@ -0,0 +1,95 @@
+import unittest
+
+from lxml import etree
+
+from bench.synthetic import generate_bytes
+from nexpose.inventory import SoftwareInventory, version_key
+from nexpose.models.report import NexposeReport, Node
+
+NODE = '''<node address="10.0.0.{}" status="alive" device-id="{}" site-name="site" site-importance="Normal"
+    scan-template="Full audit" risk-score="1.0">
+  <fingerprints>
+    <os certainty="0.67" vendor="Linux" family="Linux" product="Linux" version="3.13"/>
+    <os certainty="{}" vendor="Ubuntu" family="Linux" product="Linux" version="14.04"/>
+  </fingerprints>
+  <software>
+    <fingerprint certainty="1.00" vendor="OpenSSL" product="OpenSSL" version="{}"/>
+    <fingerprint certainty="0.50" product="unknown"/>
+  </software>
+  <tests/>
+  <endpoints>
+    <endpoint protocol="tcp" port="22" status="open"><services><service name="ssh">
+      <fingerprints><fingerprint certainty="0.90" vendor="OpenBSD" product="OpenSSH" version="{}"/></fingerprints>
+      <tests/>
+    </service></services></endpoint>
+  </endpoints>
+</node>'''
+
+
+def _node(index, os_certainty, openssl, openssh):
+    return Node.from_xml(etree.fromstring(NODE.format(index, index, os_certainty, openssl, openssh)))
+
+
+class TestSoftwareInventory(unittest.TestCase):
+    def setUp(self):
+        self.inventory = SoftwareInventory()
+        for index, (certainty, openssl, openssh) in enumerate([
+            ('0.85', '1.0.1f', '6.6.1p1'),
+            ('0.50', '1.0.2', '7.4'),
+            ('0.85', '1.1.0', '7.4p1'),
+            ('0.85', '1.0.1', '6.10'),
+        ]):
+            self.inventory.add_node(_node(index, certainty, openssl, openssh))
+
+    def test_version_key(self):
+        ordered = ['2.0', '2.0.beta', '2.0.1', '6.6.1p1', '6.10', '7.4', '7.4p1', '7.10']
+        self.assertEqual(sorted(reversed(ordered), key=version_key), ordered)
+        self.assertEqual(version_key('7.4'), version_key('7-4'))
+
+    def test_range(self):
+        def addresses(**kwargs):
+            return sorted(address[3] for address in self.inventory.hosts(**kwargs))
+
+        self.assertEqual(addresses(product='OpenSSH', below='7.4'), [0, 3])
+        self.assertEqual(addresses(product='openssh', vendor='openbsd', minimum='7.4'), [1, 2])
+        self.assertEqual(addresses(product='OpenSSH', minimum='6.7', below='7.4p1'), [1, 3])
+        self.assertEqual(addresses(product='OpenSSH', vendor='Linux'), [])
+        self.assertEqual(addresses(product='OpenSSL', minimum='1.0.1', below='1.0.2'), [0, 3])
+        self.assertEqual(addresses(product='OpenSSH', certainty=0.95), [])
+
+    def test_unknown_version(self):
+        self.assertEqual(len(self.inventory.find('unknown')), 4)
+        self.assertEqual(self.inventory.find('unknown', below='100'), [])
+
+    def test_ports(self):
+        self.assertEqual({installation.port for installation in self.inventory.find('OpenSSH')}, {22})
+        self.assertEqual({installation.port for installation in self.inventory.find('OpenSSL')}, {None})
+
+    def test_os(self):
+        versions = {address[3]: os.version for address, os in self.inventory.os.items()}
+        self.assertEqual(versions, {0: '14.04', 1: '3.13', 2: '14.04', 3: '14.04'})
+        self.assertEqual(len(self.inventory.find('Linux')), 4)
+        self.assertEqual(sorted(a[3] for a in self.inventory.hosts('Linux', below='4')), [1])
+
+    def test_incremental(self):
+        self.assertEqual(len(self.inventory.hosts('OpenSSH', below='7.4')), 2)
+        self.inventory.add_node(_node(4, '0.85', '1.0.1', '5.3'))
+        self.assertEqual(len(self.inventory.hosts('OpenSSH', below='7.4')), 3)
+
+        other = SoftwareInventory()
+        other.add_node(_node(5, '0.85', '1.0.1', '5.9'))
+        self.inventory.merge(other)
+        self.assertEqual(len(self.inventory.hosts('OpenSSH', below='7.4')), 4)
+        self.assertEqual(len(self.inventory.os), 6)
+
+    def test_report(self):
+        raw = generate_bytes(nodes=30, vulnerabilities=10)
+        streamed = SoftwareInventory.load(raw)
+        full = SoftwareInventory.from_report(NexposeReport.from_xml(etree.fromstring(raw)))
+
+        self.assertEqual(len(streamed), len(full))
+        self.assertEqual(streamed.hosts('OpenSSH', below='7.4'), full.hosts('OpenSSH', below='7.4'))
+        self.assertEqual(len(streamed.hosts('OpenSSH', below='7.4')), 30)
+        self.assertEqual(sorted(i.version for i in streamed.find('Product1', minimum='1.5')),
+                         sorted(i.version for i in full.find('Product1', minimum='1.5')))
+        self.assertEqual({os.version for os in streamed.os.values()}, {'14.04'})
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from io import BytesIO
+
+from lxml import etree
+
+from bench.synthetic import generate_bytes
+from nexpose.models.finding import Finding, VULNERABLE, findings
+from nexpose.models.report import NexposeReport
+from nexpose.sinks.ndjson import NDJSONSink, read
+
+
+class TestNDJSONSink(unittest.TestCase):
+    RAW = generate_bytes(nodes=20, vulnerabilities=10)
+
+    def setUp(self):
+        self.report = NexposeReport.from_xml(etree.fromstring(self.RAW))
+        self.vulnerabilities = {v.vulnerability_id: v for v in self.report.vulnerability_definition}
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def expected(self):
+        ret = []
+        for node in self.report.nodes:
+            tests = [t for t in node.tests if t.status in VULNERABLE]
+            tests += [t for e in node.endpoints for s in e.services for t in s.tests if t.status in VULNERABLE]
+            ret.extend(('.'.join(str(i) for i in node.address), t.id, t.status.value) for t in tests)
+        return sorted(ret)
+
+    def test_export(self):
+        for compress in (False, True):
+            path = os.path.join(self.directory.name, 'findings.ndjson')
+            with NDJSONSink(path, compress=compress, buffer_size=7) as sink:
+                sink.load(self.RAW)
+            records = list(read(path))
+
+            self.assertEqual(sink.written, len(records))
+            self.assertEqual(set(records[0]), set(Finding._fields))
+            self.assertEqual(sorted((r['address'], r['vulnerability_id'], r['status']) for r in records),
+                             self.expected())
+            for record in records:
+                vulnerability = self.vulnerabilities[record['vulnerability_id']]
+                self.assertEqual((record['title'], record['severity'], record['cvss_score']),
+                                 (vulnerability.title, vulnerability.severity, vulnerability.cvss_score))
+
+    def test_stream(self):
+        out = BytesIO()
+        sink = NDJSONSink(out, vulnerabilities={})
+        sink.write_all(self.report.nodes)
+        lines = out.getvalue().decode().splitlines()
+        self.assertEqual(len(lines), len(self.expected()))
+        self.assertEqual(sum(len(list(findings(node, statuses=None))) >= 1 for node in self.report.nodes), 20)
@@ -0,0 +1,152 @@
+import datetime
+import os
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+
+from bench.synthetic import generate_bytes
+from nexpose import Nexpose, pipeline
+from nexpose.models.report import Node, ReportConfigSummary, ReportSummaryStatus, Vulnerability
+from nexpose.models.scan import Scan
+from nexpose.models.stream import ReportReader
+from nexpose.sinks import Sink
+from test import TestBaseStub
+
+REPORTS = {str(seed): generate_bytes(nodes=20, vulnerabilities=30, seed=seed) for seed in range(3)}
+
+
+class _StubConsole(BaseHTTPRequestHandler):
+    """
+    the synthetic report of the seed ending the path, counting the downloads
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        name = self.path.rsplit('/', 1)[-1]
+        body = REPORTS.get(name, b'<NexposeReport')
+        with self.server.lock:
+            self.server.downloads[name] += 1
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Collect(Sink):
+    def __init__(self):
+        self.records = []
+        self.flushed = False
+
+    def write_scan(self, scan):
+        self.records.append(scan)
+
+    def write_node(self, node):
+        self.records.append(node)
+
+    def write_vulnerability(self, vulnerability):
+        self.records.append(vulnerability)
+
+    def flush(self):
+        self.flushed = True
+
+
+def summary(name, generated_on=datetime.datetime(2016, 3, 1, 10, 10, 10)):
+    return ReportConfigSummary(template_id='audit-report', config_id=0, status=ReportSummaryStatus.generated,
+                               generated_on=generated_on, report_uri='/reports/{}'.format(name), scope=None,
+                               name=None)
+
+
+def counts(records):
+    """
+    records by type and by scan id, node address and vulnerability id
+    """
+    ret = Counter()
+    for record in records:
+        if isinstance(record, Scan):
+            ret['scan', record.id] += 1
+        elif isinstance(record, Node):
+            ret['node', record.address] += 1
+        else:
+            ret['vulnerability', record.vulnerability_id] += 1
+    return ret
+
+
+class TestPipeline(TestBaseStub):
+    handler = _StubConsole
+
+    def setUp(self):
+        super().setUp()
+        self.server.lock = threading.Lock()
+        self.server.downloads = Counter()
+        self.cache = os.path.join(self.directory.name, 'cache')
+
+    def run_pipeline(self, names, **kwargs):
+        sink = _Collect()
+        metrics = pipeline.run([summary(name) for name in names], workers=2, sink=sink, nexpose=self.nexpose,
+                               cache_directory=self.cache, batch_size=8, max_batches=2, **kwargs)
+        self.assertTrue(sink.flushed)
+        return sink.records, metrics
+
+    def test_records(self):
+        records, metrics = self.run_pipeline(sorted(REPORTS), deduplicate=False)
+
+        expected = Counter()
+        for raw in REPORTS.values():
+            expected += counts(ReportReader(raw))
+        self.assertEqual(expected, counts(records))
+
+        self.assertEqual(len(REPORTS), metrics.reports)
+        self.assertEqual(len(records), metrics.records)
+        self.assertEqual(sum(len(raw) for raw in REPORTS.values()),
+                         sum(worker.bytes for worker in metrics.workers.values()))
+        for worker in metrics.workers.values():
+            self.assertGreater(worker.records_per_second, 0)
+
+    def test_downloaded_once(self):
+        names = sorted(REPORTS) * 3
+        _, first = self.run_pipeline(names, deduplicate=False)
+        _, second = self.run_pipeline(names, deduplicate=False)
+
+        self.assertEqual({name: 1 for name in REPORTS}, self.server.downloads)
+        self.assertEqual(len(names) - len(REPORTS), sum(worker.cache_hits for worker in first.workers.values()))
+        self.assertEqual(len(names), sum(worker.cache_hits for worker in second.workers.values()))
+
+    def test_definitions_once(self):
+        records, _ = self.run_pipeline(sorted(REPORTS) * 2)
+        # the reports of other seeds have other modification dates, so other definitions
+        vulnerabilities = Counter((record.vulnerability_id, record.modified)
+                                  for record in records if isinstance(record, Vulnerability))
+        self.assertEqual({1}, set(vulnerabilities.values()))
+        self.assertEqual(sum(sum(counts(ReportReader(raw, include=['vulnerability_definition'])).values())
+                             for raw in REPORTS.values()), len(vulnerabilities))
+
+        nodes = Counter(record.address for record in records if isinstance(record, Node))
+        self.assertEqual({2 * len(REPORTS)}, set(nodes.values()))
+
+        # a run into another sink gets them again
+        again, _ = self.run_pipeline(sorted(REPORTS))
+        self.assertEqual(vulnerabilities, Counter((record.vulnerability_id, record.modified)
+                                                  for record in again if isinstance(record, Vulnerability)))
+
+    def test_definitions_across_runs(self):
+        seen = os.path.join(self.directory.name, 'seen')
+        records, _ = self.run_pipeline(['0'], seen_definitions=seen)
+        self.assertTrue(any(isinstance(record, Vulnerability) for record in records))
+
+        records, _ = self.run_pipeline(['0', '1'], seen_definitions=seen)
+        sent = {record.modified for record in records if isinstance(record, Vulnerability)}
+        self.assertEqual({v.modified for v in ReportReader(REPORTS['1']) if isinstance(v, Vulnerability)}, sent)
+
+    def test_error(self):
+        with self.assertRaises(Exception):
+            self.run_pipeline(['0', 'broken', '1', '2'])
+
+    def test_session_pool(self):
+        with self.assertRaises(ValueError):
+            pipeline.run([], nexpose=Nexpose(host='127.0.0.1', session_pool=object()))
@@ -0,0 +1,114 @@
+import io
+import unittest
+
+from lxml import etree
+
+from bench.synthetic import generate_bytes
+from nexpose.models.finding import address, findings, value
+from nexpose.models.report import NexposeReport, SkillLevel
+from nexpose.models.report import TestStatus as Status
+from nexpose.prioritize import Factors, Prioritizer, Scoring, prioritize, report_factors, vulnerability_factors
+
+
+class TestPrioritize(unittest.TestCase):
+    RAW = generate_bytes(nodes=40, vulnerabilities=30)
+
+    def setUp(self):
+        self.report = NexposeReport.from_xml(etree.fromstring(self.RAW))
+        self.vulnerabilities = {v.vulnerability_id.lower(): v for v in self.report.vulnerability_definition}
+
+    def expected(self, top, score=Scoring()):
+        """
+        every vulnerable finding scored and sorted
+        """
+        factors = {i: vulnerability_factors(v) for i, v in self.vulnerabilities.items()}
+        nodes = {address(node): node for node in self.report.nodes}
+        ret = []
+        for node in self.report.nodes:
+            for finding in findings(node):
+                ret.append((score(Factors(Status(finding.status), finding.node_risk_score,
+                                          finding.site_importance, *factors[finding.vulnerability_id.lower()])),
+                            finding.address, finding.vulnerability_id, -1 if finding.port is None else finding.port))
+        self.assertTrue(nodes)
+        return sorted(ret, reverse=True)[:top]
+
+    @staticmethod
+    def ranked(prioritizer):
+        return [(r.score, r.address, r.vulnerability_id, r.port) for r in prioritizer.ranked]
+
+    def test_top(self):
+        prioritizer = Prioritizer(top=25)
+        prioritizer.add_report(self.RAW)
+        self.assertEqual(self.ranked(prioritizer), self.expected(25))
+        self.assertEqual(prioritizer.findings, len(self.expected(10 ** 6)))
+
+    def test_report_factors(self):
+        factors = report_factors(self.RAW)
+        self.assertEqual(factors, {i: vulnerability_factors(v) for i, v in self.vulnerabilities.items()})
+        self.assertTrue(any(malware for *_, malware in factors.values()))
+        self.assertTrue(any(skill is not None for *_, skill, _ in factors.values()))
+
+        with io.BytesIO(self.RAW) as stream:
+            self.assertEqual(report_factors(stream), factors)
+            self.assertEqual(stream.tell(), 0)
+
+    def test_merge(self):
+        other = generate_bytes(nodes=40, vulnerabilities=30, seed=1)
+        merged = prioritize([self.RAW, other], top=10)
+
+        separate = Prioritizer(top=10)
+        for raw in (self.RAW, other):
+            part = Prioritizer(top=10)
+            part.add_report(raw)
+            separate.merge(part)
+
+        whole = Prioritizer(top=1000)
+        whole.add_report(self.RAW)
+        whole.add_report(other)
+
+        self.assertEqual(merged.ranked, separate.ranked)
+        self.assertEqual(merged.ranked, whole.ranked[:10])
+        self.assertEqual(merged.findings, whole.findings)
+
+    def test_workers(self):
+        other = generate_bytes(nodes=10, vulnerabilities=30, seed=2)
+        self.assertEqual(prioritize([self.RAW, other], top=10, workers=2).ranked,
+                         prioritize([self.RAW, other], top=10).ranked)
+
+    def test_scoring(self):
+        base = Factors(Status.vulnerable_version, 0.0, 'Normal', 'title', 5, 5.0, 0.0, None, False)
+        scoring = Scoring()
+        self.assertEqual(scoring(base), 5.0)
+        self.assertGreater(scoring(base._replace(status=Status.vulnerable_exploited)), scoring(base))
+        self.assertGreater(scoring(base._replace(skill_level=SkillLevel.novice)),
+                           scoring(base._replace(skill_level=SkillLevel.expert)))
+        self.assertGreater(scoring(base._replace(malware=True)), scoring(base))
+        self.assertGreater(scoring(base._replace(node_risk_score=1000.0)), scoring(base))
+        self.assertGreater(scoring(base._replace(site_importance='High')), scoring(base))
+        self.assertEqual(scoring(base._replace(cvss_score=None)), 5.0)
+
+    def test_site_importance(self):
+        raw = self.RAW.replace(b'site-importance="Normal"', b'site-importance="Very High"', 1)
+        node = next(n for n in NexposeReport.parse(raw).nodes if value(n.site_importance) == 'Very High')
+
+        prioritizer = Prioritizer(top=10 ** 6)
+        prioritizer.add_report(raw)
+        boosted = {(r.vulnerability_id, r.port): r.score for r in prioritizer.ranked if r.address == address(node)}
+
+        prioritizer = Prioritizer(top=10 ** 6)
+        prioritizer.add_report(self.RAW)
+        normal = {(r.vulnerability_id, r.port): r.score for r in prioritizer.ranked if r.address == address(node)}
+
+        self.assertTrue(normal)
+        self.assertEqual({key: 2 * score for key, score in normal.items()}, boosted)
+
+    def test_empty_top(self):
+        self.assertRaises(ValueError, Prioritizer, top=0)
+
+    def test_custom_score(self):
+        def by_node_risk(factors):
+            return factors.node_risk_score
+
+        prioritizer = Prioritizer(top=5, score=by_node_risk)
+        prioritizer.add_report(self.RAW)
+        self.assertEqual(self.ranked(prioritizer), self.expected(5, by_node_risk))
@@ -0,0 +1,77 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from lxml import etree
+
+from bench.synthetic import generate_bytes
+from nexpose.models.report import NexposeReport
+from nexpose.models.site import Site as SiteModel
+from nexpose.modules import ModuleBase
+from nexpose.modules.site import Site
+from nexpose.profile import profile
+
+
+def _post(module, xml, **_):
+    return etree.fromstring('<SiteDeleteResponse success="1"/>')
+
+
+class TestProfile(unittest.TestCase):
+    def parse(self):
+        return NexposeReport.from_xml(etree.fromstring(generate_bytes(nodes=20, vulnerabilities=20)))
+
+    def test_models(self):
+        with profile() as p:
+            report = self.parse()
+
+        self.assertIn('NexposeReport', p.models)
+        self.assertEqual(len(report.nodes), p.models['Node'].calls)
+        self.assertGreater(p.models['Node'].bytes, 0)
+        self.assertGreater(sum(usage.seconds for usage in p.models.values()), 0)
+
+        out = io.StringIO()
+        p.report(out, limit=100)
+        self.assertIn('NexposeReport', out.getvalue())
+        self.assertIn('tottime', out.getvalue())
+
+    def test_collapsed(self):
+        with profile(memory=False, interval=0.0001) as p:
+            for _ in range(5):
+                self.parse()
+
+        lines = list(p.collapsed())
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertGreater(int(count), 0)
+            self.assertNotIn(' ', stack)
+        self.assertTrue(any('schema:NexposeReport._from_xml' in line for line in lines))
+
+    def test_requests(self):
+        site = SiteModel(hosts=None, scan_config=None, name='site', site_id=3)
+        with mock.patch.object(ModuleBase, '_post', _post):
+            module = Site(host='localhost', sessions_id={(1, 1): 'session'})
+            with profile(interval=None) as p:
+                module.site_delete(site)
+                module.site_delete(site)
+            self.assertIs(_post, ModuleBase.__dict__['_post'])
+
+        self.assertEqual(['SiteDeleteRequest'], list(p.requests))
+        self.assertEqual(2, p.requests['SiteDeleteRequest'].calls)
+
+    def test_environment(self):
+        with tempfile.TemporaryDirectory() as directory:
+            prefix = os.path.join(directory, 'run')
+            code = ('from lxml import etree; import nexpose; from bench.synthetic import generate_bytes; '
+                    'from nexpose.models.report import NexposeReport; '
+                    'NexposeReport.from_xml(etree.fromstring(generate_bytes(nodes=5)))')
+            subprocess.run([sys.executable, '-c', code], check=True, env=dict(os.environ, NEXPOSE_PROFILE=prefix),
+                           cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+            with open(prefix + '.txt') as f:
+                self.assertIn('Node', f.read())
+            self.assertTrue(os.path.exists(prefix + '.collapsed'))
@@ -0,0 +1,105 @@
+import datetime
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from bench.synthetic import generate_bytes
+from nexpose.cache import ReportCache
+from nexpose.models.report import ReportConfigSummary, ReportSummaryStatus
+from nexpose.modules.extra import Extra
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+def summary(uri, generated_on):
+    return ReportConfigSummary(template_id='audit-report', config_id='1', status=ReportSummaryStatus.generated,
+                               generated_on=generated_on, report_uri=uri, scope=None, name=None)
+
+
+class TestReportCache(unittest.TestCase):
+    RAW = generate_bytes(nodes=5, vulnerabilities=5)
+    GENERATED = datetime.datetime(2016, 3, 1, 10, 10, 10)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ReportCache(self.directory.name)
+        self.extra = Extra(host='localhost')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def fetch(self, report, *responses):
+        with mock.patch.object(Extra, '_get', side_effect=list(responses)) as get:
+            ret = self.extra.get_report_raw_xml_2(report, cache=self.cache)
+        return ret, get
+
+    def test_hit_by_generation(self):
+        report = summary('/reports/1/report.xml', self.GENERATED)
+        first, get = self.fetch(report, FakeResponse(200, self.RAW))
+        self.assertEqual(1, get.call_count)
+
+        second, get = self.fetch(report)
+        self.assertEqual(0, get.call_count)
+        self.assertEqual(sorted(n.address for n in first.nodes), sorted(n.address for n in second.nodes))
+
+        _, get = self.fetch(summary('/reports/1/report.xml', self.GENERATED + datetime.timedelta(days=1)),
+                            FakeResponse(200, self.RAW))
+        self.assertEqual(1, get.call_count)
+
+    def test_conditional(self):
+        report = summary('/reports/2/report.xml', None)
+        self.fetch(report, FakeResponse(200, self.RAW, {'ETag': '"v1"', 'Last-Modified': 'Tue, 01 Mar 2016'}))
+
+        cached, get = self.fetch(report, FakeResponse(304))
+        self.assertEqual({'If-None-Match': '"v1"', 'If-Modified-Since': 'Tue, 01 Mar 2016'},
+                         get.call_args[1]['headers'])
+        self.assertEqual(5, len(cached.nodes))
+
+        _, get = self.fetch(report, FakeResponse(200, self.RAW, {'ETag': '"v2"'}))
+        self.assertEqual('"v2"', self.cache.get(report.report_uri, None).etag)
+
+    def test_eviction(self):
+        sizes = []
+        for i in range(4):
+            self.cache.put('/reports/{}'.format(i), self.GENERATED, 'report {}'.format(i) * 100)
+            sizes.append(os.path.getsize(self.cache.path_for('/reports/{}'.format(i), self.GENERATED)))
+            # distinct modification times
+            os.utime(self.cache.path_for('/reports/{}'.format(i), self.GENERATED), (time.time() - 100 + i,) * 2)
+
+        self.cache.get('/reports/0', self.GENERATED)
+        self.cache.max_bytes = sum(sizes[:2])
+        self.cache.evict()
+
+        kept = [i for i in range(4) if self.cache.get('/reports/{}'.format(i), self.GENERATED) is not None]
+        self.assertEqual([0, 3], kept)
+
+    def test_corrupted(self):
+        path = self.cache.path_for('/reports/1', self.GENERATED)
+        with open(path, 'wb') as f:
+            f.write(b'garbage')
+        self.assertIsNone(self.cache.get('/reports/1', self.GENERATED))
+
+    def test_private(self):
+        directory = os.path.join(self.directory.name, 'reports')
+        ReportCache(directory)
+        self.assertEqual(0, os.stat(directory).st_mode & 0o077)
+
+    def test_failed_write(self):
+        self.assertRaises(TypeError, self.cache.put, '/reports/1', self.GENERATED, threading.Lock())
+        self.assertEqual([], os.listdir(self.directory.name))
+
+        stale = os.path.join(self.directory.name, 'stale.1.tmp')
+        fresh = os.path.join(self.directory.name, 'fresh.1.tmp')
+        for path in (stale, fresh):
+            open(path, 'wb').close()
+        os.utime(stale, (time.time() - 2 * 3600,) * 2)
+        ReportCache(self.directory.name)
+        self.assertEqual(['fresh.1.tmp'], os.listdir(self.directory.name))
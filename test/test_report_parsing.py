@@ -0,0 +1,175 @@
+import unittest
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+
+from lxml import etree
+
+from bench.synthetic import generate_bytes
+from nexpose.error import AttribNotFullyParsedError, SubElementNotFullyParsedError, TextNotFullyParsedError
+from nexpose.models.filter import ReportFilter
+from nexpose.models.report import NexposeReport, Node, OS, Fingerprint, ReportConfigSummary, Vulnerability
+from nexpose.models.scan import Scan
+from nexpose.models.stream import ReportReader
+from nexpose.models.report import TestStatus as Status
+
+
+class TestReportParsing(unittest.TestCase):
+    def test_synthetic_report(self):
+        report = NexposeReport.from_xml(etree.fromstring(generate_bytes(nodes=20, vulnerabilities=10)))
+
+        self.assertEqual(len(report.nodes), 20)
+        self.assertEqual(len(report.vulnerability_definition), 10)
+        node = next(n for n in report.nodes if n.address == (10, 0, 0, 0))
+        self.assertTrue(all(isinstance(f, OS) for f in node.fingerprints))
+        self.assertTrue(all(type(f) is Fingerprint for f in node.software))
+        self.assertEqual({n.text for n in node.names}, {'host-0.example.com'})
+        frozenset([report])  # ensure that everything is hashable
+
+    def test_report_tree_is_only_read(self):
+        xml = etree.fromstring(generate_bytes(nodes=10, vulnerabilities=10))
+        before = etree.tostring(xml)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            reports = list(executor.map(lambda _: NexposeReport.from_xml(xml), range(4)))
+
+        self.assertEqual(etree.tostring(xml), before)
+        self.assertEqual({len(report.nodes) for report in reports}, {10})
+
+    def test_optional_and_invalid(self):
+        summary = ReportConfigSummary.from_xml(etree.fromstring(
+            '<ReportConfigSummary template-id="audit-report" cfg-id="3" status="Generated" generated-on=""/>'
+        ))
+        self.assertIsNone(summary.generated_on)
+        self.assertIsNone(summary.scope)
+
+    def test_missing_attribute(self):
+        self.assertRaises(KeyError, Fingerprint.from_xml, etree.fromstring('<fingerprint product="a"/>'))
+
+    @staticmethod
+    def __node_xml(extra: str = '', child: str = ''):
+        return etree.fromstring(
+            '<node address="10.0.0.1" status="alive" device-id="1" site-name="s" site-importance="Normal" '
+            'scan-template="t" risk-score="1.5" {}><fingerprints/><endpoints/>'
+            '<tests><test id="t" status="vulnerable-version" key="" scan-id="1"/></tests>{}</node>'.format(extra, child)
+        )
+
+    def __node(self, extra: str = '', child: str = '') -> Node:
+        return Node.from_xml(self.__node_xml(extra, child))
+
+    def test_does_not_modify_tree(self):
+        xml = self.__node_xml()
+        before = etree.tostring(xml)
+        Node.from_xml(xml)
+        self.assertEqual(etree.tostring(xml), before)
+
+    def test_node(self):
+        node = self.__node()
+        self.assertEqual(node.risk_score, 1.5)
+        self.assertEqual(next(iter(node.tests)).status, Status.vulnerable_version)
+        self.assertEqual(node.software, frozenset())
+
+    def test_unknown_content(self):
+        self.assertRaises(AttribNotFullyParsedError, self.__node, extra='unknown="1"')
+        self.assertRaises(SubElementNotFullyParsedError, self.__node, child='<unknown/>')
+        self.assertRaises(SubElementNotFullyParsedError, self.__node, child='<fingerprints/>')
+        self.assertRaises(TextNotFullyParsedError, self.__node, child='text')
+
+
+class TestReportStreaming(unittest.TestCase):
+    RAW = generate_bytes(nodes=20, vulnerabilities=10)
+
+    def test_streamed_report(self):
+        report = NexposeReport.parse(self.RAW)
+        full = NexposeReport.from_xml(etree.fromstring(self.RAW))
+
+        self.assertEqual(report.version, full.version)
+        self.assertEqual({n.address for n in report.nodes}, {n.address for n in full.nodes})
+        self.assertEqual({v.vulnerability_id for v in report.vulnerability_definition},
+                         {v.vulnerability_id for v in full.vulnerability_definition})
+
+    def test_reader_order(self):
+        with BytesIO(self.RAW) as stream:
+            records = list(ReportReader(stream))
+        self.assertEqual([type(r) for r in records[:2]], [Scan, Node])
+        self.assertIsInstance(records[-1], Vulnerability)
+
+    def test_projection(self):
+        report = NexposeReport.parse(self.RAW, include={'nodes.tests', 'nodes.endpoints.port'})
+        full = {n.address: n for n in NexposeReport.from_xml(etree.fromstring(self.RAW)).nodes}
+
+        self.assertEqual(report.scans, frozenset())
+        self.assertEqual(report.vulnerability_definition, set())
+        for node in report.nodes:
+            expected = full[node.address]
+            self.assertEqual(node.risk_score, expected.risk_score)
+            self.assertEqual(node.fingerprints, frozenset())
+            self.assertEqual({(t.id, t.status) for t in node.tests},
+                             {(t.id, t.status) for t in expected.tests})
+            self.assertEqual({e.port for e in node.endpoints}, {e.port for e in expected.endpoints})
+            self.assertTrue(all(e.protocol is None and e.services == frozenset() for e in node.endpoints))
+
+    def test_projection_skips_subtrees(self):
+        raw = self.RAW.replace(b'<service ', b'<service unknown="1" ', 1)
+        self.assertRaises(AttribNotFullyParsedError, NexposeReport.parse, raw)
+        report = NexposeReport.parse(raw, include={'nodes.endpoints.port'})
+        self.assertEqual(len(report.nodes), 20)
+
+    def test_unknown_field(self):
+        self.assertRaises(ValueError, NexposeReport.parse, self.RAW, include={'nodes.unknown'})
+        self.assertRaises(ValueError, NexposeReport.parse, self.RAW, include={'nodes.address.port'})
+
+
+class TestReportFilter(unittest.TestCase):
+    RAW = generate_bytes(nodes=40, vulnerabilities=20)
+
+    def setUp(self):
+        self.full = NexposeReport.from_xml(etree.fromstring(self.RAW))
+        self.severities = {v.vulnerability_id: v.severity for v in self.full.vulnerability_definition}
+
+    def test_networks(self):
+        report = NexposeReport.parse(self.RAW, where=ReportFilter(networks=['10.0.0.8/29', '10.0.0.32/30']))
+        self.assertEqual(sorted(n.address[3] for n in report.nodes), list(range(8, 16)) + list(range(32, 36)))
+
+    def test_ip_versions(self):
+        # 10.0.0.0/24 are the first addresses of ::/96 as integers
+        report = NexposeReport.parse(self.RAW, where=ReportFilter(networks=['::/96']))
+        self.assertEqual(report.nodes, set())
+        check = ReportFilter(networks=['::/96', '10.0.0.0/31']).row_check(['address'])
+        self.assertEqual([check([a]) for a in ('10.0.0.1', '10.0.0.2', '::a00:2')], [True, False, True])
+
+    def test_tests(self):
+        statuses = {Status.vulnerable_version, 'vulnerable-exploited'}
+        report = NexposeReport.parse(self.RAW, where=ReportFilter(test_statuses=statuses, min_severity=8))
+
+        self.assertEqual(len(report.nodes), 40)
+        tests = [t for n in report.nodes for t in n.tests]
+        self.assertTrue(tests)
+        self.assertTrue(all(t.status in (Status.vulnerable_version, Status.vulnerable_exploited) for t in tests))
+        self.assertTrue(all(self.severities[t.id] >= 8 for t in tests))
+        self.assertTrue(all(v.severity >= 8 for v in report.vulnerability_definition))
+        self.assertEqual(len(report.vulnerability_definition), sum(s >= 8 for s in self.severities.values()))
+
+    def test_ports_with_projection(self):
+        with BytesIO(self.RAW) as stream:
+            report = NexposeReport.parse(stream, include={'nodes.endpoints.port'}, where=ReportFilter(ports=[22]))
+        self.assertEqual({e.port for n in report.nodes for e in n.endpoints}, {22})
+
+    def test_with_and_without_projection(self):
+        where = ReportFilter(networks=['10.0.0.0/28'], test_statuses={'vulnerable-exploited'}, min_severity=5,
+                             ports=[22, 443])
+
+        def kept(report):
+            return sorted((n.address, sorted(t.id for t in n.tests), sorted(e.port for e in n.endpoints))
+                          for n in report.nodes)
+
+        full = NexposeReport.parse(self.RAW, where=where)
+        projected = NexposeReport.parse(self.RAW, include={'nodes.address', 'nodes.tests', 'nodes.endpoints.port'},
+                                        where=where)
+        self.assertEqual(kept(full), kept(projected))
+        self.assertEqual(len(full.nodes), 16)
+
+    def test_dropped_before_built(self):
+        raw = self.RAW.replace(b'<node address="10.0.0.0"', b'<node unknown="1" address="10.0.0.0"', 1)
+        self.assertRaises(AttribNotFullyParsedError, NexposeReport.parse, raw)
+        report = NexposeReport.parse(raw, where=ReportFilter(networks=['10.0.0.1/32']))
+        self.assertEqual([n.address for n in report.nodes], [(10, 0, 0, 1)])
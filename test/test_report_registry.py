@@ -0,0 +1,132 @@
+import datetime
+import unittest
+from unittest import mock
+
+from lxml import etree
+
+from nexpose.models.failure import Failure
+from nexpose.models.report import ReportConfigFormat, ReportScope, ReportTemplateSummary, \
+    ReportTemplateSummaryType
+from nexpose.models.scan import ScanConfig, Template
+from nexpose.models.site import Hosts, Site
+from nexpose.modules import ModuleBase
+from nexpose.modules.report import MANAGED_PREFIX, Report, ReportRegistry
+from nexpose.networkerror import NetworkError
+
+
+class FakeConsole:
+    """
+    answers the report requests of `Report` from an in memory set of configs
+    """
+
+    def __init__(self):
+        self.configs = {}
+        self.requests = []
+        self.next_id = 1
+        # generations refused although the config exists
+        self.failures = 0
+
+    def post(self, xml, **_):
+        self.requests.append(xml.tag)
+        if xml.tag == 'ReportSaveRequest':
+            config = xml.find('ReportConfig')
+            config_id = str(self.next_id)
+            self.next_id += 1
+            self.configs[config_id] = dict(name=config.get('name'), template=config.get('template-id'),
+                                           generated='')
+            return etree.fromstring('<ReportSaveResponse success="1" reportcfg-id="{}"/>'.format(config_id))
+        if xml.tag == 'ReportGenerateRequest':
+            config_id = xml.get('report-id')
+            if config_id not in self.configs or self.failures:
+                self.failures = max(self.failures - 1, 0)
+                raise NetworkError(Failure.from_xml(etree.fromstring(
+                    '<Failure><Exception><message>unknown report {}</message></Exception></Failure>'.format(config_id)
+                )))
+            self.configs[config_id]['generated'] = '20160301T101010123'
+            return etree.fromstring('<ReportGenerateResponse success="1"><ReportSummary cfg-id="{}" '
+                                    'status="Started"/></ReportGenerateResponse>'.format(config_id))
+        if xml.tag == 'ReportListingRequest':
+            return etree.fromstring('<ReportListingResponse success="1">{}</ReportListingResponse>'.format(''.join(
+                '<ReportConfigSummary template-id="{template}" cfg-id="{id}" status="Generated" '
+                'generated-on="{generated}" name="{name}"/>'.format(id=config_id, **config)
+                for config_id, config in self.configs.items()
+            )))
+        if xml.tag == 'ReportDeleteRequest':
+            del self.configs[xml.get('reportcfg-id')]
+            return etree.fromstring('<ReportDeleteResponse success="1"/>')
+        raise AssertionError(xml.tag)
+
+
+class TestReportRegistry(unittest.TestCase):
+    TEMPLATE = ReportTemplateSummary(template_id='audit-report', name='Audit', builtin=True,
+                                     scope=ReportScope.global_, template_type=ReportTemplateSummaryType.document,
+                                     description=None)
+
+    def setUp(self):
+        self.console = FakeConsole()
+        self.post = mock.patch.object(ModuleBase, '_post', side_effect=self.console.post)
+        self.post.start()
+        self.report = Report(host='localhost')
+
+    def tearDown(self):
+        self.post.stop()
+
+    @staticmethod
+    def site(site_id):
+        return Site(hosts=Hosts(ip_range=[], hosts=[]), scan_config=ScanConfig(template=Template('full-audit')),
+                    site_id=site_id)
+
+    def test_reuse(self):
+        registry = ReportRegistry(self.report)
+        for _ in range(3):
+            registry.generate(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(1))
+        registry.generate(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(2))
+
+        self.assertEqual(2, len(self.console.configs))
+        self.assertEqual(['ReportListingRequest', 'ReportSaveRequest', 'ReportGenerateRequest',
+                          'ReportGenerateRequest', 'ReportGenerateRequest'], self.console.requests[:5])
+
+        # another process finds the configs by name
+        self.console.requests.clear()
+        ReportRegistry(self.report).generate(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(1))
+        self.assertEqual(['ReportListingRequest', 'ReportGenerateRequest'], self.console.requests)
+        self.assertEqual(2, len(self.console.configs))
+
+    def test_deleted_config(self):
+        registry = ReportRegistry(self.report)
+        registry.generate(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(1))
+        self.console.configs.clear()
+
+        with self.assertRaises(NetworkError):
+            registry.generate(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(1))
+        registry.generate(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(1))
+        self.assertEqual(1, len(self.console.configs))
+
+    def test_transient_failure(self):
+        registry = ReportRegistry(self.report)
+        registry.generate(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(1))
+        self.console.failures = 1
+
+        with self.assertRaises(NetworkError):
+            registry.generate(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(1))
+        self.console.requests.clear()
+        registry.generate(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(1))
+        self.assertEqual(['ReportGenerateRequest'], self.console.requests)
+
+    def test_collect(self):
+        registry = ReportRegistry(self.report)
+        registry.generate(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(1))
+        registry.config(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(2))
+        self.console.configs['99'] = dict(name='by hand', template='audit-report', generated='20160301T101010123')
+        # created by a registry which failed to generate it
+        self.console.configs['98'] = dict(name=MANAGED_PREFIX + 'lost', template='audit-report', generated='')
+
+        now = datetime.datetime(2016, 3, 2)
+        self.assertEqual(['98'], registry.collect(datetime.timedelta(days=7), now=now))
+        self.assertEqual(['1'], registry.collect(datetime.timedelta(hours=1), now=now))
+        self.assertEqual({'2', '99'}, set(self.console.configs))
+        self.assertTrue(self.console.configs['2']['name'].startswith(MANAGED_PREFIX))
+
+        self.console.requests.clear()
+        registry.generate(self.TEMPLATE, ReportConfigFormat.raw_xml_v2, self.site(1))
+        self.assertIn('ReportSaveRequest', self.console.requests)
@@ -1,8 +1,11 @@
 import unittest
+from io import StringIO
 
 from lxml import etree
 
-from nexpose.models.report import Paragraph
+from bench.synthetic import generate_bytes
+from nexpose.models.report import Description, NexposeReport, Paragraph
+from nexpose.render import renderer
 
 
 class TestReportRendering(unittest.TestCase):
@@ -32,3 +35,63 @@ class TestReportRendering(unittest.TestCase):
             """
         ))
         self.assertEqual(str(elem), 'sapi/cgi/cgi_main.c in the CGI component in PHP through 5.4.36')
+
+    RICH = """
+        <description>
+            <ContainerBlockElement>
+                <Paragraph>See <URLLink LinkURL="http://a/?x=1&amp;y=2" LinkTitle="advisory" href="http://a/?x=1&amp;y=2"/>
+                    for &lt;details&gt;.</Paragraph>
+                <OrderedList>
+                    <ListItem>first<UnorderedList><ListItem>inner</ListItem></UnorderedList></ListItem>
+                </OrderedList>
+                <Table TableTitle="Versions">
+                    <TableRow RowTitle="Affected"><TableCell><Paragraph>1.0 | 1.1</Paragraph></TableCell></TableRow>
+                </Table>
+            </ContainerBlockElement>
+        </description>
+    """
+
+    def test_plain(self):
+        elem = Description.from_xml(etree.fromstring(self.RICH))
+        self.assertEqual(str(elem), 'See[advisory](http://a/?x=1&y=2)for <details>.\n - first\n - inner\n\n'
+                                    'Versions\nAffected\t1.0 | 1.1')
+
+    def test_markdown(self):
+        elem = Description.from_xml(etree.fromstring(self.RICH))
+        self.assertEqual(renderer('markdown').render(elem), 'See [advisory](http://a/?x=1&y=2) for \\<details\\>.\n\n'
+                                                            '1. first\n   - inner\n\n'
+                                                            '| Versions | |\n|---|---|\n| Affected | 1.0 \\| 1.1 |')
+
+    def test_html(self):
+        out = StringIO()
+        renderer('html').write(Description.from_xml(etree.fromstring(self.RICH)), out)
+        self.assertEqual(out.getvalue(), '<div><p>See <a href="http://a/?x=1&amp;y=2" title="advisory">advisory</a> '
+                                         'for &lt;details&gt;.</p><ol><li>first<ul><li>inner</li></ul></li></ol>'
+                                         '<table><caption>Versions</caption><tr><th>Affected</th>'
+                                         '<td><p>1.0 | 1.1</p></td></tr></table></div>')
+
+    def test_markdown_escaped(self):
+        elem = Paragraph.from_xml(etree.fromstring('<Paragraph># not *a* [heading](http://a)</Paragraph>'))
+        self.assertEqual(renderer('markdown').render(elem), '\\# not \\*a\\* \\[heading\\](http://a)')
+
+    def test_link_schemes(self):
+        elem = Paragraph.from_xml(etree.fromstring(
+            '<Paragraph><URLLink LinkURL=" JavaScript:alert(1)" LinkTitle="x" href=" JavaScript:alert(1)"/> '
+            '<URLLink LinkURL="mailto:a@b" LinkTitle="y" href="mailto:a@b"/></Paragraph>'
+        ))
+        self.assertEqual(renderer('html').render(elem), '<p>x <a href="mailto:a@b" title="y">y</a></p>')
+        self.assertEqual(renderer('markdown').render(elem), 'x [y](mailto:a@b)')
+
+    def test_vulnerability_cache(self):
+        raw = generate_bytes(nodes=1, vulnerabilities=3)
+        first, second = (NexposeReport.from_xml(etree.fromstring(raw)) for _ in range(2))
+        markdown = renderer('markdown', cache_size=2)
+
+        vulnerabilities = sorted(first.vulnerability_definition, key=lambda v: v.vulnerability_id)
+        rendered = {v.vulnerability_id: markdown.vulnerability(v) for v in vulnerabilities}
+        self.assertIn('see http://example.com/0 for details.\n```', rendered['vuln-0'].description)
+        self.assertEqual(rendered['vuln-0'].solution, 'Upgrade to OpenSSL 1.0.1g or later.')
+
+        again = {v.vulnerability_id: v for v in second.vulnerability_definition}
+        self.assertIs(markdown.vulnerability(again['vuln-2']), rendered['vuln-2'])
+        self.assertIsNot(markdown.vulnerability(again['vuln-0']), rendered['vuln-0'])
@@ -3,7 +3,7 @@ import time
 from requests.exceptions import ConnectionError
 from typing import Iterator
 
-from nexpose.models.report import ReportConfig, ReportConfigFormat, ReportSummary, ReportConfigSummary, \
+from nexpose.models.report import ReportConfigFormat, ReportSummary, ReportConfigSummary, \
     ReportSummaryStatus
 from nexpose.models.scan import ScanConfig, Status
 from nexpose.models.site import Site
@@ -55,10 +55,7 @@ class TestRunScan(TestBaseLogged):
                         for template in self.nexpose.report.report_template_listing()
                         if template.id == 'audit-report')
 
-        report = ReportConfig(template=template, report_format=ReportConfigFormat.raw_xml_v2, site=site_saved)
-        report_saved = self.nexpose.report.report_save_request(report=report)
-
-        report_summary = self.nexpose.report.report_generate(report=report_saved)
+        report_summary = self.nexpose.report_registry.generate(template, ReportConfigFormat.raw_xml_v2, site_saved)
         self.__wait_until_report_completion(report=report_summary)
         report_generated = next(self.__get_report_from_listing(report=report_summary))
 
@@ -0,0 +1,101 @@
+import unittest
+
+from requests.exceptions import ConnectionError
+
+from nexpose.models.scan import ScanConfig, Status, Template
+from nexpose.models.site import Hosts, Site
+from nexpose.scheduler import ScanScheduler
+
+
+class FakeScan:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.statuses = {}
+        self.started = []
+
+    def site_scan(self, site: Site) -> int:
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError()
+        scan_id = len(self.started)
+        self.started.append(site)
+        self.statuses[scan_id] = Status.running
+        return scan_id
+
+    def scan_status(self, scan_id: int) -> Status:
+        return self.statuses[scan_id]
+
+
+def _site(site_id: int) -> Site:
+    return Site(hosts=Hosts(ip_range=[], hosts=[]), scan_config=ScanConfig(Template('discovery')),
+                site_id=site_id)
+
+
+class TestScanScheduler(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+
+    def clock(self) -> float:
+        return self.now
+
+    def test_priority_and_capacity(self):
+        scan = FakeScan()
+        scheduler = ScanScheduler(scan, max_concurrent=2, clock=self.clock)
+        for site_id, priority in [(1, 0), (2, 5), (3, 1)]:
+            scheduler.submit(_site(site_id), priority=priority)
+
+        scheduler.poll()
+        self.assertEqual([s.id for s in scan.started], [2, 3])
+        self.assertEqual(scheduler.queue_depth, 1)
+
+        self.now = 10
+        scan.statuses[0] = Status.finished
+        ended = scheduler.poll()
+        self.assertEqual([s.site.id for s in ended], [2])
+        self.assertEqual([s.id for s in scan.started], [2, 3, 1])
+
+        metrics = scheduler.metrics()
+        self.assertEqual((metrics.queue_depth, metrics.running, metrics.completed), (0, 2, 1))
+        self.assertEqual(metrics.max_wait, 10)
+
+    def test_per_engine_cap(self):
+        scan = FakeScan()
+        scheduler = ScanScheduler(scan, max_concurrent=10, max_per_engine=1, clock=self.clock)
+        scheduler.submit(_site(1), engine='a')
+        scheduler.submit(_site(2), engine='a')
+        scheduler.submit(_site(3), engine='b')
+
+        scheduler.poll()
+        self.assertEqual([s.id for s in scan.started], [1, 3])
+
+    def test_retry_dispatch(self):
+        scan = FakeScan(failures=2)
+        scheduler = ScanScheduler(scan, max_concurrent=1, max_retries=2, retry_delay=1, clock=self.clock)
+        scheduled = scheduler.submit(_site(1))
+
+        for self.now in [0, 1, 3]:
+            scheduler.poll()
+
+        self.assertEqual(scheduled.attempts, 3)
+        self.assertEqual(scheduled.scan_id, 0)
+
+    def test_give_up(self):
+        scan = FakeScan(failures=1)
+        scheduler = ScanScheduler(scan, max_concurrent=1, max_retries=0, clock=self.clock)
+        scheduler.submit(_site(1))
+
+        ended = scheduler.run(poll_interval=0)
+        self.assertIsInstance(ended[0].error, ConnectionError)
+        self.assertEqual(scheduler.metrics().failed, 1)
+
+    def test_scan_error(self):
+        scan = FakeScan()
+        scheduler = ScanScheduler(scan, max_concurrent=2, clock=self.clock)
+        scheduler.submit(_site(1))
+        scheduler.submit(_site(2))
+        scheduler.poll()
+
+        scan.statuses = {0: Status.error, 1: Status.finished}
+        self.assertEqual(len(scheduler.poll()), 2)
+        metrics = scheduler.metrics()
+        self.assertEqual((metrics.completed, metrics.failed), (1, 1))
@@ -0,0 +1,80 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from lxml import etree
+
+from bench.synthetic import generate_bytes
+from nexpose.models.report import NexposeReport
+from nexpose.search import QuerySyntaxError, VulnerabilityIndex, VULNERABLE
+
+
+class _Mkdir:
+    """
+    pickled as a call to os.mkdir
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return os.mkdir, (self.path,)
+
+
+class TestVulnerabilityIndex(unittest.TestCase):
+    RAW = generate_bytes(nodes=30, vulnerabilities=20)
+
+    def setUp(self):
+        self.report = NexposeReport.from_xml(etree.fromstring(self.RAW))
+        self.index = VulnerabilityIndex.from_report(self.report)
+
+    def test_words_and_phrases(self):
+        self.assertEqual(len(self.index.search('OpenSSL')), 20)
+        self.assertEqual(self.index.search('"openssl 7 does"'), ['vuln-7'])
+        self.assertEqual(self.index.search('REF-7-0'), ['vuln-7'])
+        self.assertEqual(self.index.search('"7 does" 8'), [])
+
+    def test_boolean(self):
+        self.assertEqual(sorted(self.index.search('vulnerability (7 OR 8)')), ['vuln-7', 'vuln-8'])
+        self.assertEqual(self.index.search('openssl AND NOT heartbeat'), [])
+        self.assertEqual(len(self.index.search('NOT "openssl 7"')), 19)
+
+    def test_syntax_error(self):
+        for query in ['(openssl', 'openssl OR', '"openssl', 'openssl)']:
+            self.assertRaises(QuerySyntaxError, self.index.search, query)
+
+    def test_nodes(self):
+        expected = set()
+        for node in self.report.nodes:
+            tests = set(node.tests) | {t for e in node.endpoints for s in e.services for t in s.tests}
+            if any(t.id == 'vuln-7' and t.status in VULNERABLE for t in tests):
+                expected.add(node.address)
+        self.assertEqual(self.index.nodes('REF-7-0'), {'vuln-7': expected})
+
+    def test_saved_next_to_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report.xml')
+            with open(path, 'wb') as f:
+                f.write(self.RAW)
+
+            built = VulnerabilityIndex.for_report(path)
+            self.assertTrue(os.path.exists(VulnerabilityIndex.path_for(path)))
+            loaded = VulnerabilityIndex.for_report(path)
+
+            self.assertEqual(loaded.search('"openssl 7 does"'), ['vuln-7'])
+            self.assertEqual(loaded.nodes('REF-7-0'), built.nodes('REF-7-0'))
+            self.assertEqual(loaded.nodes('REF-7-0'), self.index.nodes('REF-7-0'))
+
+    def test_pickle_not_loaded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report.xml')
+            with open(path, 'wb') as f:
+                f.write(self.RAW)
+            marker = os.path.join(directory, 'ran')
+            with open(VulnerabilityIndex.path_for(path), 'wb') as f:
+                pickle.dump(_Mkdir(marker), f)
+
+            index = VulnerabilityIndex.for_report(path)
+            self.assertFalse(os.path.exists(marker))
+            self.assertEqual(index.search('"openssl 7 does"'), ['vuln-7'])
@@ -0,0 +1,89 @@
+import itertools
+import threading
+import unittest
+from unittest import mock
+
+from lxml import etree
+
+from nexpose.models.failure import Failure
+from nexpose.modules import ModuleBase
+from nexpose.modules.session import Session, SessionPool
+from nexpose.networkerror import NetworkError
+
+
+def _failure(message: str) -> NetworkError:
+    return NetworkError(Failure.from_xml(etree.fromstring(
+        '<Failure><Exception><message>{}</message></Exception></Failure>'.format(message)
+    )))
+
+
+class TestSessionPool(unittest.TestCase):
+    def setUp(self):
+        counter = itertools.count()
+        self.login = mock.patch.object(Session, 'login', side_effect=lambda **_: 'S{}'.format(next(counter)))
+        self.logout = mock.patch.object(Session, 'logout')
+        self.login.start()
+        self.logout.start()
+
+    def tearDown(self):
+        self.login.stop()
+        self.logout.stop()
+
+    def test_lazy_login_and_reuse(self):
+        with SessionPool('localhost', 'user', 'pass', size=2, background_renew=False) as pool:
+            with pool.acquire() as first:
+                with pool.acquire() as second:
+                    self.assertNotEqual(first.id, second.id)
+            with pool.acquire() as third:
+                self.assertIn(third.id, {'S0', 'S1'})
+
+    def test_concurrent_workers_do_not_share(self):
+        held = set()
+        lock = threading.Lock()
+        errors = []
+
+        def work():
+            with pool.acquire() as session:
+                with lock:
+                    if session.id in held:
+                        errors.append(session.id)
+                    held.add(session.id)
+                with lock:
+                    held.discard(session.id)
+
+        with SessionPool('localhost', 'user', 'pass', size=3, background_renew=False) as pool:
+            threads = [threading.Thread(target=work) for _ in range(50)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+
+    def test_renew(self):
+        with SessionPool('localhost', 'user', 'pass', background_renew=False) as pool:
+            with pool.acquire() as session:
+                pool.renew(session)
+                self.assertEqual(session.id, 'S1')
+
+    def test_retry_once_on_session_timeout(self):
+        calls = []
+
+        def post(_, xml, api_version, session_id, **__):
+            calls.append(session_id)
+            if len(calls) == 1:
+                raise _failure('Your session has timed out.')
+            return xml
+
+        with SessionPool('localhost', 'user', 'pass', background_renew=False) as pool:
+            module = ModuleBase(host='localhost', session_pool=pool)
+            with mock.patch.object(ModuleBase, '_ModuleBase__post', post):
+                module._post(etree.Element('ScanStatusRequest'))
+
+        self.assertEqual(calls, ['S0', 'S1'])
+
+
+class TestNetworkError(unittest.TestCase):
+    def test_is_session_timeout(self):
+        self.assertTrue(_failure('Your session has timed out.').is_session_timeout)
+        self.assertFalse(_failure('Invalid user name or password').is_session_timeout)
@@ -1,6 +1,5 @@
 from nexpose.models.site import Hosts, Site
 from nexpose.models.scan import ScanConfig, Template
-from nexpose.networkerror import NetworkError
 from test import TestBaseLogged
 
 
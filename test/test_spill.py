@@ -0,0 +1,72 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from bench.synthetic import generate_bytes
+from nexpose.models.filter import ReportFilter
+from nexpose.models.report import NexposeReport, Node, Vulnerability
+from nexpose.models.spill import SpilledReport
+
+
+def _nodes(report):
+    return sorted((n.address, n.risk_score, len(n.tests), len(n.endpoints)) for n in report.nodes)
+
+
+def _vulnerabilities(report):
+    return sorted((v.vulnerability_id, v.severity, v.cvss_score) for v in report.vulnerability_definition)
+
+
+class TestSpill(unittest.TestCase):
+    RAW = generate_bytes(nodes=30, vulnerabilities=20)
+
+    def setUp(self):
+        self.full = NexposeReport.parse(self.RAW)
+
+    def check(self, report):
+        self.assertEqual(report.version, self.full.version)
+        self.assertEqual(len(report.scans), len(self.full.scans))
+        self.assertEqual(len(report.nodes), len(self.full.nodes))
+        self.assertEqual(_nodes(report), _nodes(self.full))
+        self.assertEqual(_vulnerabilities(report), _vulnerabilities(self.full))
+
+    def test_everything_spilled(self):
+        with NexposeReport.parse(self.RAW, budget=0) as report:
+            self.assertIsInstance(report, SpilledReport)
+            self.assertEqual(report.spilled, len(self.full.nodes) + len(self.full.vulnerability_definition))
+            self.check(report)
+            # read back on each iteration
+            self.check(report)
+            self.assertTrue(all(isinstance(n, Node) for n in report.nodes))
+
+    def test_nothing_spilled(self):
+        with NexposeReport.parse(self.RAW, budget=1 << 40) as report:
+            self.assertEqual(report.spilled, 0)
+            self.check(report)
+
+    def test_part_spilled(self):
+        with NexposeReport.parse(self.RAW, budget=200 << 10) as report:
+            self.assertGreater(report.spilled, 0)
+            self.assertLess(report.spilled, len(report.nodes) + len(report.vulnerability_definition))
+            self.assertGreater(len(report.nodes.held), 0)
+            self.check(report)
+
+    def test_filter(self):
+        where = ReportFilter(networks=['10.0.0.8/29'])
+        with NexposeReport.parse(self.RAW, where=where, include={'nodes.address'}, budget=0) as report:
+            self.assertEqual(sorted(n.address[3] for n in report.nodes), list(range(8, 16)))
+            self.assertEqual(report.vulnerability_definition, set())
+
+    def test_pickled_whole(self):
+        with NexposeReport.parse(self.RAW, budget=0) as report:
+            copy = pickle.loads(pickle.dumps(report))
+        self.assertIs(type(copy), NexposeReport)
+        self.assertIsInstance(next(iter(copy.vulnerability_definition)), Vulnerability)
+        self.check(copy)
+
+    def test_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            report = NexposeReport.parse(self.RAW, budget=0, directory=directory)
+            self.check(report)
+            report.close()
+            self.assertEqual(os.listdir(directory), [])
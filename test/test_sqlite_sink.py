@@ -0,0 +1,100 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from lxml import etree
+
+from bench.synthetic import generate_bytes
+from nexpose.models.report import NexposeReport
+from nexpose.sinks.sqlite import SQLiteSink
+
+
+class TestSQLiteSink(unittest.TestCase):
+    RAW = generate_bytes(nodes=30, vulnerabilities=20)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'history.db')
+        self.report = NexposeReport.from_xml(etree.fromstring(self.RAW))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def count(self, table: str) -> int:
+        with sqlite3.connect(self.path) as connection:
+            return connection.execute('SELECT COUNT(*) FROM {}'.format(table)).fetchone()[0]
+
+    def test_load(self):
+        with SQLiteSink(self.path, batch_size=7) as sink:
+            sink.load(self.RAW)
+
+        tests = sum(len(n.tests) + sum(len(s.tests) for e in n.endpoints for s in e.services)
+                    for n in self.report.nodes)
+        self.assertEqual(self.count('nodes'), 30)
+        self.assertEqual(self.count('endpoints'), sum(len(n.endpoints) for n in self.report.nodes))
+        self.assertEqual(self.count('tests'), tests)
+        self.assertEqual(self.count('vulnerabilities'), 20)
+        self.assertEqual(self.count('vulnerability_references'),
+                         sum(len(v.references) for v in self.report.vulnerability_definition))
+
+        with sqlite3.connect(self.path) as connection:
+            address, risk = connection.execute('SELECT address, risk_score FROM nodes WHERE device_id = 1').fetchone()
+        node = next(n for n in self.report.nodes if n.device_id == '1')
+        self.assertEqual((address, risk), ('.'.join(str(i) for i in node.address), node.risk_score))
+
+    def test_upsert(self):
+        with SQLiteSink(self.path) as sink:
+            sink.load(self.RAW)
+        counts = {table: self.count(table) for table in ('nodes', 'endpoints', 'services', 'tests')}
+
+        with SQLiteSink(self.path) as sink:
+            sink.load(self.RAW)
+            self.assertEqual(sink.skipped, 20)
+        self.assertEqual({table: self.count(table) for table in counts}, counts)
+
+    def test_changed_vulnerability(self):
+        with SQLiteSink(self.path) as sink:
+            sink.load(self.RAW)
+
+        start = self.RAW.index(b'<vulnerability id="vuln-3"')
+        at = self.RAW.index(b'modified="', start) + len(b'modified="')
+        changed = self.RAW[:at] + b'20170101T000000000' + self.RAW[at + 18:]
+        with SQLiteSink(self.path) as sink:
+            sink.load(changed)
+            self.assertEqual(sink.skipped, 19)
+
+        with sqlite3.connect(self.path) as connection:
+            modified, = connection.execute(
+                "SELECT modified FROM vulnerabilities WHERE vulnerability_id = 'vuln-3'").fetchone()
+        self.assertEqual(modified, '2017-01-01T00:00:00')
+        self.assertEqual(self.count('vulnerabilities'), 20)
+
+    def test_same_node_in_a_batch(self):
+        node = next(n for n in self.report.nodes if n.endpoints and n.tests)
+        with SQLiteSink(self.path) as sink:
+            sink.write(node)
+            sink.write(node)
+
+        tests = len(node.tests) + sum(len(s.tests) for e in node.endpoints for s in e.services)
+        self.assertEqual(self.count('nodes'), 1)
+        self.assertEqual(self.count('endpoints'), len(node.endpoints))
+        self.assertEqual(self.count('tests'), tests)
+
+    def test_same_node_after_rollback(self):
+        node = next(iter(self.report.nodes))
+        with SQLiteSink(self.path) as sink:
+            sink.write(node)
+            sink.rollback()
+            sink.write(node)
+            # the node rolled back is not a batch to send
+            self.assertFalse(sink.connection.in_transaction)
+        self.assertEqual(self.count('nodes'), 1)
+
+    def test_rollback(self):
+        with self.assertRaises(RuntimeError):
+            with SQLiteSink(self.path, batch_size=5) as sink:
+                for node in list(self.report.nodes)[:12]:
+                    sink.write(node)
+                raise RuntimeError()
+        self.assertEqual(self.count('nodes'), 0)
@@ -0,0 +1,83 @@
+from http.server import BaseHTTPRequestHandler
+
+from lxml import etree
+
+from nexpose.models.report import ReportConfig, ReportConfigFormat, ReportConfigSummary, ReportSummaryStatus
+from test import TestBaseStub
+
+REPORT = ('<NexposeReport version="2.0"><scans><scan id="{}" name="stub" startTime="20160301T101010123" '
+          'endTime="20160301T131310456" status="finished"/></scans><nodes/><VulnerabilityDefinitions/>'
+          '</NexposeReport>')
+
+
+class _StubConsole(BaseHTTPRequestHandler):
+    """
+    a report generation sets a cookie naming the report, which its download has to send back; any other cookie is
+    recorded as leaked from another thread
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def __reply(self, body, cookie=None):
+        body = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml')
+        if cookie is not None:
+            self.send_header('Set-Cookie', cookie)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = etree.fromstring(self.rfile.read(int(self.headers['Content-Length'])))
+        report_id = request.get('report-id')
+        if self.headers.get('Cookie') is not None:
+            self.server.leaked.append((report_id, self.headers['Cookie']))
+
+        self.__reply('<ReportGenerateResponse success="1"><ReportSummary cfg-id="{}" status="Started"/>'
+                     '</ReportGenerateResponse>'.format(report_id), cookie='report={}; Path=/'.format(report_id))
+
+    def do_GET(self):
+        report_id = self.path.rsplit('/', 1)[-1]
+        if self.headers.get('Cookie') != 'report={}'.format(report_id):
+            self.server.leaked.append((report_id, self.headers.get('Cookie')))
+
+        self.__reply(REPORT.format(report_id))
+
+    def log_message(self, *args):
+        pass
+
+
+class TestThreadSafety(TestBaseStub):
+    handler = _StubConsole
+
+    def setUp(self):
+        super().setUp()
+        self.server.leaked = []
+
+    def generate_and_fetch(self, report_id):
+        config = ReportConfig(template=None, report_format=ReportConfigFormat.raw_xml_v2, site=None,
+                              report_id=report_id)
+        summary = self.nexpose.report.report_generate(config)
+
+        generated = ReportConfigSummary(template_id='audit-report', config_id=summary.config_id,
+                                        status=ReportSummaryStatus.generated, generated_on=None,
+                                        report_uri='/reports/{}'.format(summary.config_id), scope=None, name=None)
+        report = self.nexpose.extra.get_report_raw_xml_2(generated)
+        return next(iter(report.scans)).id
+
+    def test_no_cross_talk(self):
+        ids = self.nexpose.map(self.generate_and_fetch, range(300), workers=16)
+
+        self.assertEqual(list(range(300)), ids)
+        self.assertEqual([], self.server.leaked)
+
+    def test_map_error(self):
+        def fail(i):
+            if i == 3:
+                raise ValueError(i)
+            return i
+
+        with self.assertRaises(ValueError):
+            self.nexpose.map(fail, range(10), workers=4)
+        self.assertEqual(list(range(10)), self.nexpose.map(lambda i: i, range(10)))
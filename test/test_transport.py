@@ -0,0 +1,143 @@
+import threading
+import unittest
+
+import requests
+
+from nexpose.networkerror import CircuitOpenError, DeadlineExceededError
+from nexpose.transport import RetryPolicy, CircuitBreaker, Deadline, call_with_retry, hedge
+
+
+class FakeResponse:
+    def __init__(self, status_code: int) -> None:
+        self.status_code = status_code
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, base_delay=0, rand=lambda: 0.5)
+        self.breaker = CircuitBreaker(failure_threshold=10)
+
+    def __call(self, errors, idempotent=False, deadline=None):
+        calls = []
+
+        def call(timeout):
+            calls.append(timeout)
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return FakeResponse(200)
+
+        ans = call_with_retry(call, policy=self.policy, breaker=self.breaker, deadline=Deadline(deadline),
+                              timeout=(1, 2), idempotent=idempotent)
+        return ans, calls
+
+    def test_backoff(self):
+        policy = RetryPolicy(base_delay=1, max_delay=5, jitter=0.5, rand=lambda: 1)
+        self.assertEqual([policy.delay(attempt) for attempt in range(5)], [1, 2, 4, 5, 5])
+        policy.rand = lambda: 0
+        self.assertEqual(policy.delay(1), 1)
+
+    def test_retry_connection_error(self):
+        _, calls = self.__call([requests.exceptions.ConnectionError()] * 2)
+        self.assertEqual(len(calls), 3)
+
+    def test_bounded(self):
+        self.assertRaises(requests.exceptions.ConnectionError, self.__call,
+                          [requests.exceptions.ConnectionError()] * 3)
+
+    def test_read_timeout_only_idempotent(self):
+        self.assertRaises(requests.exceptions.ReadTimeout, self.__call, [requests.exceptions.ReadTimeout()])
+        _, calls = self.__call([requests.exceptions.ReadTimeout()], idempotent=True)
+        self.assertEqual(len(calls), 2)
+
+    def test_deadline_shrinks_timeout(self):
+        _, calls = self.__call([], deadline=1.5)
+        self.assertLessEqual(calls[0][1], 1.5)
+        self.assertEqual(calls[0][0], 1)
+
+    def test_deadline_exceeded(self):
+        self.policy.base_delay = 10
+        self.assertRaises(DeadlineExceededError, self.__call, [requests.exceptions.ConnectionError()], deadline=1)
+
+    def test_circuit_breaker(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.open)
+        self.assertRaises(CircuitOpenError, breaker.before_call)
+
+        clock.now = 10
+        breaker.before_call()
+        self.assertRaises(CircuitOpenError, breaker.before_call)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.open)
+
+        clock.now = 20
+        breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.closed)
+
+    def test_status_only_idempotent(self):
+        def call(timeout):
+            calls.append(timeout)
+            return FakeResponse(503)
+
+        calls = []
+        self.assertRaises(requests.exceptions.HTTPError, call_with_retry, call, policy=self.policy,
+                          breaker=self.breaker, deadline=Deadline(None), timeout=1, idempotent=False)
+        self.assertEqual(len(calls), 1)
+
+        calls = []
+        self.assertRaises(requests.exceptions.HTTPError, call_with_retry, call, policy=self.policy,
+                          breaker=self.breaker, deadline=Deadline(None), timeout=1, idempotent=True)
+        self.assertEqual(len(calls), 3)
+
+    def test_probe_released(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+
+        def fail(timeout):
+            raise ValueError()
+
+        self.assertRaises(ValueError, call_with_retry, fail, policy=self.policy, breaker=breaker,
+                          deadline=Deadline(None), timeout=1, idempotent=True)
+        self.assertEqual(breaker.state, CircuitBreaker.half_open)
+
+        # an expired deadline never takes the probe
+        self.assertRaises(DeadlineExceededError, call_with_retry, fail, policy=self.policy, breaker=breaker,
+                          deadline=Deadline(0), timeout=1, idempotent=True)
+        breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.closed)
+
+    def test_hedge(self):
+        release = threading.Event()
+        calls = []
+
+        def call():
+            calls.append(None)
+            if len(calls) == 1:
+                release.wait(5)
+                return 'slow'
+            return 'fast'
+
+        self.assertEqual(hedge(call, hedge_after=0.01), 'fast')
+        release.set()
+
+    def test_hedge_failure(self):
+        def call():
+            raise ValueError()
+
+        self.assertRaises(ValueError, hedge, call, hedge_after=1)
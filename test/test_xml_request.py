@@ -0,0 +1,75 @@
+import types
+import unittest
+from unittest import mock
+
+import requests
+from lxml import etree
+
+from nexpose.models import XmlRequest
+from nexpose.models.scan import ScanConfig, Template
+from nexpose.models.site import Hosts, Site as SiteModel
+from nexpose.modules.site import Site
+
+
+def _site(hosts=(), ip_range=()):
+    return SiteModel(hosts=Hosts(ip_range=list(ip_range), hosts=list(hosts)),
+                     scan_config=ScanConfig(Template('full-audit')), name='site', site_id=7)
+
+
+def _canonical(xml):
+    return etree.tostring(xml, method='c14n')
+
+
+class TestXmlRequest(unittest.TestCase):
+    def test_same_as_tree(self):
+        site = _site(hosts=['a.example.com', 'b&c'], ip_range=[((10, 0, 0, 1), None), ((10, 0, 0, 2), (10, 0, 0, 9))])
+        tree = etree.Element('SiteSaveRequest', attrib={'session-id': 'abc'})
+        tree.append(site.to_xml())
+
+        request = XmlRequest('SiteSaveRequest', attrib={'session-id': 'abc'}, body=[site])
+        raw = bytes(request)
+
+        self.assertTrue(raw.startswith(b"<?xml version='1.0' encoding='UTF-8'?>"))
+        self.assertNotIn(b'\n', raw.split(b'?>', 1)[1].strip())
+        self.assertEqual(_canonical(etree.fromstring(raw)), _canonical(tree))
+        self.assertEqual(bytes(request), raw)
+
+    def test_written_again(self):
+        site = _site(hosts=('host-{}'.format(i) for i in range(3)), ip_range=(((10, 0, 0, i), None) for i in range(2)))
+        request = XmlRequest('SiteSaveRequest', body=(model for model in [site]))
+
+        first = bytes(request)
+        self.assertEqual(len(etree.fromstring(first).find('Site/Hosts')), 5)
+        self.assertEqual(bytes(request), first)
+
+    def test_chunks(self):
+        site = _site(hosts=['host-{}.example.com'.format(i) for i in range(50000)])
+        chunks = list(XmlRequest('SiteSaveRequest', body=[site]).chunks())
+
+        self.assertGreater(len(chunks), 10)
+        self.assertTrue(all(chunks))
+        self.assertTrue(all(len(chunk) < 2 * XmlRequest.CHUNK_SIZE for chunk in chunks))
+        hosts = etree.fromstring(b''.join(chunks)).find('Site/Hosts')
+        self.assertEqual(len(hosts), 50000)
+        self.assertEqual(hosts[-1].text, 'host-49999.example.com')
+
+    def test_site_save_streams(self):
+        sent = []
+
+        def post(session, url, data, **_):
+            sent.append(data)
+            ans = requests.Response()
+            ans._content = b'<SiteSaveResponse success="1" site-id="12"/>'
+            ans.status_code = 200
+            return ans
+
+        with mock.patch.object(requests.Session, 'post', post):
+            module = Site(host='localhost', sessions_id={(1, 1): 'session'})
+            saved = module.site_save(_site(hosts=['a', 'b']))
+
+        self.assertEqual(saved.id, '12')
+        self.assertIsInstance(sent[0], types.GeneratorType)
+        request = etree.fromstring(b''.join(sent[0]))
+        self.assertEqual(request.tag, 'SiteSaveRequest')
+        self.assertEqual(request.get('session-id'), 'session')
+        self.assertEqual([host.text for host in request.find('Site/Hosts')], ['a', 'b'])